@@ -93,6 +93,44 @@ DATABASES = {
 }
 
 
+# Caches
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+
+# Backends for cached API responses, selected with RESPONSE_CACHE_BACKEND.
+# A dotted path to any other Django cache backend can be given as well,
+# e.g. `django_redis.cache.RedisCache` with a redis:// location.
+RESPONSE_CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'core.cache.LRUFileBasedCache',
+}
+RESPONSE_CACHE_BACKEND = environ.get('RESPONSE_CACHE_BACKEND', 'locmem')
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'responses': {
+        'BACKEND': RESPONSE_CACHE_BACKENDS.get(
+            RESPONSE_CACHE_BACKEND,
+            RESPONSE_CACHE_BACKEND,
+        ),
+        'LOCATION': environ.get('RESPONSE_CACHE_LOCATION', 'responses'),
+        'TIMEOUT': None,
+        'OPTIONS': {
+            'MAX_ENTRIES': int(
+                environ.get('RESPONSE_CACHE_MAX_ENTRIES', 10000)
+            ),
+        },
+    },
+}
+
+RESPONSE_CACHE_ALIAS = 'responses'
+RESPONSE_CACHE_TIMEOUT = int(environ.get('RESPONSE_CACHE_TIMEOUT', 300))
+# Rendered profiles are dropped when saved, the timeout only bounds how long
+# a rendering cached by a request racing a write can be served.
+PROFILE_CACHE_TIMEOUT = int(environ.get('PROFILE_CACHE_TIMEOUT', 3600))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -142,19 +180,109 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'users.User'
 
+# JSON renderer and parser of the API, `fast` uses orjson when it is
+# installed and the stdlib encoder otherwise.
+JSON_BACKENDS = {
+    'stdlib': {
+        'renderer': 'rest_framework.renderers.JSONRenderer',
+        'parser': 'rest_framework.parsers.JSONParser',
+    },
+    'fast': {
+        'renderer': 'core.renderers.FastJSONRenderer',
+        'parser': 'core.parsers.FastJSONParser',
+    },
+}
+JSON_BACKEND = environ.get('JSON_BACKEND', 'fast')
+
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        JSON_BACKENDS[JSON_BACKEND]['renderer'],
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        JSON_BACKENDS[JSON_BACKEND]['parser'],
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'core.authentication.CachedJWTAuthentication',
     ],
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.KeysetPagination',
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': environ.get('LOGIN_THROTTLE_IP_RATE', '30/min'),
+        'login_account': environ.get('LOGIN_THROTTLE_ACCOUNT_RATE', '10/min'),
+        'signup_ip': environ.get('SIGNUP_THROTTLE_IP_RATE', '20/hour'),
+    },
+    'PAGE_SIZE': int(environ.get('PAGE_SIZE', 100)),
 }
 
+# Upper bound for the `page_size` query parameter of paginated lists.
+MAX_PAGE_SIZE = int(environ.get('MAX_PAGE_SIZE', 1000))
+
+# Upper bound for the number of items of each operation of a bulk request.
+MAX_BULK_SIZE = int(environ.get('MAX_BULK_SIZE', 1000))
+
+# Delta sync: how long deleted objects are remembered, and how far behind
+# the request time sync tokens are issued, so changes of transactions still
+# running when the token was issued are picked up by the next sync.
+SYNC_TOMBSTONE_RETENTION = timedelta(
+    days=int(environ.get('SYNC_TOMBSTONE_RETENTION_DAYS', 30)),
+)
+SYNC_TOKEN_LAG = timedelta(
+    seconds=int(environ.get('SYNC_TOKEN_LAG_SECONDS', 5)),
+)
+
+# Tags no recipe uses are deleted by `gc_tags` once older than the grace
+# period, so a tag created just before being linked is left alone. With an
+# interval set, every process also collects them in a background thread.
+TAG_GC_GRACE = timedelta(
+    hours=int(environ.get('TAG_GC_GRACE_HOURS', 24)),
+)
+TAG_GC_INTERVAL = int(environ.get('TAG_GC_INTERVAL_SECONDS', 0))
+
+# Authenticated users are kept in a per-process LRU of AUTH_USER_CACHE_SIZE
+# entries for AUTH_USER_CACHE_TTL seconds (0 disables it), so changes made
+# through another process, like a deactivation, apply after at most the TTL.
+# Trusting JWT claims skips the lookup altogether, and applies them only
+# once the token expires.
+AUTH_USER_CACHE_TTL = int(environ.get('AUTH_USER_CACHE_TTL', 60))
+AUTH_USER_CACHE_SIZE = int(environ.get('AUTH_USER_CACHE_SIZE', 10000))
+AUTH_TRUST_JWT_CLAIMS = environ.get('AUTH_TRUST_JWT_CLAIMS') == '1'
+
+# Logins and signups are throttled with in-memory token buckets (see
+# core.throttling), at most THROTTLE_BUCKETS_SIZE keys are tracked per scope.
+THROTTLE_BUCKETS_SIZE = int(environ.get('THROTTLE_BUCKETS_SIZE', 100000))
+
+# Passwords are hashed by a pool of PASSWORD_HASH_WORKERS processes, 0 hashes
+# them inline. Beyond PASSWORD_HASH_QUEUE hashes queued or running per
+# process, or after waiting PASSWORD_HASH_TIMEOUT seconds, a 429 is returned.
+PASSWORD_HASH_WORKERS = int(environ.get('PASSWORD_HASH_WORKERS', 2))
+PASSWORD_HASH_QUEUE = int(environ.get('PASSWORD_HASH_QUEUE', 16))
+PASSWORD_HASH_TIMEOUT = float(environ.get('PASSWORD_HASH_TIMEOUT', 5))
+
+# Uploads are streamed to temporary files instead of being read into memory.
+FILE_UPLOAD_HANDLERS = [
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+
+# Profile images are resized to fit squares of PROFILE_IMAGE_SIZES pixels in
+# every format of PROFILE_IMAGE_FORMATS (see users.images), by a pool of
+# PROFILE_IMAGE_WORKERS processes, 0 resizes them inline. Images of more
+# than PROFILE_IMAGE_MAX_PIXELS are rejected.
+PROFILE_IMAGE_SIZES = [
+    int(size)
+    for size in environ.get('PROFILE_IMAGE_SIZES', '64,256,1024').split(',')
+]
+PROFILE_IMAGE_FORMATS = environ.get(
+    'PROFILE_IMAGE_FORMATS', 'jpeg,webp',
+).split(',')
+PROFILE_IMAGE_MAX_PIXELS = int(
+    environ.get('PROFILE_IMAGE_MAX_PIXELS', 40_000_000),
+)
+PROFILE_IMAGE_WORKERS = int(environ.get('PROFILE_IMAGE_WORKERS', 1))
 
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=720),
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
 
 application = get_wsgi_application()
+
+# Collect orphan tags in the background when TAG_GC_INTERVAL is set.
+from recipes.gc import start_scheduler  # noqa: E402
+
+start_scheduler()
@@ -0,0 +1,159 @@
+"""
+Authentication classes resolving users from a short lived in-process cache.
+
+Every authenticated request used to look its user up in the database. The
+users resolved from JWT user ids and from auth tokens are kept in a bounded
+LRU for AUTH_USER_CACHE_TTL seconds instead. Saving or deleting a user, or
+deleting a token, drops the entries of this process at once; other
+processes see the change once their entries expire.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+
+class LRUCache:
+    """Thread-safe mapping keeping the most recently used entries."""
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the value of key if it has not expired, else None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+
+            return value
+
+    def set(self, key, value):
+        """Store value for AUTH_USER_CACHE_TTL, evicting the oldest entries."""
+        ttl = settings.AUTH_USER_CACHE_TTL
+        if not ttl:
+            return
+
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > settings.AUTH_USER_CACHE_SIZE:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        """Drop the entry of key."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+user_cache = LRUCache()
+
+
+def _user_key(user_id):
+    return f'user:{user_id}'
+
+
+def _token_key(key):
+    return f'token:{key}'
+
+
+def get_cached_user(user_id, load):
+    """
+    Return a copy of the cached user with user_id, calling load to fetch
+    the user on a miss. Only active users are cached.
+    """
+    key = _user_key(user_id)
+    user = user_cache.get(key)
+    if user is None:
+        user = load()
+        if user.is_active:
+            user_cache.set(key, user)
+
+    # Requests get their own copy, so nothing they set leaks into others.
+    return copy.copy(user)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication resolving users from the cache.
+
+    With AUTH_TRUST_JWT_CLAIMS the user is built from the claims of the
+    token alone (see users.serializers.TokenObtainPairSerializer), so a
+    deactivated user is accepted until the token expires.
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(jwt_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)
+
+        if settings.AUTH_TRUST_JWT_CLAIMS and \
+                'email' in validated_token and 'name' in validated_token:
+            return get_user_model()(**{
+                jwt_settings.USER_ID_FIELD: user_id,
+                'email': validated_token['email'],
+                'name': validated_token['name'],
+                'is_active': True,
+            })
+
+        return get_cached_user(
+            user_id,
+            lambda: super(CachedJWTAuthentication, self).get_user(
+                validated_token,
+            ),
+        )
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Token authentication resolving tokens and users from the cache."""
+
+    def authenticate_credentials(self, key):
+        cached = user_cache.get(_token_key(key))
+        if cached is None:
+            user, token = super().authenticate_credentials(key)
+            user_cache.set(_token_key(key), token)
+            user_cache.set(_user_key(user.pk), user)
+            return copy.copy(user), token
+
+        return get_cached_user(
+            cached.user_id,
+            lambda: super(CachedTokenAuthentication, self)
+            .authenticate_credentials(key)[0],
+        ), cached
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def forget_user(sender, instance, **kwargs):
+    """Drop the cached user, reloading it on its next request."""
+    user_cache.delete(_user_key(instance.pk))
+
+
+@receiver(post_delete, sender=Token)
+def forget_token(sender, instance, **kwargs):
+    """Drop a deleted token, so it stops authenticating at once."""
+    user_cache.delete(_token_key(instance.key))
@@ -0,0 +1,290 @@
+"""
+In-process benchmarks of the API endpoints.
+
+Requests go through the whole Django stack with the test client, so the
+numbers include middleware, authentication, serialization and queries,
+but no network or web server.
+"""
+import math
+import statistics
+import threading
+import time
+from io import BytesIO, StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection, connections
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils.module_loading import import_string
+
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.cache import get_response_cache
+
+BENCHMARK_PASSWORD = 'benchmark-password'
+
+
+def percentile(values, percent):
+    """Return the percentile of values, by the nearest rank method."""
+    ordered = sorted(values)
+    rank = math.ceil(percent / 100 * len(ordered))
+    return ordered[max(rank, 1) - 1]
+
+
+def measure(request, iterations, warmup=0, setup=None):
+    """
+    Call request repeatedly and return latency, throughput and query
+    statistics. setup is called before every call, outside the timing.
+    """
+    for i in range(warmup):
+        if setup:
+            setup()
+        request()
+
+    latencies = []
+    queries = []
+    for i in range(iterations):
+        if setup:
+            setup()
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = request()
+            latencies.append(time.perf_counter() - started)
+        queries.append(len(captured))
+        if response.status_code >= 400:
+            raise AssertionError(
+                f'{response.status_code} response: {response.content[:200]}'
+            )
+
+    return summarize(latencies, queries)
+
+
+def summarize(latencies, queries):
+    """Return statistics of latencies in seconds and query counts."""
+    return {
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p90_ms': percentile(latencies, 90) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'mean_ms': statistics.mean(latencies) * 1000,
+        'throughput_rps': len(latencies) / sum(latencies),
+        'queries': max(queries),
+    }
+
+
+def seed(size):
+    """Generate a user owning size recipes, returning the user."""
+    User = get_user_model()
+    last = User.objects.order_by('-pk').values_list('pk', flat=True).first()
+    call_command(
+        'generate_dataset',
+        users=1,
+        recipes_per_user=size,
+        tags_per_user=max(10, size // 10),
+        password=BENCHMARK_PASSWORD,
+        stdout=StringIO(),
+    )
+
+    return User.objects.filter(pk__gt=last or 0).get()
+
+
+def get_scenarios(user):
+    """Return the benchmarked requests of user by name."""
+    token = Token.objects.create(user=user)
+    recipes = APIClient()
+    recipes.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+    users = APIClient()
+    access = users.post(reverse('users:token'), {
+        'email': user.email,
+        'password': BENCHMARK_PASSWORD,
+    }).data['access']
+    users.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+    anonymous = APIClient()
+
+    recipes_url = reverse('recipes:recipe-list')
+    tags_url = reverse('recipes:tag-list')
+    profile_url = reverse('users:profile', args=[user.profile.pk])
+    clear_cache = get_response_cache().clear
+
+    return {
+        'recipes': (lambda: recipes.get(recipes_url), None),
+        'recipes_uncached': (lambda: recipes.get(recipes_url), clear_cache),
+        'tags': (lambda: recipes.get(tags_url), None),
+        'tags_uncached': (lambda: recipes.get(tags_url), clear_cache),
+        'token': (
+            lambda: anonymous.post(reverse('users:token'), {
+                'email': user.email,
+                'password': BENCHMARK_PASSWORD,
+            }),
+            None,
+        ),
+        'me': (lambda: users.get(reverse('users:me')), None),
+        'profile': (lambda: users.get(profile_url), None),
+    }
+
+
+def measure_json(data, iterations):
+    """
+    Return rendering and parsing statistics of data for every JSON backend
+    in settings.JSON_BACKENDS.
+    """
+    results = {}
+    for backend, classes in settings.JSON_BACKENDS.items():
+        renderer = import_string(classes['renderer'])()
+        parser = import_string(classes['parser'])()
+        rendered = renderer.render(data)
+
+        latencies = []
+        for i in range(iterations):
+            started = time.perf_counter()
+            renderer.render(data)
+            latencies.append(time.perf_counter() - started)
+        results[f'render_{backend}'] = summarize(latencies, [0])
+
+        latencies = []
+        for i in range(iterations):
+            stream = BytesIO(rendered)
+            started = time.perf_counter()
+            parser.parse(stream)
+            latencies.append(time.perf_counter() - started)
+        results[f'parse_{backend}'] = summarize(latencies, [0])
+
+    return results
+
+
+def measure_logins(user, concurrency, iterations):
+    """
+    Return statistics of concurrency clients logging user in iterations
+    times each, all at once. Throughput counts successful logins, and logins
+    rejected with a 429 are counted as rejected.
+    """
+    url = reverse('users:token')
+    data = {'email': user.email, 'password': BENCHMARK_PASSWORD}
+    latencies = []
+    statuses = []
+    errors = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(concurrency + 1)
+
+    def login():
+        client = APIClient()
+        barrier.wait()
+        try:
+            for i in range(iterations):
+                started = time.perf_counter()
+                response = client.post(url, data)
+                latency = time.perf_counter() - started
+                with lock:
+                    latencies.append(latency)
+                    statuses.append(response.status_code)
+        except Exception as error:
+            errors.append(error)
+        finally:
+            connections.close_all()
+
+    threads = [threading.Thread(target=login) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    if errors:
+        raise errors[0]
+    failed = [code for code in statuses if code not in (200, 429)]
+    if failed:
+        raise AssertionError(f'{failed[0]} response')
+    result = summarize(latencies, [0])
+    result['throughput_rps'] = statuses.count(200) / elapsed
+    result['rejected'] = statuses.count(429)
+
+    return result
+
+
+def without_throttling():
+    """Return a context letting every request through the throttles."""
+    return override_settings(REST_FRAMEWORK={
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': {},
+    })
+
+
+def run_benchmarks(sizes, iterations, warmup=5, names=None, log=None,
+                   concurrency=8):
+    """
+    Seed a user for each size and benchmark every scenario with it, the
+    login one with concurrency clients.
+
+    Return results keyed by `<scenario>@<size>`.
+    """
+    # The same client logs in over and over.
+    with without_throttling():
+        return _run_benchmarks(
+            sizes, iterations, warmup, names, log, concurrency,
+        )
+
+
+def _run_benchmarks(sizes, iterations, warmup, names, log, concurrency):
+    results = {}
+    for size in sizes:
+        user = seed(size)
+        for name, (request, setup) in get_scenarios(user).items():
+            if names and name not in names:
+                continue
+            key = f'{name}@{size}'
+            results[key] = measure(request, iterations, warmup, setup)
+            if log:
+                log(key, results[key])
+
+        if not names or 'login' in names:
+            key = f'login@{size}'
+            results[key] = measure_logins(user, concurrency, iterations)
+            if log:
+                log(key, results[key])
+
+        if names and 'json' not in names:
+            continue
+        # The JSON backends on the payload of a full recipe list.
+        payload = APIClient()
+        payload.force_authenticate(user)
+        data = payload.get(
+            reverse('recipes:recipe-list'),
+            {'page_size': size},
+        ).data
+        for name, result in measure_json(data, iterations).items():
+            key = f'{name}@{size}'
+            results[key] = result
+            if log:
+                log(key, result)
+
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Return regressions of results against baseline, as messages.
+
+    Latency regresses when the median grows by more than threshold, a
+    fraction, and query counts regress when they grow at all.
+    """
+    regressions = []
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        base = baseline[key]
+        if result['p50_ms'] > base['p50_ms'] * (1 + threshold):
+            regressions.append(
+                f'{key}: p50 {result["p50_ms"]:.2f}ms, '
+                f'baseline {base["p50_ms"]:.2f}ms'
+            )
+        if result['queries'] > base['queries']:
+            regressions.append(
+                f'{key}: {result["queries"]} queries, '
+                f'baseline {base["queries"]}'
+            )
+
+    return regressions
@@ -0,0 +1,156 @@
+"""
+Per-user versioned response cache for API views.
+
+Every user has a version token stored in the response cache. Cached
+responses are keyed by that token, so bumping it when the user's data
+changes makes all of their cached responses unreachable at once, and
+eviction of a token can never resurrect stale entries.
+"""
+import hashlib
+import os
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.filebased import FileBasedCache
+from django.db import transaction
+
+from rest_framework import status
+from rest_framework.response import Response
+
+from core.conditional import check_response_preconditions
+
+# Response headers stored alongside cached data.
+CACHED_HEADERS = ('ETag', 'Last-Modified')
+
+
+def get_response_cache():
+    """Return the cache backend holding API responses."""
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def _version_key(user_id):
+    return f'response-version:{user_id}'
+
+
+def get_user_version(user_id):
+    """Return the current cache version token of a user."""
+    cache = get_response_cache()
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        version = cache.get(key)
+
+    return version
+
+
+def bump_user_version(user_id):
+    """Invalidate every cached response of a user."""
+    def bump():
+        get_response_cache().set(
+            _version_key(user_id),
+            uuid.uuid4().hex,
+            timeout=None,
+        )
+
+    # Bump now so the writing request never sees its stale responses, and
+    # again after commit in case another request cached the old rows
+    # under the new token meanwhile.
+    bump()
+    transaction.on_commit(bump)
+
+
+class CachedResponseMixin:
+    """
+    Serve lists of viewsets from the per-user response cache.
+
+    The router routes every action a viewset has, so retrieve is cached
+    by CachedRetrieveMixin, for viewsets retrieving objects only.
+    """
+    cached_actions = ('list', 'retrieve')
+
+    def get_response_cache_key(self, request):
+        """Return the cache key of the response to request."""
+        version = get_user_version(request.user.pk)
+        url = hashlib.md5(
+            request.build_absolute_uri().encode('utf-8')
+        ).hexdigest()
+
+        return f'response:{self.basename}:{self.action}:' \
+               f'{request.user.pk}:{version}:{url}'
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        """Return the cached response, calling handler on a miss."""
+        if request.method != 'GET' or \
+                self.action not in self.cached_actions or \
+                not request.user.is_authenticated:
+            return handler(request, *args, **kwargs)
+
+        # The key is built before the database is read, so rows read
+        # before a concurrent write are stored under the old version.
+        key = self.get_response_cache_key(request)
+        cache = get_response_cache()
+        cached = cache.get(key)
+        if cached is not None:
+            data, headers = cached
+            return check_response_preconditions(request, headers) or \
+                Response(data, headers=headers)
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            headers = {
+                header: response[header]
+                for header in CACHED_HEADERS if response.has_header(header)
+            }
+            cache.set(
+                key,
+                (response.data, headers),
+                settings.RESPONSE_CACHE_TIMEOUT,
+            )
+
+        return response
+
+
+class CachedRetrieveMixin(CachedResponseMixin):
+    """Serve lists and retrieved objects from the response cache."""
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs,
+        )
+
+
+class LRUFileBasedCache(FileBasedCache):
+    """File based cache that evicts the least recently used entries."""
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, default, version)
+        if value is not default:
+            try:
+                os.utime(self._key_to_file(key, version))
+            except FileNotFoundError:
+                pass
+
+        return value
+
+    def _cull(self):
+        filelist = self._list_cache_files()
+        num_entries = len(filelist)
+        if num_entries < self._max_entries:
+            return
+        if self._cull_frequency == 0:
+            return self.clear()
+
+        def last_used(fname):
+            try:
+                return os.path.getmtime(fname)
+            except FileNotFoundError:
+                return 0
+
+        filelist.sort(key=last_used)
+        for fname in filelist[:max(1, num_entries // self._cull_frequency)]:
+            self._delete(fname)
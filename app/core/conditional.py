@@ -0,0 +1,128 @@
+"""
+Conditional request handling (ETag / Last-Modified) for API views.
+"""
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+from rest_framework import status
+
+
+def make_etag(*parts):
+    """Return a strong ETag built from parts."""
+    seed = ':'.join(str(part) for part in parts)
+    return quote_etag(hashlib.md5(seed.encode('utf-8')).hexdigest())
+
+
+def check_preconditions(request, etag, last_modified):
+    """Return a 304 or 412 response if the request preconditions say so."""
+    return get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=last_modified and int(last_modified.timestamp()),
+    )
+
+
+def check_response_preconditions(request, headers):
+    """Evaluate request preconditions against stored response headers."""
+    last_modified = parse_http_date_safe(headers.get('Last-Modified', ''))
+    return get_conditional_response(
+        request,
+        etag=headers.get('ETag'),
+        last_modified=last_modified,
+    )
+
+
+class ConditionalMixin:
+    """
+    Add ETag and Last-Modified to viewset responses and answer conditional
+    requests before serializing anything.
+
+    Validators come from `modified_field` only: the latest modification
+    time and row count of the filtered queryset for lists, and the
+    modification time of the object for detail actions.
+
+    Lists and updates are conditional, ConditionalRetrieveMixin adds
+    retrieve for viewsets retrieving objects, as the router routes every
+    action a viewset has.
+    """
+    conditional_actions = ('list', 'retrieve', 'update', 'partial_update')
+    modified_field = 'updated_at'
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs,
+        )
+
+    def update(self, request, *args, **kwargs):
+        # partial_update() calls update() too.
+        return self.conditional_response(
+            super().update, request, *args, **kwargs,
+        )
+
+    def get_object(self):
+        """Return the object of the request, fetching it only once."""
+        if getattr(self, '_object', None) is None:
+            self._object = super().get_object()
+
+        return self._object
+
+    def get_validators(self):
+        """Return the ETag and modification time of the resource."""
+        if self.action == 'list':
+            stats = self.filter_queryset(self.get_queryset()) \
+                .order_by().aggregate(
+                    count=Count('pk'),
+                    last_modified=Max(self.modified_field),
+                )
+            last_modified = stats['last_modified']
+            etag = make_etag(
+                self.request.build_absolute_uri(),
+                stats['count'],
+                last_modified and last_modified.isoformat(),
+            )
+            return etag, last_modified
+
+        instance = self.get_object()
+        last_modified = getattr(instance, self.modified_field)
+        parts = [self.request.path, instance.pk, last_modified.isoformat()]
+        query = self.request.META.get('QUERY_STRING')
+        if self.request.method in ('GET', 'HEAD') and query:
+            # Query parameters, such as sparse fieldsets, may change the
+            # representation.
+            parts.append(query)
+        return make_etag(*parts), last_modified
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        """Answer request preconditions, calling handler if they pass."""
+        if self.action not in self.conditional_actions:
+            return handler(request, *args, **kwargs)
+
+        etag, last_modified = self.get_validators()
+        response = check_preconditions(request, etag, last_modified)
+        if response is not None:
+            return response
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            if request.method not in ('GET', 'HEAD'):
+                # The object was saved, describe its new state.
+                etag, last_modified = self.get_validators()
+            response['ETag'] = etag
+            if last_modified:
+                response['Last-Modified'] = http_date(
+                    last_modified.timestamp()
+                )
+
+        return response
+
+
+class ConditionalRetrieveMixin(ConditionalMixin):
+    """Answer conditional requests for retrieved objects too."""
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs,
+        )
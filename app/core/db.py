@@ -0,0 +1,147 @@
+"""
+Helpers for loading and deleting rows in bulk.
+"""
+import csv
+import io
+
+from django.db import connections
+from django.db.models import Max
+
+
+def allocate_ids(model, count, using='default'):
+    """
+    Reserve count primary keys of model, for inserts that can't return
+    the keys they generate.
+    """
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT nextval(pg_get_serial_sequence(%s, %s)) '
+                'FROM generate_series(1, %s)',
+                [model._meta.db_table, model._meta.pk.column, count],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    # Without sequences continue after the highest key, callers must hold
+    # the transaction until the rows are inserted.
+    last = model._default_manager.using(using) \
+        .aggregate(last=Max('pk'))['last'] or 0
+    return list(range(last + 1, last + 1 + count))
+
+
+def can_copy(using='default'):
+    """Return whether rows can be loaded with COPY."""
+    return connections[using].vendor == 'postgresql'
+
+
+def _columns(connection, model, fields):
+    """Return quoted column names of model fields."""
+    return ', '.join(
+        connection.ops.quote_name(model._meta.get_field(name).column)
+        for name in fields
+    )
+
+
+def prepare_value(model, field, value, using='default'):
+    """Return value of a model field as stored in the database."""
+    return model._meta.get_field(field).get_db_prep_save(
+        value,
+        connections[using],
+    )
+
+
+def copy_rows(model, fields, rows, using='default'):
+    """
+    Insert rows of database values with a single COPY statement.
+
+    Only fields are written, so every other column must have a database
+    default or be filled by a trigger, and no value may be null.
+    """
+    connection = connections[using]
+    buffer = io.StringIO()
+    csv.writer(buffer, quoting=csv.QUOTE_ALL).writerows(rows)
+    buffer.seek(0)
+
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            f'COPY {connection.ops.quote_name(model._meta.db_table)} '
+            f'({_columns(connection, model, fields)}) '
+            f'FROM STDIN WITH (FORMAT csv)',
+            buffer,
+        )
+
+
+def insert_rows(model, fields, rows, using='default'):
+    """
+    Insert rows of database values with a prepared INSERT, skipping the
+    per object overhead of bulk_create().
+    """
+    connection = connections[using]
+    placeholders = ', '.join(['%s'] * len(fields))
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {connection.ops.quote_name(model._meta.db_table)} '
+            f'({_columns(connection, model, fields)}) '
+            f'VALUES ({placeholders})',
+            rows,
+        )
+
+
+def copy_objects(model, objs, fields, using='default'):
+    """
+    Insert model instances with a single COPY statement.
+
+    Values are not prepared by pre_save(), automatic timestamps must be
+    set by the caller.
+    """
+    connection = connections[using]
+    fields = [model._meta.get_field(name) for name in fields]
+    copy_rows(
+        model,
+        [field.name for field in fields],
+        (
+            [
+                field.get_db_prep_save(getattr(obj, field.attname), connection)
+                for field in fields
+            ]
+            for obj in objs
+        ),
+        using,
+    )
+
+
+def delete_rows(model, pks, using='default'):
+    """
+    Delete rows of model by primary key with a single DELETE, sending no
+    signals and cascading nothing. Return the number of rows deleted.
+
+    Callers do what the delete signals would. Models referenced by a
+    foreign key are refused, and many-to-many links to the rows must be
+    deleted first, or the database rejects the statement.
+    """
+    referenced = [
+        rel.related_model._meta.label
+        for rel in model._meta.related_objects
+        if not rel.many_to_many
+    ]
+    if referenced:
+        raise ValueError(
+            f'{model._meta.label} rows are referenced by '
+            f'{", ".join(referenced)}.'
+        )
+    pks = list(pks)
+    if not pks:
+        return 0
+
+    connection = connections[using]
+    placeholders = ', '.join(['%s'] * len(pks))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {connection.ops.quote_name(model._meta.db_table)} '
+            f'WHERE {connection.ops.quote_name(model._meta.pk.column)} '
+            f'IN ({placeholders})',
+            [prepare_value(model, model._meta.pk.name, pk, using)
+             for pk in pks],
+        )
+        return cursor.rowcount
@@ -0,0 +1,110 @@
+"""
+Password hashing in a bounded pool of worker processes.
+
+Hashing a password takes tens of milliseconds of CPU on purpose, so a burst
+of logins or signups used to take every web worker with it. Passwords are
+hashed and checked by PASSWORD_HASH_WORKERS processes instead. At most
+PASSWORD_HASH_QUEUE hashes are queued or running per web process, and
+requests beyond that fail at once with a 429.
+"""
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework.exceptions import Throttled
+
+_pool = None
+_slots = None
+_lock = threading.Lock()
+
+
+class HashingBusy(Throttled):
+    """Raised when the hashing pool has no room for another password."""
+    default_detail = _('Too many logins in progress.')
+    default_code = 'hashing_busy'
+
+
+def _get_pool():
+    """Return the executor and its queue slots, starting them if needed."""
+    global _pool, _slots
+    with _lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(settings.PASSWORD_HASH_WORKERS)
+            _slots = threading.BoundedSemaphore(settings.PASSWORD_HASH_QUEUE)
+
+        return _pool, _slots
+
+
+def shutdown():
+    """Stop the worker processes, the next hash starts new ones."""
+    global _pool
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def run(function, *args):
+    """
+    Return function(*args) computed by a worker process, or inline when
+    PASSWORD_HASH_WORKERS is 0. Raise HashingBusy when the queue is full
+    or the result takes longer than PASSWORD_HASH_TIMEOUT seconds.
+    """
+    if not settings.PASSWORD_HASH_WORKERS:
+        return function(*args)
+
+    pool, slots = _get_pool()
+    if not slots.acquire(blocking=False):
+        raise HashingBusy(wait=1)
+    try:
+        future = pool.submit(function, *args)
+    except BrokenProcessPool:
+        # A worker died, the next hash starts new ones.
+        slots.release()
+        shutdown()
+        return function(*args)
+    # The slot is held until the worker is done, even if nobody waits
+    # for the result anymore.
+    future.add_done_callback(lambda future: slots.release())
+
+    try:
+        return future.result(timeout=settings.PASSWORD_HASH_TIMEOUT)
+    except FutureTimeoutError:
+        raise HashingBusy(wait=1)
+
+
+def make_password(password):
+    """Return the hash of password, see django.contrib.auth.hashers."""
+    if password is None:
+        # Unusable passwords take no hashing.
+        return hashers.make_password(None)
+
+    return run(hashers.make_password, password)
+
+
+def check_password(password, encoded, setter=None):
+    """
+    Return whether password matches encoded, calling setter with the
+    password when the hash needs an upgrade, like
+    django.contrib.auth.hashers.check_password.
+    """
+    if password is None or not hashers.is_password_usable(encoded):
+        return False
+    try:
+        hasher = hashers.identify_hasher(encoded)
+    except ValueError:
+        return False
+
+    is_correct = run(hashers.check_password, password, encoded)
+    preferred = hashers.get_hasher('default')
+    must_update = hasher.algorithm != preferred.algorithm or \
+        preferred.must_update(encoded)
+    if setter and is_correct and must_update:
+        setter(password)
+
+    return is_correct
@@ -0,0 +1,101 @@
+"""
+Helpers for commands importing rows from NDJSON or CSV files.
+"""
+import csv
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+
+from rest_framework.exceptions import ValidationError
+
+
+def read_ndjson(stream):
+    """
+    Yield one row per non-blank line, or a ValidationError for a line
+    that is no JSON.
+    """
+    for line in stream:
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except ValueError as exc:
+                yield ValidationError(f'Invalid JSON: {exc}')
+
+
+def read_csv(stream):
+    """Yield CSV rows as dicts."""
+    yield from csv.DictReader(stream)
+
+
+READERS = {'ndjson': read_ndjson, 'csv': read_csv}
+
+
+def chunks(rows, size):
+    """Yield lists of up to size rows."""
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class ImportCommand(BaseCommand):
+    """
+    Base of commands importing the rows of a file in chunks.
+
+    Readers yield a ValidationError in place of a row they can't decode,
+    so it is reported and skipped like a row failing validation.
+    """
+    readers = READERS
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to import, - for stdin.')
+        parser.add_argument(
+            '--format',
+            choices=list(self.readers),
+            help='Format of the file, guessed from its extension.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Number of rows loaded per transaction.',
+        )
+
+    @contextmanager
+    def open_rows(self, options):
+        """Yield the rows of the file to import, numbered from 1."""
+        path = options['path']
+        file_format = options['format'] or \
+            os.path.splitext(path)[1].lstrip('.').lower()
+        if file_format not in self.readers:
+            raise CommandError('Unknown format, use --format.')
+
+        stream = sys.stdin if path == '-' else open(path, newline='')
+        with stream:
+            self.started = time.monotonic()
+            yield enumerate(self.readers[file_format](stream), start=1)
+
+    def check_row(self, row):
+        """Raise the ValidationError a reader yielded for row."""
+        if isinstance(row, ValidationError):
+            raise row
+        if not isinstance(row, dict):
+            raise ValidationError('Expected an object.')
+
+    def skip_row(self, number, exc):
+        """Report a row skipped for the ValidationError exc."""
+        self.stderr.write(f'Row {number}: {exc.detail}')
+
+    def report(self, imported, skipped):
+        """Report progress and throughput."""
+        elapsed = time.monotonic() - self.started
+        rate = (imported + skipped) / elapsed if elapsed else 0
+        self.stdout.write(
+            f'{imported} imported, {skipped} skipped, {rate:.0f} rows/s'
+        )
@@ -0,0 +1,112 @@
+"""
+Django command to benchmark the API endpoints.
+"""
+import json
+import platform
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+
+from core.benchmark import compare, run_benchmarks
+
+
+def _sizes(value):
+    return [int(size) for size in value.split(',')]
+
+
+class Command(BaseCommand):
+    """Django command to benchmark endpoints against seeded data."""
+    help = 'Benchmark API endpoints in-process on a temporary database, ' \
+           'optionally comparing results with a baseline.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            type=_sizes,
+            default=[10, 100, 1000],
+            help='Comma separated numbers of recipes to seed.',
+        )
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument(
+            '--scenario',
+            action='append',
+            dest='scenarios',
+            help='Benchmark only this scenario, may be repeated. The '
+                 '`json` scenario compares the JSON backends, and the '
+                 '`login` one logs in from concurrent clients.',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=8,
+            help='Number of clients of the `login` scenario.',
+        )
+        parser.add_argument('--output', help='File to write results to.')
+        parser.add_argument(
+            '--baseline',
+            help='Results file to compare with.',
+        )
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=0.2,
+            help='Allowed growth of median latency over the baseline.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        # Like the test runner, work on a throwaway copy of the database.
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            results = run_benchmarks(
+                options['sizes'],
+                options['iterations'],
+                options['warmup'],
+                options['scenarios'],
+                log=self.log,
+                concurrency=options['concurrency'],
+            )
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump({
+                    'environment': {
+                        'python': platform.python_version(),
+                        'django': django.get_version(),
+                        'database': connection.vendor,
+                        'iterations': options['iterations'],
+                    },
+                    'results': results,
+                }, f, indent=2, sort_keys=True)
+
+        if options['baseline']:
+            with open(options['baseline']) as f:
+                baseline = json.load(f)['results']
+            regressions = compare(results, baseline, options['threshold'])
+            if regressions:
+                raise CommandError(
+                    'Regressions found:\n' + '\n'.join(regressions)
+                )
+            self.stdout.write(self.style.SUCCESS('No regressions found.'))
+
+    def log(self, key, result):
+        """Write the result of a benchmark."""
+        self.stdout.write(
+            f'{key:<24} p50 {result["p50_ms"]:8.2f}ms  '
+            f'p90 {result["p90_ms"]:8.2f}ms  '
+            f'p99 {result["p99_ms"]:8.2f}ms  '
+            f'{result["throughput_rps"]:8.0f} req/s  '
+            f'{result["queries"]:3} queries'
+        )
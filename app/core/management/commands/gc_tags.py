@@ -0,0 +1,77 @@
+"""
+Django command to delete tags no recipe uses.
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from recipes.gc import collect_tags
+
+
+class Command(BaseCommand):
+    """Django command to garbage collect orphan tags in batches."""
+    help = 'Delete tags no recipe uses, once older than TAG_GC_GRACE.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of tags deleted per transaction.',
+        )
+        parser.add_argument(
+            '--grace-hours',
+            type=float,
+            help='Keep orphan tags younger than this, TAG_GC_GRACE by '
+                 'default.',
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0,
+            help='Seconds to wait between batches.',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Count orphan tags without deleting them.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        grace = settings.TAG_GC_GRACE
+        if options['grace_hours'] is not None:
+            grace = timedelta(hours=options['grace_hours'])
+        dry_run = options['dry_run']
+
+        started = time.monotonic()
+        total = 0
+        for count in collect_tags(
+            batch_size=options['batch_size'],
+            grace=grace,
+            dry_run=dry_run,
+            pause=options['pause'],
+        ):
+            total += count
+            if options['verbosity'] > 1:
+                self.report(total, started)
+
+        if options['verbosity']:
+            verb = 'Found' if dry_run else 'Deleted'
+            self.stdout.write(self.style.SUCCESS(
+                f'{verb} {total} orphan tags older than {grace}, '
+                f'{self.rate(total, started):.0f} tags/s.'
+            ))
+
+    def rate(self, total, started):
+        """Return the tags handled per second since started."""
+        elapsed = time.monotonic() - started
+        return total / elapsed if elapsed else 0
+
+    def report(self, total, started):
+        """Report progress and throughput."""
+        self.stdout.write(
+            f'{total} tags, {self.rate(total, started):.0f} tags/s'
+        )
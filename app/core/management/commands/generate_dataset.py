@@ -0,0 +1,196 @@
+"""
+Django command to generate a large synthetic dataset for scale testing.
+"""
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from core.db import (
+    allocate_ids,
+    can_copy,
+    copy_rows,
+    insert_rows,
+    prepare_value,
+)
+from core.tests.helpers.fake_user import FakeUser
+from core.tests.helpers.faker import faker
+from recipes.models import Recipe, Tag
+from recipes.tests.helpers.fake_recipe import FakeRecipe
+from users.models import Profile
+
+# Faker is far slower than the inserts, so rows are assembled from a pool
+# of fake values generated once. Rows are inserted as plain tuples, model
+# instances would cost more than the inserts as well.
+POOL_SIZE = 1000
+
+
+class Command(BaseCommand):
+    """Django command to generate users with recipes and tags."""
+    help = 'Generate users, profiles, recipes and tags in bulk.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10)
+        parser.add_argument('--recipes-per-user', type=int, default=100)
+        parser.add_argument('--tags-per-user', type=int, default=10)
+        parser.add_argument(
+            '--tags-per-recipe',
+            type=int,
+            default=3,
+            help='Number of tags linked to each recipe, at most.',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Seed of the random generators, for repeatable datasets.',
+        )
+        parser.add_argument(
+            '--password',
+            default='password',
+            help='Password of every generated user.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=10000,
+            help='Approximate number of recipes inserted per transaction.',
+        )
+        parser.add_argument(
+            '--no-copy',
+            action='store_false',
+            dest='copy',
+            help='Insert rows with INSERT even if COPY is available.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        seed = options['seed']
+        faker.seed_instance(seed)
+        random.seed(seed)
+        self.random = random.Random(seed)
+        self.copy = options['copy'] and can_copy()
+        self.users_pool = [FakeUser() for i in range(POOL_SIZE)]
+        self.recipes_pool = [
+            (
+                fake.title,
+                fake.description,
+                fake.time_minutes,
+                prepare_value(Recipe, 'price', fake.price),
+                fake.link,
+            )
+            for fake in (FakeRecipe() for i in range(POOL_SIZE))
+        ]
+        self.words = list(dict.fromkeys(faker.words(POOL_SIZE)))
+        # Hashing is slow by design, every user shares one hash.
+        self.password = make_password(options['password'])
+
+        users = options['users']
+        recipes_per_user = options['recipes_per_user']
+        users_per_chunk = max(
+            1, options['chunk_size'] // max(1, recipes_per_user),
+        )
+        started = time.monotonic()
+        done = 0
+        while done < users:
+            count = min(users_per_chunk, users - done)
+            with transaction.atomic():
+                self.generate(
+                    count,
+                    recipes_per_user,
+                    options['tags_per_user'],
+                    options['tags_per_recipe'],
+                )
+            done += count
+            elapsed = time.monotonic() - started
+            self.stdout.write(
+                f'{done} users, {done * recipes_per_user} recipes, '
+                f'{done * recipes_per_user / elapsed:.0f} recipes/s'
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated {done} users in {time.monotonic() - started:.1f}s.'
+        ))
+
+    def generate(self, count, recipes_per_user, tags_per_user,
+                 tags_per_recipe):
+        """Insert a chunk of users with their profiles, tags and recipes."""
+        now = prepare_value(Recipe, 'created_at', timezone.now())
+        User = get_user_model()
+
+        user_ids = allocate_ids(User, count)
+        users = []
+        for pk in user_ids:
+            fake = self.random.choice(self.users_pool)
+            users.append((
+                pk, f'{pk}.{fake.email}', fake.name, self.password,
+                True, False, False,
+            ))
+        self.insert(User, [
+            'id', 'email', 'name', 'password',
+            'is_active', 'is_staff', 'is_superuser',
+        ], users)
+        self.insert(
+            Profile,
+            ['user', 'bio', 'image', 'image_variants', 'short_desc'],
+            [(pk, '', '', '{}', '') for pk in user_ids],
+        )
+
+        tag_ids = iter(allocate_ids(Tag, count * tags_per_user))
+        user_tags = {
+            user_id: [next(tag_ids) for i in range(tags_per_user)]
+            for user_id in user_ids
+        }
+
+        recipe_ids = iter(allocate_ids(Recipe, count * recipes_per_user))
+        recipes = []
+        links = []
+        counts = dict.fromkeys(
+            (pk for pks in user_tags.values() for pk in pks), 0,
+        )
+        picked = min(tags_per_recipe, tags_per_user)
+        for user_id in user_ids:
+            for i in range(recipes_per_user):
+                pk = next(recipe_ids)
+                recipes.append(
+                    (pk, user_id) + self.random.choice(self.recipes_pool) +
+                    (now, now)
+                )
+                linked = self.random.sample(user_tags[user_id], picked)
+                links += [(pk, tag_id) for tag_id in linked]
+                for tag_id in linked:
+                    counts[tag_id] += 1
+
+        self.insert(
+            Tag,
+            ['id', 'user', 'name', 'recipe_count', 'created_at', 'updated_at'],
+            [
+                (pk, user_id, self.tag_name(i), counts[pk], now, now)
+                for user_id, pks in user_tags.items()
+                for i, pk in enumerate(pks)
+            ],
+        )
+        self.insert(Recipe, [
+            'id', 'user', 'title', 'description', 'time_minutes', 'price',
+            'link', 'created_at', 'updated_at',
+        ], recipes)
+        self.insert(Recipe.tags.through, ['recipe', 'tag'], links)
+
+    def tag_name(self, index):
+        """Return a distinct tag name for each index."""
+        word = self.words[index % len(self.words)]
+        if index < len(self.words):
+            return word
+
+        return f'{word}-{index // len(self.words)}'
+
+    def insert(self, model, fields, rows):
+        """Insert rows of database values with COPY if possible."""
+        if self.copy:
+            copy_rows(model, fields, rows)
+        else:
+            insert_rows(model, fields, rows)
@@ -0,0 +1,173 @@
+"""
+Django command to import recipes of a user from NDJSON or CSV.
+"""
+import json
+import os
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from rest_framework.exceptions import ValidationError
+
+from core import imports
+from core.cache import bump_user_version
+from core.db import allocate_ids, can_copy, copy_objects
+from recipes.models import Recipe
+from recipes.serializers import RecipeDetailSerializer
+from recipes.utils import bulk_set_tags
+
+COPY_FIELDS = [
+    'id', 'user', 'title', 'description', 'time_minutes', 'price', 'link',
+    'created_at', 'updated_at',
+]
+
+
+def read_csv(stream):
+    """
+    Yield CSV rows, with tag names given as a JSON array, or a
+    ValidationError for a row whose tags are no JSON.
+    """
+    for row in imports.read_csv(stream):
+        try:
+            row['tags'] = json.loads(row.get('tags') or '[]')
+        except ValueError as exc:
+            yield ValidationError({'tags': f'Invalid JSON: {exc}'})
+        else:
+            yield row
+
+
+class Command(imports.ImportCommand):
+    """Django command to import recipes in chunks."""
+    help = 'Import recipes of a user from an NDJSON or CSV file, ' \
+           'like the ones written by the recipe export.'
+
+    readers = {**imports.READERS, 'csv': read_csv}
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            '--user',
+            required=True,
+            help='Email of the user owning the recipes.',
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='File recording the rows done, to resume an import.',
+        )
+        parser.add_argument(
+            '--no-copy',
+            action='store_false',
+            dest='copy',
+            help='Load rows with INSERT even if COPY is available.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        try:
+            self.user = get_user_model().objects.get(email=options['user'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f'User {options["user"]} does not exist.')
+
+        self.copy = options['copy'] and can_copy()
+        self.serializer = RecipeDetailSerializer()
+        checkpoint = options['checkpoint']
+        done = self.read_checkpoint(checkpoint)
+
+        with self.open_rows(options) as rows:
+            # Rows of a previous run are parsed again but not loaded.
+            rows = islice(rows, done, None)
+            imported = skipped = 0
+            for chunk in imports.chunks(rows, options['chunk_size']):
+                loaded = self.load(chunk)
+                imported += loaded
+                skipped += len(chunk) - loaded
+                done = chunk[-1][0]
+                self.write_checkpoint(checkpoint, done)
+                self.report(imported, skipped)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {imported} recipes, skipped {skipped} invalid rows.'
+        ))
+
+    def load(self, chunk):
+        """Validate and insert a chunk of rows, returning the count loaded."""
+        recipes = []
+        tags = []
+        for number, row in chunk:
+            try:
+                attrs = self.validate(row)
+            except ValidationError as exc:
+                self.skip_row(number, exc)
+                continue
+            tags.append([tag['name'] for tag in attrs.pop('tags', [])])
+            recipes.append(Recipe(user=self.user, **attrs))
+
+        if not recipes:
+            return 0
+
+        with transaction.atomic():
+            self.insert(recipes)
+            bulk_set_tags(self.user, [
+                (recipe, [], names) for recipe, names in zip(recipes, tags)
+            ])
+        # Bulk inserts send no signals, invalidate responses here.
+        bump_user_version(self.user.pk)
+
+        return len(recipes)
+
+    def validate(self, row):
+        """Return validated recipe attributes of row."""
+        self.check_row(row)
+        row = {key: value for key, value in row.items() if key != 'id'}
+        tags = row.get('tags')
+        if tags is None:
+            row['tags'] = []
+        elif isinstance(tags, list):
+            # Exports list tag names, the serializer expects objects.
+            row['tags'] = [
+                {'name': tag} if isinstance(tag, str) else tag
+                for tag in tags
+            ]
+
+        return self.serializer.run_validation(row)
+
+    def insert(self, recipes):
+        """Insert recipes, setting their primary keys."""
+        if self.copy:
+            now = timezone.now()
+            for recipe, pk in zip(recipes, allocate_ids(Recipe, len(recipes))):
+                recipe.pk = pk
+                recipe.created_at = recipe.updated_at = now
+            copy_objects(Recipe, recipes, COPY_FIELDS)
+        elif connection.features.can_return_rows_from_bulk_insert:
+            Recipe.objects.bulk_create(recipes)
+        else:
+            for recipe, pk in zip(recipes, allocate_ids(Recipe, len(recipes))):
+                recipe.pk = pk
+            Recipe.objects.bulk_create(recipes)
+
+    def read_checkpoint(self, checkpoint):
+        """Return the number of rows done by a previous run."""
+        if not checkpoint or not os.path.exists(checkpoint):
+            return 0
+
+        with open(checkpoint) as f:
+            done = int(f.read().strip() or 0)
+        self.stdout.write(f'Resuming after row {done}.')
+        return done
+
+    def write_checkpoint(self, checkpoint, done):
+        """
+        Record the rows done, replacing the checkpoint atomically. It is
+        written after the chunk commits, so a run killed in between loads
+        that chunk again when resumed.
+        """
+        if not checkpoint:
+            return
+
+        with open(f'{checkpoint}.tmp', 'w') as f:
+            f.write(str(done))
+        os.replace(f'{checkpoint}.tmp', checkpoint)
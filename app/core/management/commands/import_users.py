@@ -0,0 +1,168 @@
+"""
+Django command to import users from NDJSON or CSV.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+from core import imports
+from core.db import allocate_ids
+from users.models import Profile
+
+
+class UserRowSerializer(serializers.Serializer):
+    """Serializer validating a row, without querying for existing users."""
+    email = serializers.EmailField(max_length=255)
+    name = serializers.CharField(max_length=255)
+    password = serializers.CharField(
+        min_length=5,
+        required=False,
+        trim_whitespace=False,
+    )
+    bio = serializers.CharField(max_length=600, required=False, default='')
+    short_desc = serializers.CharField(
+        max_length=255,
+        required=False,
+        default='',
+    )
+
+
+def read_csv(stream):
+    """Yield CSV rows, leaving out empty columns."""
+    for row in imports.read_csv(stream):
+        yield {key: value for key, value in row.items() if value}
+
+
+class Command(imports.ImportCommand):
+    """Django command to import users with their profiles in chunks."""
+    help = 'Import users from an NDJSON or CSV file of email, name, ' \
+           'password, bio and short_desc. Users without a password get ' \
+           'an unusable one, existing emails are skipped, so an ' \
+           'interrupted import can be run again.'
+
+    readers = {**imports.READERS, 'csv': read_csv}
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count(),
+            help='Number of processes hashing passwords, 0 hashes them '
+                 'inline.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        self.serializer = UserRowSerializer()
+        self.seen = set()
+        self.workers = options['workers']
+        pool = ProcessPoolExecutor(self.workers) if self.workers else None
+
+        self.imported = self.skipped = 0
+        try:
+            with self.open_rows(options) as rows:
+                pending = None
+                for chunk in imports.chunks(rows, options['chunk_size']):
+                    # The passwords of this chunk are hashed while the
+                    # previous one is loaded.
+                    prepared = self.prepare(chunk, pool)
+                    if pending:
+                        self.load(*pending)
+                    pending = prepared
+                if pending:
+                    self.load(*pending)
+        finally:
+            if pool:
+                pool.shutdown()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {self.imported} users, skipped {self.skipped} rows.'
+        ))
+
+    def prepare(self, chunk, pool):
+        """
+        Validate a chunk of rows and start hashing their passwords. Return
+        the number of rows, the valid ones and an iterator of their hashes.
+        """
+        valid = []
+        for number, row in chunk:
+            try:
+                attrs = self.validate(row)
+            except ValidationError as exc:
+                self.skip_row(number, exc)
+                continue
+            valid.append((number, attrs))
+
+        passwords = [attrs.pop('password', None) for number, attrs in valid]
+        if pool:
+            hashes = pool.map(
+                make_password,
+                passwords,
+                chunksize=max(1, len(passwords) // (self.workers * 4)),
+            )
+        else:
+            hashes = map(make_password, passwords)
+
+        return len(chunk), valid, hashes
+
+    def validate(self, row):
+        """Return validated user attributes of row."""
+        self.check_row(row)
+        attrs = self.serializer.run_validation(row)
+        attrs['email'] = get_user_model().objects.normalize_email(
+            attrs['email'],
+        )
+        if attrs['email'] in self.seen:
+            raise ValidationError('Duplicate email.')
+        self.seen.add(attrs['email'])
+
+        return attrs
+
+    def load(self, count, valid, hashes):
+        """
+        Insert the users of the valid rows of a chunk of count rows with
+        their profiles, skipping existing emails, and report progress.
+        """
+        User = get_user_model()
+        existing = set(User.objects.filter(
+            email__in=[attrs['email'] for number, attrs in valid],
+        ).values_list('email', flat=True))
+
+        users = []
+        profiles = []
+        for (number, attrs), password in zip(valid, hashes):
+            if attrs['email'] in existing:
+                self.stderr.write(f'Row {number}: {attrs["email"]} exists.')
+                continue
+            profiles.append(Profile(
+                bio=attrs.pop('bio'),
+                short_desc=attrs.pop('short_desc'),
+            ))
+            users.append(User(password=password, **attrs))
+
+        if users:
+            # Bulk inserts send no signals, profiles are created here.
+            with transaction.atomic():
+                self.insert(users)
+                for user, profile in zip(users, profiles):
+                    profile.user = user
+                Profile.objects.bulk_create(profiles)
+
+        self.imported += len(users)
+        self.skipped += count - len(users)
+        self.report(self.imported, self.skipped)
+
+    def insert(self, users):
+        """Insert users, setting their primary keys."""
+        User = get_user_model()
+        if not connection.features.can_return_rows_from_bulk_insert:
+            for user, pk in zip(users, allocate_ids(User, len(users))):
+                user.pk = pk
+        User.objects.bulk_create(users)
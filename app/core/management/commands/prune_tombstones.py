@@ -0,0 +1,42 @@
+"""
+Django command to delete tombstones older than the sync retention.
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from recipes.models import Tombstone
+
+
+class Command(BaseCommand):
+    """Django command to prune tombstones in batches."""
+    help = 'Delete tombstones older than SYNC_TOMBSTONE_RETENTION.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of tombstones deleted per statement.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        cutoff = timezone.now() - settings.SYNC_TOMBSTONE_RETENTION
+        expired = Tombstone.objects.filter(deleted_at__lt=cutoff) \
+            .order_by('deleted_at')
+        batch_size = options['batch_size']
+
+        # Small batches keep each delete, and the locks it holds, short.
+        deleted = 0
+        while True:
+            ids = list(expired.values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                break
+            Tombstone.objects.filter(pk__in=ids).delete()
+            deleted += len(ids)
+
+        if options['verbosity']:
+            self.stdout.write(self.style.SUCCESS(
+                f'Deleted {deleted} tombstones older than {cutoff}.'
+            ))
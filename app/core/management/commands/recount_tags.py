@@ -0,0 +1,62 @@
+"""
+Django command to repair the recipe counters of tags.
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from core.cache import bump_user_version
+from recipes.models import Tag
+from recipes.utils import count_recipes
+
+
+class Command(BaseCommand):
+    """Django command to recount recipes of tags in batches."""
+    help = 'Recompute the recipe_count of tags from the recipe links.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of tags recounted per transaction.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        batch_size = options['batch_size']
+        tags = Tag.objects.order_by('pk')
+
+        # Walk the tags by primary key, a short transaction per batch.
+        checked = fixed = 0
+        last = 0
+        while True:
+            ids = list(
+                tags.filter(pk__gt=last).values_list('pk', flat=True)
+                [:batch_size]
+            )
+            if not ids:
+                break
+            last = ids[-1]
+            checked += len(ids)
+            with transaction.atomic():
+                drifted = list(
+                    tags.filter(pk__in=ids)
+                    .exclude(recipe_count=count_recipes())
+                    .select_for_update()
+                    .values_list('pk', 'user_id')
+                )
+                if not drifted:
+                    continue
+                Tag.objects.filter(pk__in=[pk for pk, _ in drifted]).update(
+                    recipe_count=count_recipes(),
+                    updated_at=timezone.now(),
+                )
+                for user_id in {user_id for _, user_id in drifted}:
+                    bump_user_version(user_id)
+            fixed += len(drifted)
+
+        if options['verbosity']:
+            self.stdout.write(self.style.SUCCESS(
+                f'Recounted {checked} tags, fixed {fixed}.'
+            ))
@@ -0,0 +1,226 @@
+"""
+Keyset (cursor) pagination for API list views.
+"""
+import binascii
+import json
+import math
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginate by seeking past the ordering values of the last seen row.
+
+    Unlike OFFSET pagination the cost of a page does not depend on how
+    deep it is, as long as an index covers the ordering. The ordering is
+    taken from the view `get_ordering()` method or `ordering` attribute
+    and must end with a unique field so every row has a distinct position.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_size = api_settings.PAGE_SIZE
+    # Falls back to the MAX_PAGE_SIZE setting when not set.
+    max_page_size = None
+    ordering = ('-id',)
+    invalid_cursor_message = _('Invalid cursor')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.ordering = self.get_ordering(view)
+        position, self.reverse = self.decode_cursor(request)
+
+        ordering = self.ordering
+        if self.reverse:
+            ordering = tuple(_invert(field) for field in ordering)
+
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            position = self.clean_position(queryset, position)
+            queryset = queryset.filter(self.seek(ordering, position))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if self.reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        return self.page
+
+    def get_ordering(self, view):
+        """Return the ordering fields used by the view."""
+        if hasattr(view, 'get_ordering'):
+            return tuple(view.get_ordering())
+
+        return tuple(getattr(view, 'ordering', self.ordering))
+
+    def get_page_size(self, request):
+        """Return the requested page size, capped to max_page_size."""
+        page_size = self.page_size
+        if self.page_size_query_param in request.query_params:
+            try:
+                requested = int(
+                    request.query_params[self.page_size_query_param]
+                )
+            except ValueError:
+                requested = 0
+            if requested > 0:
+                page_size = requested
+
+        max_page_size = self.max_page_size or \
+            getattr(settings, 'MAX_PAGE_SIZE', None)
+        if page_size and max_page_size:
+            page_size = min(page_size, max_page_size)
+
+        return page_size
+
+    def seek(self, ordering, position):
+        """Return a filter matching rows that come after position."""
+        condition = Q()
+        equal = Q()
+        for field, value in zip(ordering, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+
+        return condition
+
+    def clean_position(self, queryset, position):
+        """
+        Return the values of position converted by their ordering fields,
+        raising NotFound for values those fields don't accept.
+        """
+        cleaned = []
+        for field, value in zip(self.ordering, position):
+            # Cursors hold scalars, fields would accept other JSON values
+            # like objects by their string representation.
+            if isinstance(value, bool) or \
+                    not isinstance(value, (str, int, float)) or \
+                    isinstance(value, float) and not math.isfinite(value):
+                raise NotFound(self.invalid_cursor_message)
+            try:
+                value = self.get_field(queryset, field.lstrip('-')) \
+                    .to_python(value)
+            except ValidationError:
+                raise NotFound(self.invalid_cursor_message)
+            cleaned.append(value)
+
+        return cleaned
+
+    def get_field(self, queryset, name):
+        """Return the model field, or annotation, ordered by name."""
+        if name in queryset.query.annotations:
+            return queryset.query.annotations[name].output_field
+
+        return queryset.model._meta.get_field(name)
+
+    def get_position(self, item):
+        """Return the ordering values of an item."""
+        fields = [field.lstrip('-') for field in self.ordering]
+        if isinstance(item, dict):
+            return [item[field] for field in fields]
+
+        return [getattr(item, field) for field in fields]
+
+    def decode_cursor(self, request):
+        """Return position and direction encoded in the request cursor."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None, False
+
+        try:
+            cursor = json.loads(urlsafe_b64decode(encoded.encode('ascii')))
+            position, reverse = cursor['p'], bool(cursor.get('r'))
+        except (TypeError, KeyError, ValueError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+
+        if not isinstance(position, list) or \
+                len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        return position, reverse
+
+    def encode_cursor(self, position, reverse):
+        """Return an opaque URL for the cursor."""
+        cursor = {'p': position}
+        if reverse:
+            cursor['r'] = 1
+        encoded = urlsafe_b64encode(
+            json.dumps(cursor, separators=(',', ':')).encode('utf-8')
+        ).decode('ascii')
+
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+
+        return self.encode_cursor(self.get_position(self.page[-1]), False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            url = self.request.build_absolute_uri()
+            return remove_query_param(url, self.cursor_query_param)
+
+        return self.encode_cursor(self.get_position(self.page[0]), True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'previous': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'The pagination cursor value.',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Number of results to return per page.',
+                'schema': {'type': 'integer'},
+            },
+        ]
+
+
+def _invert(field):
+    """Return field ordering in the opposite direction."""
+    return field[1:] if field.startswith('-') else f'-{field}'
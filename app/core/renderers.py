@@ -0,0 +1,44 @@
+"""
+JSON renderer using orjson when it is installed.
+"""
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Render JSON with orjson, falling back to the stdlib encoder when it is
+    not installed, for indented output and for data orjson rejects.
+
+    The output matches JSONRenderer: compact, UTF-8 with U+2028 and U+2029
+    escaped, and types orjson doesn't handle the same way, like Decimal
+    and datetime, encoded by the DRF encoder.
+    """
+    orjson_options = 0
+    if orjson is not None:
+        orjson_options = orjson.OPT_NON_STR_KEYS | \
+            orjson.OPT_PASSTHROUGH_DATETIME
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """Render data into JSON, returning a bytestring."""
+        if orjson is None or data is None or self.ensure_ascii or \
+                not self.compact or \
+                self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=self.orjson_options,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Keep the output a strict javascript subset, like JSONRenderer.
+        return ret.replace('\u2028'.encode(), b'\\u2028') \
+            .replace('\u2029'.encode(), b'\\u2029')
@@ -0,0 +1,9 @@
+"""
+OpenAPI extensions describing the custom classes of core.
+"""
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+    """Describe CachedJWTAuthentication as the bearer JWT scheme."""
+    target_class = 'core.authentication.CachedJWTAuthentication'
@@ -0,0 +1,88 @@
+"""
+Fast read path for serializers, from values() rows.
+"""
+from rest_framework import serializers
+
+# Fields whose to_representation() returns database values unchanged.
+PLAIN_FIELDS = (serializers.CharField, serializers.IntegerField)
+
+
+class ValuesSerializerMixin:
+    """
+    Represent values() rows without building model instances or serializers
+    for every row.
+
+    The output is the same as to_representation() for fields sourced from
+    model columns, and for nested serializers using this mixin, given as
+    rows grouped by the primary key of the parent row. Field metadata is
+    computed once per class.
+    """
+
+    @classmethod
+    def get_values_fields(cls, names=None):
+        """
+        Return (name, source, converter, nested class) of each field, or
+        only of the fields in names.
+        """
+        fields = cls.__dict__.get('_values_fields')
+        if fields is None:
+            fields = []
+            for name, field in cls().fields.items():
+                if field.write_only:
+                    continue
+                if isinstance(field, serializers.ListSerializer):
+                    fields.append((name, None, None, type(field.child)))
+                elif type(field) in PLAIN_FIELDS:
+                    fields.append((name, field.source, None, None))
+                else:
+                    fields.append(
+                        (name, field.source, field.to_representation, None)
+                    )
+            cls._values_fields = fields
+
+        if names is None:
+            return fields
+
+        return [field for field in fields if field[0] in names]
+
+    @classmethod
+    def get_values_sources(cls, names=None):
+        """Return the values() names needed to represent rows."""
+        return [
+            source for name, source, converter, nested
+            in cls.get_values_fields(names) if nested is None
+        ]
+
+    @classmethod
+    def get_values_nested(cls, names=None):
+        """Return the names of nested fields."""
+        return [
+            name for name, source, converter, nested
+            in cls.get_values_fields(names) if nested is not None
+        ]
+
+    @classmethod
+    def represent_rows(cls, rows, nested=None, names=None):
+        """
+        Return representations of rows, with every field or only the
+        fields in names. nested maps names of nested fields to their rows
+        grouped by the primary key of the parent row.
+        """
+        fields = cls.get_values_fields(names)
+        pk = cls.Meta.model._meta.pk.attname
+        data = []
+        for row in rows:
+            item = {}
+            for name, source, converter, nested_class in fields:
+                if nested_class is not None:
+                    item[name] = nested_class.represent_rows(
+                        nested[name].get(row[pk], ()),
+                    )
+                    continue
+                value = row[source]
+                if converter is not None and value is not None:
+                    value = converter(value)
+                item[name] = value
+            data.append(item)
+
+        return data
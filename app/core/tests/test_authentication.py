@@ -0,0 +1,161 @@
+"""
+Tests for the cached authentication classes.
+"""
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from drf_spectacular.generators import SchemaGenerator
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.authentication import LRUCache, user_cache
+from core.cache import get_response_cache
+from core.tests.helpers.fake_user import FakeUser
+from users.serializers import TokenObtainPairSerializer
+from users.tests.test_user_api import create_user
+
+
+ME_URL = reverse('users:me')
+RECIPES_URL = reverse('recipes:recipe-list')
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    """Test resolving users of JWT requests from the cache."""
+
+    def setUp(self):
+        user_cache.clear()
+        self.fake_user = create_user(**FakeUser().as_dict())
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.fake_user)}'
+        )
+
+    def test_user_lookup_cached(self):
+        """Test only the first request looks the user up."""
+        with self.assertNumQueries(1):
+            self.client.get(ME_URL)
+        with self.assertNumQueries(0):
+            res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['email'], self.fake_user.email)
+
+    def test_saved_user_reloaded(self):
+        """Test changes of the user are seen by the next request."""
+        self.client.get(ME_URL)
+        self.fake_user.name = 'Renamed'
+        self.fake_user.save()
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.data['name'], 'Renamed')
+
+    def test_deactivated_user_rejected(self):
+        """Test a deactivated user can't authenticate anymore."""
+        self.client.get(ME_URL)
+        self.fake_user.is_active = False
+        self.fake_user.save()
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_update_changes_stored_user(self):
+        """Test updating through a cached user keeps other fields."""
+        self.client.get(ME_URL)
+
+        res = self.client.patch(ME_URL, {'name': 'Renamed'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.fake_user.refresh_from_db()
+        self.assertEqual(self.fake_user.name, 'Renamed')
+        self.assertTrue(self.fake_user.has_usable_password())
+
+    def test_schema_scheme(self):
+        """Test the schema documents the bearer scheme of JWT views."""
+        schema = SchemaGenerator().get_schema(request=None, public=True)
+
+        self.assertIn('jwtAuth', schema['components']['securitySchemes'])
+        self.assertIn(
+            {'jwtAuth': []},
+            schema['paths'][ME_URL]['get']['security'],
+        )
+
+    @override_settings(AUTH_TRUST_JWT_CLAIMS=True)
+    def test_trusted_claims(self):
+        """Test users are built from trusted claims without queries."""
+        token = TokenObtainPairSerializer.get_token(self.fake_user)
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {token.access_token}'
+        )
+
+        with self.assertNumQueries(0):
+            res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['name'], self.fake_user.name)
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    """Test resolving tokens and their users from the cache."""
+
+    def setUp(self):
+        user_cache.clear()
+        self.fake_user = create_user(**FakeUser().as_dict())
+        self.token = Token.objects.create(user=self.fake_user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_token_lookup_cached(self):
+        """Test a repeated request skips the token lookup."""
+        self.client.get(RECIPES_URL)
+        get_response_cache().clear()
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertFalse(any(
+            'authtoken_token' in query['sql'] for query in queries
+        ))
+
+    def test_deleted_token_rejected(self):
+        """Test a deleted token stops authenticating at once."""
+        self.client.get(RECIPES_URL)
+        self.token.delete()
+
+        res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class LRUCacheTests(TestCase):
+    """Test the in-process user cache."""
+
+    @override_settings(AUTH_USER_CACHE_SIZE=2)
+    def test_least_recently_used_evicted(self):
+        """Test the cache keeps its most recently used entries."""
+        cache = LRUCache()
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+
+    @override_settings(AUTH_USER_CACHE_TTL=60)
+    def test_entries_expire(self):
+        """Test entries are dropped once their TTL passed."""
+        cache = LRUCache()
+        with patch('core.authentication.time.monotonic', return_value=0):
+            cache.set('a', 1)
+        with patch('core.authentication.time.monotonic', return_value=61):
+            self.assertIsNone(cache.get('a'))
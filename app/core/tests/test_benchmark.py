@@ -0,0 +1,75 @@
+"""
+Tests for the benchmark helpers.
+"""
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+
+from core.benchmark import compare, percentile, run_benchmarks
+
+
+class BenchmarkHelperTests(SimpleTestCase):
+    """Test computing and comparing benchmark results."""
+
+    def test_percentile(self):
+        """Test percentiles use the nearest rank."""
+        values = list(range(1, 101))
+
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([3], 90), 3)
+
+    def test_compare(self):
+        """Test slower medians and extra queries are regressions."""
+        baseline = {
+            'recipes@10': {'p50_ms': 10, 'queries': 2},
+            'tags@10': {'p50_ms': 10, 'queries': 2},
+        }
+        results = {
+            'recipes@10': {'p50_ms': 11, 'queries': 2},
+            'tags@10': {'p50_ms': 13, 'queries': 3},
+            'me@10': {'p50_ms': 100, 'queries': 9},
+        }
+
+        regressions = compare(results, baseline, 0.2)
+
+        self.assertEqual(len(regressions), 2)
+        self.assertTrue(all(r.startswith('tags@10') for r in regressions))
+
+
+class RunBenchmarksTests(TestCase):
+    """Test running benchmarks."""
+
+    def test_run_benchmarks(self):
+        """Test every scenario is measured for every size."""
+        results = run_benchmarks(
+            [2, 5],
+            iterations=2,
+            warmup=0,
+            names=['recipes_uncached', 'profile'],
+        )
+
+        self.assertEqual(set(results), {
+            'recipes_uncached@2', 'profile@2',
+            'recipes_uncached@5', 'profile@5',
+        })
+        result = results['recipes_uncached@5']
+        self.assertLessEqual(result['p50_ms'], result['p99_ms'])
+        self.assertGreater(result['throughput_rps'], 0)
+        self.assertGreater(result['queries'], 0)
+
+
+class LoginBenchmarkTests(TransactionTestCase):
+    """Test benchmarking logins, from threads seeing committed users."""
+
+    def test_login_benchmark(self):
+        """Test concurrent logins are measured without throttling."""
+        results = run_benchmarks(
+            [1],
+            iterations=3,
+            warmup=0,
+            names=['token', 'login'],
+            concurrency=2,
+        )
+
+        self.assertEqual(set(results), {'token@1', 'login@1'})
+        self.assertGreater(results['login@1']['throughput_rps'], 0)
+        self.assertEqual(results['login@1']['rejected'], 0)
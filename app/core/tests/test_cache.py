@@ -0,0 +1,74 @@
+"""
+Tests for the response cache helpers.
+"""
+import os
+import tempfile
+
+from django.test import SimpleTestCase
+
+from core.cache import (
+    bump_user_version,
+    get_response_cache,
+    get_user_version,
+    LRUFileBasedCache,
+)
+
+
+class UserVersionTests(SimpleTestCase):
+    """Tests for per-user cache versions."""
+
+    def setUp(self):
+        get_response_cache().clear()
+
+    def test_version_is_stable(self):
+        """Test the version does not change until bumped."""
+        self.assertEqual(get_user_version(1), get_user_version(1))
+
+    def test_bump_changes_version_of_user_only(self):
+        """Test bumping a version leaves other users untouched."""
+        first, second = get_user_version(1), get_user_version(2)
+
+        bump_user_version(1)
+
+        self.assertNotEqual(get_user_version(1), first)
+        self.assertEqual(get_user_version(2), second)
+
+    def test_evicted_version_is_never_reused(self):
+        """Test a lost version token is replaced by a new one."""
+        version = get_user_version(1)
+
+        get_response_cache().clear()
+
+        self.assertNotEqual(get_user_version(1), version)
+
+
+class LRUFileBasedCacheTests(SimpleTestCase):
+    """Tests for the LRU file based cache backend."""
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.cache = LRUFileBasedCache(
+            self.dir.name,
+            {'OPTIONS': {'MAX_ENTRIES': 3, 'CULL_FREQUENCY': 3}},
+        )
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_evicts_least_recently_used(self):
+        """Test culling drops the entry that was read least recently."""
+        self.cache.set('first', 1)
+        self.cache.set('second', 2)
+        self.cache.set('third', 3)
+        for key, age in [('first', 30), ('second', 20), ('third', 10)]:
+            fname = self.cache._key_to_file(key)
+            mtime = os.path.getmtime(fname) - age
+            os.utime(fname, (mtime, mtime))
+
+        self.cache.get('first')
+        self.cache.set('fourth', 4)
+
+        self.assertEqual(self.cache.get('first'), 1)
+        self.assertIsNone(self.cache.get('second'))
+        self.assertEqual(self.cache.get('third'), 3)
+        self.assertEqual(self.cache.get('fourth'), 4)
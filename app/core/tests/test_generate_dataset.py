@@ -0,0 +1,68 @@
+"""
+Tests for the generate_dataset command.
+"""
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from recipes.models import Recipe, Tag
+from users.models import Profile
+
+
+def generate(**options):
+    """Run generate_dataset without COPY."""
+    call_command(
+        'generate_dataset',
+        stdout=StringIO(),
+        **{'copy': False, **options},
+    )
+
+
+class GenerateDatasetTests(TestCase):
+    """Test generating a synthetic dataset."""
+
+    def test_generate_dataset(self):
+        """Test every kind of row is generated in chunks."""
+        generate(
+            users=5,
+            recipes_per_user=4,
+            tags_per_user=3,
+            tags_per_recipe=2,
+            chunk_size=8,
+        )
+
+        self.assertEqual(get_user_model().objects.count(), 5)
+        self.assertEqual(Profile.objects.count(), 5)
+        self.assertEqual(Tag.objects.count(), 15)
+        self.assertEqual(Recipe.objects.count(), 20)
+        self.assertEqual(Recipe.tags.through.objects.count(), 40)
+        for recipe in Recipe.objects.prefetch_related('tags'):
+            self.assertEqual(
+                {tag.user_id for tag in recipe.tags.all()},
+                {recipe.user_id},
+            )
+        for tag in Tag.objects.all():
+            self.assertEqual(tag.recipe_count, tag.recipe_set.count())
+
+    def test_users_share_password(self):
+        """Test generated users can log in with the given password."""
+        generate(users=2, recipes_per_user=1, password='secret-pass')
+
+        for user in get_user_model().objects.all():
+            self.assertTrue(user.check_password('secret-pass'))
+
+    def test_same_seed_same_dataset(self):
+        """Test the same seed generates the same recipes again."""
+        def titles():
+            return list(
+                Recipe.objects.order_by('id').values_list('title', flat=True)
+            )
+
+        generate(users=2, recipes_per_user=5, seed=1)
+        first = titles()
+        get_user_model().objects.all().delete()
+        generate(users=2, recipes_per_user=5, seed=1)
+
+        self.assertEqual(titles(), first)
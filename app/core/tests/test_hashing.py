@@ -0,0 +1,89 @@
+"""
+Tests for hashing passwords in the worker pool.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from django.contrib.auth import hashers
+from django.test import SimpleTestCase, override_settings
+
+from core import hashing
+
+
+def hold(event):
+    """Block a worker until event is set, standing in for a slow hash."""
+    event.wait()
+
+
+class HashingTests(SimpleTestCase):
+    """Test hashing and checking passwords."""
+
+    def test_make_and_check_password(self):
+        """Test hashes made by the pool are checked by the pool."""
+        encoded = hashing.make_password('secret')
+
+        self.assertTrue(hashers.check_password('secret', encoded))
+        self.assertTrue(hashing.check_password('secret', encoded))
+        self.assertFalse(hashing.check_password('wrong', encoded))
+
+    def test_unusable_password(self):
+        """Test unusable passwords are never matched."""
+        encoded = hashing.make_password(None)
+
+        self.assertFalse(hashers.is_password_usable(encoded))
+        self.assertFalse(hashing.check_password(None, encoded))
+        self.assertFalse(hashing.check_password('', encoded))
+
+    # Running workers keep the settings they started with.
+    @override_settings(
+        PASSWORD_HASHERS=[
+            'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+            'django.contrib.auth.hashers.MD5PasswordHasher',
+        ],
+        PASSWORD_HASH_WORKERS=0,
+    )
+    def test_outdated_hash_upgraded(self):
+        """Test the setter gets the password of an outdated hash."""
+        encoded = hashers.make_password('secret', hasher='md5')
+        upgraded = []
+
+        self.assertTrue(
+            hashing.check_password('secret', encoded, upgraded.append)
+        )
+        self.assertEqual(upgraded, ['secret'])
+
+    @override_settings(PASSWORD_HASH_WORKERS=0)
+    def test_inline(self):
+        """Test passwords are hashed inline without workers."""
+        with patch('core.hashing._get_pool') as get_pool:
+            encoded = hashing.make_password('secret')
+
+        get_pool.assert_not_called()
+        self.assertTrue(hashers.check_password('secret', encoded))
+
+    def test_busy(self):
+        """Test hashes are rejected at once while the queue is full."""
+        slots = threading.BoundedSemaphore(1)
+        slots.acquire()
+
+        with patch('core.hashing._get_pool', return_value=(None, slots)):
+            with self.assertRaises(hashing.HashingBusy):
+                hashing.make_password('secret')
+
+    @override_settings(PASSWORD_HASH_TIMEOUT=0.01)
+    def test_timeout(self):
+        """Test slow hashes are rejected, keeping their slot until done."""
+        event = threading.Event()
+        # Threads share the event, unlike the worker processes.
+        pool = ThreadPoolExecutor(1)
+        slots = threading.BoundedSemaphore(1)
+
+        with patch('core.hashing._get_pool', return_value=(pool, slots)):
+            with self.assertRaises(hashing.HashingBusy):
+                hashing.run(hold, event)
+            self.assertFalse(slots.acquire(blocking=False))
+            event.set()
+            pool.shutdown(wait=True)
+
+        self.assertTrue(slots.acquire(blocking=False))
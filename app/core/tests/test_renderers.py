@@ -0,0 +1,100 @@
+"""
+Tests for the fast JSON renderer and parser.
+"""
+import datetime
+import uuid
+from decimal import Decimal
+from io import BytesIO
+from unittest import skipIf
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+from django.utils import timezone
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+
+from core.parsers import FastJSONParser
+from core.renderers import FastJSONRenderer, orjson
+
+
+DATA = ReturnList([
+    ReturnDict({
+        'id': 1,
+        'price': Decimal('5.50'),
+        'created_at': datetime.datetime(
+            2022, 9, 5, 19, 15, 30, 123456, tzinfo=timezone.utc,
+        ),
+        'day': datetime.date(2022, 9, 5),
+        'uuid': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+        'title': 'Crème brûlée   line   paragraph "quoted"',
+        'link': None,
+        'tags': [{'id': 2, 'name': 'Ünïcode'}],
+        3: True,
+    }, serializer=None),
+], serializer=None)
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    """Test the fast renderer matches JSONRenderer."""
+
+    @skipIf(orjson is None, 'Requires orjson.')
+    def test_render_matches_json_renderer(self):
+        """Test rendering gives the same bytes as JSONRenderer."""
+        self.assertEqual(
+            FastJSONRenderer().render(DATA),
+            JSONRenderer().render(DATA),
+        )
+
+    def test_render_indented_falls_back(self):
+        """Test indented output is rendered like JSONRenderer."""
+        media_type = 'application/json; indent=4'
+
+        self.assertEqual(
+            FastJSONRenderer().render(DATA, media_type),
+            JSONRenderer().render(DATA, media_type),
+        )
+
+    @patch('core.renderers.orjson', None)
+    def test_render_without_orjson(self):
+        """Test the stdlib encoder is used when orjson is missing."""
+        self.assertEqual(
+            FastJSONRenderer().render(DATA),
+            JSONRenderer().render(DATA),
+        )
+
+    def test_render_none(self):
+        """Test no data renders to no content."""
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+
+class FastJSONParserTests(SimpleTestCase):
+    """Test the fast parser matches JSONParser."""
+
+    def parse(self, parser, content):
+        return parser.parse(BytesIO(content), parser_context={})
+
+    def test_parse_matches_json_parser(self):
+        """Test parsing gives the same data as JSONParser."""
+        content = JSONRenderer().render(DATA)
+
+        self.assertEqual(
+            self.parse(FastJSONParser(), content),
+            self.parse(JSONParser(), content),
+        )
+
+    @patch('core.parsers.orjson', None)
+    def test_parse_without_orjson(self):
+        """Test the stdlib decoder is used when orjson is missing."""
+        self.assertEqual(
+            self.parse(FastJSONParser(), b'{"name": "Vegan"}'),
+            {'name': 'Vegan'},
+        )
+
+    def test_parse_error(self):
+        """Test invalid JSON raises a parse error."""
+        for content in [b'{"name": ', b'NaN', b'\xff']:
+            with self.assertRaises(ParseError):
+                self.parse(FastJSONParser(), content)
@@ -0,0 +1,49 @@
+"""
+Tests for the token bucket throttles.
+"""
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from core.throttling import TokenBuckets, parse_rate
+
+
+class TokenBucketsTests(SimpleTestCase):
+    """Test taking tokens of buckets."""
+
+    def test_parse_rate(self):
+        """Test rates give their tokens and refill duration."""
+        self.assertEqual(parse_rate('10/min'), (10, 60))
+        self.assertEqual(parse_rate('3/s'), (3, 1))
+
+    @patch('core.throttling.time.monotonic', return_value=0)
+    def test_burst(self, monotonic):
+        """Test a full bucket lets a burst through, then waits."""
+        buckets = TokenBuckets(3, 60)
+
+        waits = [buckets.take('a') for i in range(4)]
+
+        self.assertEqual(waits[:3], [0, 0, 0])
+        self.assertAlmostEqual(waits[3], 20)
+        self.assertEqual(buckets.take('b'), 0)
+
+    @patch('core.throttling.time.monotonic', return_value=0)
+    def test_refill(self, monotonic):
+        """Test tokens come back at the rate."""
+        buckets = TokenBuckets(2, 60)
+        buckets.take('a')
+        buckets.take('a')
+
+        monotonic.return_value = 30
+        self.assertEqual(buckets.take('a'), 0)
+        self.assertGreater(buckets.take('a'), 0)
+
+    def test_size_bounded(self):
+        """Test only the most recent keys are kept."""
+        buckets = TokenBuckets(1, 60)
+
+        with self.settings(THROTTLE_BUCKETS_SIZE=2):
+            for key in 'abc':
+                buckets.take(key)
+
+        self.assertEqual(list(buckets._buckets), ['b', 'c'])
@@ -0,0 +1,125 @@
+"""
+Throttles keeping in-memory token buckets.
+
+Every key, like a client IP, gets a bucket holding up to `n` tokens of the
+`n/period` rate of the throttle scope, refilled continuously. A request
+takes a token and is throttled when none is left, so bursts up to `n` pass
+and the sustained rate is capped. The buckets live in this process only,
+no cache round trip is needed to reject a request.
+"""
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+
+from django.conf import settings
+
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+DURATIONS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+_buckets = {}
+_lock = threading.Lock()
+
+
+def parse_rate(rate):
+    """Return the number of tokens and the seconds to refill them."""
+    num, period = rate.split('/')
+    return int(num), DURATIONS[period[0]]
+
+
+class TokenBuckets:
+    """Thread-safe token buckets by key, keeping the most recent ones."""
+
+    def __init__(self, capacity, duration):
+        self.capacity = capacity
+        self.refill = capacity / duration
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key):
+        """Take a token of key, return 0, or the seconds until one is left."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.pop(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - last) * self.refill)
+            wait = 0 if tokens >= 1 else (1 - tokens) / self.refill
+            if not wait:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            # Dropping a bucket refills it, the oldest ones are closest
+            # to full anyway.
+            while len(self._buckets) > settings.THROTTLE_BUCKETS_SIZE:
+                self._buckets.popitem(last=False)
+
+        return wait
+
+
+def get_buckets(scope, rate):
+    """Return the buckets of scope at rate."""
+    with _lock:
+        if (scope, rate) not in _buckets:
+            _buckets[(scope, rate)] = TokenBuckets(*parse_rate(rate))
+
+        return _buckets[(scope, rate)]
+
+
+def reset_throttles():
+    """Refill every bucket."""
+    with _lock:
+        _buckets.clear()
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Throttle requests by the key of get_key, at the rate of scope in the
+    DEFAULT_THROTTLE_RATES setting. Requests are let through when the scope
+    has no rate or get_key returns None.
+    """
+    scope = None
+
+    def get_key(self, request, view):
+        raise NotImplementedError('.get_key() must be overridden')
+
+    def allow_request(self, request, view):
+        self.wait_seconds = None
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+        if rate is None:
+            return True
+        key = self.get_key(request, view)
+        if key is None:
+            return True
+
+        self.wait_seconds = get_buckets(self.scope, rate).take(key)
+        return not self.wait_seconds
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class LoginIPThrottle(TokenBucketThrottle):
+    """Throttle logins by client IP."""
+    scope = 'login_ip'
+
+    def get_key(self, request, view):
+        return self.get_ident(request)
+
+
+class LoginAccountThrottle(TokenBucketThrottle):
+    """Throttle logins by the email they are for."""
+    scope = 'login_account'
+
+    def get_key(self, request, view):
+        if not isinstance(request.data, Mapping):
+            return None
+        email = request.data.get('email')
+        if not isinstance(email, str):
+            return None
+
+        return email.strip().lower()
+
+
+class SignupIPThrottle(LoginIPThrottle):
+    """Throttle signups by client IP."""
+    scope = 'signup_ip'
@@ -1,3 +1,148 @@
-from django.shortcuts import render  # noqa
+"""
+Reusable view behaviour.
+"""
+from django.core.exceptions import FieldDoesNotExist
 
-# Create your views here.
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+
+class ValuesListMixin:
+    """
+    List action representing values() rows with a serializer using
+    core.serializers.ValuesSerializerMixin, skipping model instances.
+    """
+
+    def get_ordering(self):
+        """Return the fields ordering the list."""
+        return self.ordering
+
+    def get_field_names(self):
+        """Return names of the fields to represent, None for all of them."""
+        return None
+
+    def get_nested_values(self, rows):
+        """Return rows of nested fields grouped by parent primary key."""
+        return {}
+
+    def list(self, request, *args, **kwargs):
+        serializer_class = self.get_serializer_class()
+        queryset = self.filter_queryset(self.get_queryset())
+        # The pagination reads the ordering values from the rows.
+        names = serializer_class.get_values_sources(
+            self.get_field_names(),
+        ) + [field.lstrip('-') for field in self.get_ordering()]
+        rows = queryset.values(*dict.fromkeys(names))
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(
+                self.represent_rows(serializer_class, page),
+            )
+
+        return Response(self.represent_rows(serializer_class, list(rows)))
+
+    def represent_rows(self, serializer_class, rows):
+        """Return representations of rows and their nested rows."""
+        names = self.get_field_names()
+        nested = {}
+        # Nested rows are only read when a nested field is represented.
+        if serializer_class.get_values_nested(names):
+            nested = self.get_nested_values(rows)
+
+        return serializer_class.represent_rows(rows, nested, names)
+
+
+class SparseFieldsMixin:
+    """
+    Let clients pick the fields of responses with the `fields` query
+    parameter, or drop some with `omit`, both comma separated.
+
+    The selection trims the serializer; views pass their queryset to
+    `prune_queryset()` and check `is_field_requested()` before reading
+    related rows, so left out fields are not read either.
+    """
+    sparse_actions = ('list', 'retrieve')
+    fields_query_param = 'fields'
+    omit_query_param = 'omit'
+
+    def get_field_names(self):
+        """Return names of the requested fields, None for all of them."""
+        if self.action not in self.sparse_actions:
+            return None
+        if not hasattr(self, '_field_names'):
+            self._field_names = self._parse_field_names()
+
+        return self._field_names
+
+    def is_field_requested(self, name):
+        """Return whether the response includes the field name."""
+        names = self.get_field_names()
+        return names is None or name in names
+
+    def _parse_field_names(self):
+        """Return the field names selected by the query parameters."""
+        params = self.request.query_params
+        fields = _split(params.get(self.fields_query_param, ''))
+        omit = _split(params.get(self.omit_query_param, ''))
+        if not fields and not omit:
+            return None
+
+        available = [
+            name for name, field
+            in self.get_serializer_class()().fields.items()
+            if not field.write_only
+        ]
+        for param, names in [
+            (self.fields_query_param, fields),
+            (self.omit_query_param, omit),
+        ]:
+            unknown = [name for name in names if name not in available]
+            if unknown:
+                raise ValidationError(
+                    {param: f'Unknown fields: {", ".join(unknown)}.'}
+                )
+
+        return tuple(
+            name for name in available
+            if (not fields or name in fields) and name not in omit
+        )
+
+    def get_serializer(self, *args, **kwargs):
+        """Return the serializer without the fields left out."""
+        serializer = super().get_serializer(*args, **kwargs)
+        names = self.get_field_names()
+        if names is not None:
+            fields = getattr(serializer, 'child', serializer).fields
+            for name in list(fields):
+                if name not in names:
+                    del fields[name]
+
+        return serializer
+
+    def prune_queryset(self, queryset):
+        """Load only the columns of the requested fields."""
+        names = self.get_field_names()
+        if names is None:
+            return queryset
+
+        opts = queryset.model._meta
+        columns = {opts.pk.name}
+        modified_field = getattr(self, 'modified_field', None)
+        if modified_field:
+            columns.add(modified_field)
+        fields = self.get_serializer_class()().fields
+        for name in names:
+            try:
+                field = opts.get_field(fields[name].source)
+            except FieldDoesNotExist:
+                continue
+            if field.concrete and not field.many_to_many:
+                columns.add(field.name)
+
+        return queryset.only(*sorted(columns))
+
+
+def _split(value):
+    """Return the names in a comma separated query parameter."""
+    return [name.strip() for name in value.split(',') if name.strip()]
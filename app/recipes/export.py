@@ -0,0 +1,62 @@
+"""
+Streaming export of recipes as NDJSON or CSV.
+"""
+import csv
+import json
+from itertools import islice
+
+from django.db.models import prefetch_related_objects
+
+from rest_framework.utils.encoders import JSONEncoder
+
+CSV_FIELDS = [
+    'id', 'title', 'description', 'time_minutes', 'price', 'link', 'tags',
+]
+
+
+def iter_recipes(queryset, chunk_size):
+    """
+    Yield recipes of queryset, fetching them with a server-side cursor and
+    prefetching tags one chunk at a time.
+    """
+    # iterator() ignores prefetch_related(), so tags are fetched per chunk.
+    recipes = queryset.iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(recipes, chunk_size))
+        if not chunk:
+            return
+        prefetch_related_objects(chunk, 'tags')
+        yield from chunk
+
+
+def export_ndjson(recipes, serializer):
+    """Yield one JSON document per recipe."""
+    encoder = JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    for recipe in recipes:
+        yield encoder.encode(serializer.to_representation(recipe)) + '\n'
+
+
+class _Echo:
+    """File-like object returning what is written, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def export_csv(recipes, serializer):
+    """Yield a CSV header, then one row per recipe with tags as JSON."""
+    writer = csv.DictWriter(_Echo(), fieldnames=CSV_FIELDS)
+    yield writer.writeheader()
+    for recipe in recipes:
+        row = serializer.to_representation(recipe)
+        row['tags'] = json.dumps(
+            [tag['name'] for tag in row['tags']],
+            ensure_ascii=False,
+        )
+        yield writer.writerow(row)
+
+
+EXPORTERS = {
+    'ndjson': (export_ndjson, 'application/x-ndjson'),
+    'csv': (export_csv, 'text/csv'),
+}
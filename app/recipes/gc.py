@@ -0,0 +1,114 @@
+"""
+Garbage collection of tags no recipe uses.
+
+Changing the tags of a recipe leaves the old tags behind. They are found
+with an anti-join against the recipe links and deleted in small batches,
+each one in its own short transaction.
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from core.cache import bump_user_version
+from core.db import delete_rows
+from recipes.models import Recipe, Tag, Tombstone
+
+logger = logging.getLogger(__name__)
+
+_scheduler = None
+
+
+def orphan_tags(cutoff):
+    """Return tags created before cutoff that no recipe uses."""
+    return Tag.objects.filter(created_at__lt=cutoff).filter(~Exists(
+        Recipe.tags.through.objects.filter(tag_id=OuterRef('pk')),
+    ))
+
+
+def collect_tags(batch_size=1000, grace=None, dry_run=False, pause=0):
+    """
+    Delete orphan tags older than grace, TAG_GC_GRACE by default. Yield
+    the number of tags deleted, or found with dry_run, in each batch.
+    """
+    if grace is None:
+        grace = settings.TAG_GC_GRACE
+    orphans = orphan_tags(timezone.now() - grace).order_by('pk')
+
+    last = 0
+    while True:
+        ids = list(
+            orphans.filter(pk__gt=last).values_list('pk', flat=True)
+            [:batch_size]
+        )
+        if not ids:
+            break
+        last = ids[-1]
+        yield len(ids) if dry_run else _delete_tags(orphans, ids)
+        if pause:
+            time.sleep(pause)
+
+
+def _delete_tags(orphans, ids):
+    """Delete the tags of ids that are still orphans, return how many."""
+    try:
+        with transaction.atomic():
+            # Links are checked again under the row locks, and tags being
+            # linked right now are locked by resolve_tags(), so skipped.
+            tags = list(
+                orphans.filter(pk__in=ids)
+                .select_for_update(skip_locked=True)
+                .values_list('pk', 'user_id')
+            )
+            if not tags:
+                return 0
+            Tombstone.objects.bulk_create([
+                Tombstone(user_id=user_id, kind=Tombstone.TAG, object_id=pk)
+                for pk, user_id in tags
+            ])
+            # Everything the signals would do is done, delete the tags
+            # without loading them.
+            delete_rows(Tag, [pk for pk, _ in tags])
+            for user_id in {user_id for _, user_id in tags}:
+                bump_user_version(user_id)
+    except IntegrityError:
+        # A recipe linked one of the tags meanwhile, the batch is left
+        # for the next run.
+        logger.warning('Skipped a batch of tags linked while collected.')
+        return 0
+
+    return len(tags)
+
+
+def start_scheduler(interval=None):
+    """
+    Collect orphan tags every interval seconds, TAG_GC_INTERVAL by default,
+    in a daemon thread of this process. Do nothing when the interval is 0
+    or the thread runs already. Return the thread.
+    """
+    global _scheduler
+    if interval is None:
+        interval = settings.TAG_GC_INTERVAL
+    if not interval or _scheduler is not None:
+        return _scheduler
+
+    def run():
+        while True:
+            time.sleep(interval)
+            try:
+                deleted = sum(collect_tags())
+            except Exception:
+                logger.exception('Collecting orphan tags failed.')
+            else:
+                logger.info('Deleted %d orphan tags.', deleted)
+            finally:
+                connection.close()
+
+    _scheduler = threading.Thread(target=run, name='gc-tags', daemon=True)
+    _scheduler.start()
+
+    return _scheduler
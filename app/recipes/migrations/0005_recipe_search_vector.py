@@ -0,0 +1,62 @@
+# Generated by Django 3.2.25 on 2026-10-18 03:43
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+SEARCH_VECTOR_SQL = """
+CREATE FUNCTION recipes_recipe_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('pg_catalog.english',
+                              coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('pg_catalog.english',
+                              coalesce(NEW.description, '')), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER recipes_recipe_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, description ON recipes_recipe
+    FOR EACH ROW EXECUTE FUNCTION recipes_recipe_search_vector_update();
+
+UPDATE recipes_recipe SET title = title;
+
+CREATE INDEX recipe_search_vector_idx
+    ON recipes_recipe USING GIN (search_vector);
+"""
+
+DROP_SEARCH_VECTOR_SQL = """
+DROP INDEX IF EXISTS recipe_search_vector_idx;
+DROP TRIGGER IF EXISTS recipes_recipe_search_vector_trigger ON recipes_recipe;
+DROP FUNCTION IF EXISTS recipes_recipe_search_vector_update();
+"""
+
+
+def postgres_only(sql):
+    """Return a RunPython callable executing sql on Postgres only."""
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor == 'postgresql':
+            schema_editor.execute(sql)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0004_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        # Trigger, backfill and GIN index. Other databases fall back to
+        # plain substring matching in recipes.search.
+        migrations.RunPython(
+            postgres_only(SEARCH_VECTOR_SQL),
+            postgres_only(DROP_SEARCH_VECTOR_SQL),
+        ),
+    ]
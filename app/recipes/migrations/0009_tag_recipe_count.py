@@ -0,0 +1,38 @@
+# Generated by Django 3.2.25 on 2026-10-18 04:17
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_recipes(apps, schema_editor):
+    """Set the counter of existing tags from the through table."""
+    Tag = apps.get_model('recipes', 'Tag')
+    Recipe = apps.get_model('recipes', 'Recipe')
+    counts = Recipe.tags.through.objects \
+        .filter(tag_id=OuterRef('pk')) \
+        .order_by().values('tag_id') \
+        .annotate(count=Count('pk')).values('count')
+    Tag.objects.using(schema_editor.connection.alias).update(
+        recipe_count=Coalesce(Subquery(counts), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0008_tag_ordering'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tag',
+            name='recipe_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='tag',
+            index=models.Index(fields=['user', 'recipe_count', 'id'], name='tag_user_count_idx'),
+        ),
+        migrations.RunPython(count_recipes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,99 @@
+# Generated by Django 3.2.25 on 2026-10-18 04:20
+
+from django.db import migrations, transaction
+from django.db.models import Count, Min, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+# Number of duplicated (user, name) pairs merged per transaction.
+BATCH_SIZE = 500
+
+
+def merge_batch(apps, db, groups):
+    """Merge the duplicates of each group into its oldest tag."""
+    Tag = apps.get_model('recipes', 'Tag')
+    Recipe = apps.get_model('recipes', 'Recipe')
+    Tombstone = apps.get_model('recipes', 'Tombstone')
+    through = Recipe.tags.through.objects.using(db)
+    now = timezone.now()
+
+    keepers = {(group['user'], group['name']): group['keep'] for group in groups}
+    same_name = Q()
+    for user_id, name in keepers:
+        same_name |= Q(user_id=user_id, name=name)
+    duplicates = {
+        pk: (keepers[user_id, name], user_id)
+        for pk, user_id, name in Tag.objects.using(db)
+        .filter(same_name).exclude(pk__in=keepers.values())
+        .values_list('pk', 'user_id', 'name')
+    }
+
+    # Repoint links of duplicates to their keeper, unless the recipe is
+    # linked to the keeper already. The remaining links are deleted.
+    linked = set(
+        through.filter(tag_id__in=keepers.values())
+        .values_list('recipe_id', 'tag_id')
+    )
+    moved = {}
+    recipe_ids = set()
+    for pk, recipe_id, tag_id in through.filter(tag_id__in=duplicates) \
+            .values_list('pk', 'recipe_id', 'tag_id'):
+        keeper = duplicates[tag_id][0]
+        recipe_ids.add(recipe_id)
+        if (recipe_id, keeper) not in linked:
+            linked.add((recipe_id, keeper))
+            moved.setdefault(keeper, []).append(pk)
+    for keeper, pks in moved.items():
+        through.filter(pk__in=pks).update(tag_id=keeper)
+    through.filter(tag_id__in=duplicates).delete()
+
+    Tombstone.objects.using(db).bulk_create([
+        Tombstone(user_id=user_id, kind='tag', object_id=pk, deleted_at=now)
+        for pk, (keeper, user_id) in duplicates.items()
+    ])
+    Tag.objects.using(db).filter(pk__in=duplicates).delete()
+
+    counts = Recipe.tags.through.objects \
+        .filter(tag_id=OuterRef('pk')) \
+        .order_by().values('tag_id') \
+        .annotate(count=Count('pk')).values('count')
+    Tag.objects.using(db).filter(pk__in=keepers.values()).update(
+        recipe_count=Coalesce(Subquery(counts), 0),
+        updated_at=now,
+    )
+    Recipe.objects.using(db).filter(pk__in=recipe_ids).update(updated_at=now)
+
+
+def merge_duplicate_tags(apps, schema_editor):
+    """Merge tags sharing a user and name, one short transaction a batch."""
+    Tag = apps.get_model('recipes', 'Tag')
+    db = schema_editor.connection.alias
+    groups = Tag.objects.using(db) \
+        .values('user', 'name') \
+        .annotate(keep=Min('pk'), count=Count('pk')) \
+        .filter(count__gt=1) \
+        .order_by('keep')
+
+    last = 0
+    while True:
+        batch = list(groups.filter(keep__gt=last)[:BATCH_SIZE])
+        if not batch:
+            break
+        last = batch[-1]['keep']
+        with transaction.atomic(using=db):
+            merge_batch(apps, db, batch)
+
+
+class Migration(migrations.Migration):
+
+    # Every batch commits on its own, so merging does not hold locks on
+    # the tags of every user until the end.
+    atomic = False
+
+    dependencies = [
+        ('recipes', '0009_tag_recipe_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_tags, migrations.RunPython.noop),
+    ]
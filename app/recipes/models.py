@@ -1,5 +1,7 @@
 from django.conf import settings
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.utils import timezone
 
 
 class Recipe(models.Model):
@@ -14,6 +16,28 @@ class Recipe(models.Model):
     price = models.DecimalField(max_digits=5, decimal_places=2)
     link = models.CharField(max_length=255, blank=True)
     tags = models.ManyToManyField('Tag')
+    # Weighted title and description lexemes, kept up to date by a
+    # database trigger on Postgres (see migration 0005).
+    search_vector = SearchVectorField(null=True, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'id'], name='recipe_user_id_idx'),
+            models.Index(
+                fields=['user', 'updated_at'],
+                name='recipe_user_updated_idx',
+            ),
+            models.Index(
+                fields=['user', 'time_minutes'],
+                name='recipe_user_time_idx',
+            ),
+            models.Index(
+                fields=['user', 'price'],
+                name='recipe_user_price_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.title
@@ -26,6 +50,63 @@ class Tag(models.Model):
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
     )
+    # Number of recipes using the tag, kept up to date by signals and the
+    # bulk helpers of recipes.utils (repair drift with `recount_tags`).
+    recipe_count = models.PositiveIntegerField(default=0, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        # Tags of a recipe are listed in the order they were created.
+        ordering = ['id']
+        # The unique index also serves lookups of tags by name.
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'name'],
+                name='tag_user_name_unique',
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', 'updated_at'],
+                name='tag_user_updated_idx',
+            ),
+            models.Index(
+                fields=['user', 'recipe_count', 'id'],
+                name='tag_user_count_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.name
+
+
+class Tombstone(models.Model):
+    """Deleted recipe or tag, remembered for delta sync clients."""
+    RECIPE = 'recipe'
+    TAG = 'tag'
+    KIND_CHOICES = [(RECIPE, 'Recipe'), (TAG, 'Tag')]
+
+    # No constraint, tombstones outlive their user until they are pruned.
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        related_name='+',
+    )
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['user', 'deleted_at'],
+                name='tombstone_user_deleted_idx',
+            ),
+            models.Index(fields=['deleted_at'], name='tombstone_deleted_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.kind} {self.object_id}'
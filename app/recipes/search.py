@@ -0,0 +1,53 @@
+"""
+Full-text search over recipe titles and descriptions.
+"""
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import (Case, F, FloatField, IntegerField, Q, Value,
+                              When)
+from django.db.models.functions import Cast
+
+SEARCH_CONFIG = 'english'
+
+
+def search_recipes(queryset, text):
+    """Filter queryset to recipes matching text, annotated with `rank`."""
+    if connections[queryset.db].vendor == 'postgresql':
+        return _search_postgres(queryset, text)
+
+    return _search_fallback(queryset, text)
+
+
+def _search_postgres(queryset, text):
+    """Match against the trigger maintained `search_vector` column."""
+    query = SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+    # ts_rank returns a real, widened to double precision the pagination
+    # cursor carries it back exactly, so rows tied with it are not repeated.
+    return queryset.filter(search_vector=query).annotate(
+        rank=Cast(SearchRank(F('search_vector'), query), FloatField()),
+    )
+
+
+def _search_fallback(queryset, text):
+    """
+    Match every word case-insensitively for databases without full-text
+    search, such as the SQLite database used for offline testing. Title
+    matches rank above description matches, like the weights of the
+    Postgres search vector.
+    """
+    words = text.split()
+    if not words:
+        return queryset.none()
+
+    rank = Value(0)
+    for word in words:
+        queryset = queryset.filter(
+            Q(title__icontains=word) | Q(description__icontains=word)
+        )
+        rank += Case(
+            When(title__icontains=word, then=Value(2)),
+            default=Value(1),
+            output_field=IntegerField(),
+        )
+
+    return queryset.annotate(rank=rank)
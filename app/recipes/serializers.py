@@ -1,9 +1,23 @@
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
 from rest_framework import serializers
 
+from core.cache import bump_user_version
+from core.serializers import ValuesSerializerMixin
 from recipes.models import Recipe, Tag
+from recipes.utils import (
+    add_tags,
+    bulk_set_tags,
+    delete_recipes,
+    resolve_tags,
+    sync_tags,
+)
 
 
-class TagSerializer(serializers.ModelSerializer):
+class TagSerializer(ValuesSerializerMixin, serializers.ModelSerializer):
     """Serializer for tag."""
 
     class Meta:
@@ -12,7 +26,60 @@ class TagSerializer(serializers.ModelSerializer):
         read_only_fields = ['id']
 
 
-class RecipeSerializer(serializers.ModelSerializer):
+class TagDetailSerializer(TagSerializer):
+    """Serializer for tags listed on their own, with usage counts."""
+    default_error_messages = {
+        'duplicate': _('A tag with this name already exists.'),
+    }
+
+    class Meta(TagSerializer.Meta):
+        fields = TagSerializer.Meta.fields + ['recipe_count']
+        read_only_fields = ['id', 'recipe_count']
+
+    def validate_name(self, value):
+        """Check no other tag of the user has the name."""
+        tags = Tag.objects.filter(
+            user=self.context['request'].user,
+            name=value,
+        )
+        if self.instance is not None:
+            tags = tags.exclude(pk=self.instance.pk)
+        if tags.exists():
+            self.fail('duplicate')
+
+        return value
+
+
+class TagBulkSerializer(serializers.Serializer):
+    """
+    Serializer for creating many tags at once.
+
+    Names of existing tags are accepted too, the tag of every distinct
+    name is returned in the order of the names.
+    """
+    names = serializers.ListField(
+        child=serializers.CharField(
+            max_length=Tag._meta.get_field('name').max_length,
+        ),
+        write_only=True,
+        allow_empty=False,
+        max_length=settings.MAX_BULK_SIZE,
+    )
+    tags = TagDetailSerializer(many=True, read_only=True)
+
+    def save(self):
+        """Create the missing tags with one insert."""
+        user = self.context['request'].user
+        self.instance = {
+            'tags': resolve_tags(user, self.validated_data['names']),
+        }
+        # Bulk inserts send no signals, invalidate responses here.
+        bump_user_version(user.pk)
+
+        return self.instance
+
+
+class RecipeSerializer(ValuesSerializerMixin, serializers.ModelSerializer):
     """Serializer for recipes."""
     tags = TagSerializer(many=True, required=False)
 
@@ -22,39 +89,276 @@ class RecipeSerializer(serializers.ModelSerializer):
         read_only_fields = ['id']
 
 
+class RecipeListSerializer(serializers.ListSerializer):
+    """
+    Serializer writing many recipes with set-based statements.
+
+    To update, pass the recipes that may be changed as instance, a
+    queryset with tags prefetched; every item names its recipe by `id`.
+    """
+    default_error_messages = {
+        'not_found': _('Recipe not found.'),
+        'duplicate': _('Recipe given more than once.'),
+    }
+
+    def to_internal_value(self, data):
+        """Validate items, matching updated ones to recipes by id."""
+        if self.instance is None or not isinstance(data, list):
+            return super().to_internal_value(data)
+
+        ids = [
+            item.get('id') if isinstance(item, dict) else None
+            for item in data
+        ]
+        self.recipes = self.instance.in_bulk(
+            [pk for pk in ids if type(pk) is int]
+        )
+
+        ret = []
+        errors = []
+        seen = set()
+        for pk, item in zip(ids, data):
+            if type(pk) is not int or pk not in self.recipes:
+                errors.append({'id': [self.error_messages['not_found']]})
+                continue
+            if pk in seen:
+                errors.append({'id': [self.error_messages['duplicate']]})
+                continue
+            seen.add(pk)
+            try:
+                validated = self.child.run_validation(item)
+            except serializers.ValidationError as exc:
+                errors.append(exc.detail)
+            else:
+                validated['id'] = pk
+                ret.append(validated)
+                errors.append({})
+
+        if any(errors):
+            raise serializers.ValidationError(errors)
+
+        return ret
+
+    def create(self, validated_data):
+        """Create recipes with one insert and link their tags at once."""
+        user = self.context['request'].user
+        names = [
+            [tag['name'] for tag in attrs.pop('tags', [])]
+            for attrs in validated_data
+        ]
+        recipes = [Recipe(**attrs) for attrs in validated_data]
+        db = router.db_for_write(Recipe)
+        with transaction.atomic():
+            if connections[db].features.can_return_rows_from_bulk_insert:
+                Recipe.objects.using(db).bulk_create(recipes)
+            else:
+                # The backend can't return ids from a bulk insert.
+                for recipe in recipes:
+                    recipe.save(using=db)
+            bulk_set_tags(user, [
+                (recipe, [], recipe_names)
+                for recipe, recipe_names in zip(recipes, names)
+            ])
+            bump_user_version(user.pk)
+
+        return self._reload(recipes)
+
+    def update(self, instance, validated_data):
+        """Update recipes with one statement and sync their tags at once."""
+        user = self.context['request'].user
+        fields = {'updated_at'}
+        recipes = []
+        changed = {}
+        tag_changes = []
+        for attrs in validated_data:
+            recipe = self.recipes[attrs.pop('id')]
+            recipes.append(recipe)
+            tags = attrs.pop('tags', None)
+            if tags is not None:
+                tag_changes.append((
+                    recipe,
+                    list(recipe.tags.all()),
+                    [tag['name'] for tag in tags],
+                ))
+
+            update_fields = [
+                attr for attr, value in attrs.items()
+                if getattr(recipe, attr) != value
+            ]
+            for attr in update_fields:
+                setattr(recipe, attr, attrs[attr])
+            if update_fields:
+                fields.update(update_fields)
+                changed[recipe.pk] = recipe
+
+        with transaction.atomic():
+            for recipe in bulk_set_tags(user, tag_changes):
+                changed[recipe.pk] = recipe
+            if changed:
+                # bulk_update() leaves auto_now fields alone.
+                now = timezone.now()
+                for recipe in changed.values():
+                    recipe.updated_at = now
+                Recipe.objects.bulk_update(changed.values(), sorted(fields))
+                bump_user_version(user.pk)
+
+        return self._reload(recipes)
+
+    def _reload(self, recipes):
+        """Return recipes fetched again with their tags, in order."""
+        pks = [recipe.pk for recipe in recipes]
+        reloaded = Recipe.objects.defer('search_vector') \
+            .prefetch_related('tags').in_bulk(pks)
+
+        return [reloaded[pk] for pk in pks]
+
+
 class RecipeDetailSerializer(RecipeSerializer):
     """Serializer for recipe detail view."""
 
     class Meta(RecipeSerializer.Meta):
         fields = RecipeSerializer.Meta.fields + ['description']
+        list_serializer_class = RecipeListSerializer
 
     def _get_or_create_tags(self, tags, recipe):
         """Handle creating or getting tags are needed."""
         auth_user = self.context['request'].user
-        for tag in tags:
-            tag_obj, created = Tag.objects.get_or_create(
-                user=auth_user,
-                **tag,
-            )
-            recipe.tags.add(tag_obj)
+        tag_objs = resolve_tags(
+            auth_user,
+            [tag['name'] for tag in tags],
+            lock=True,
+        )
+        add_tags(recipe, tag_objs)
 
     def create(self, validated_data):
         """Create a recipe."""
         tags = validated_data.pop('tags', [])
-        recipe = Recipe.objects.create(**validated_data)
-        self._get_or_create_tags(tags, recipe)
+        with transaction.atomic():
+            recipe = Recipe.objects.create(**validated_data)
+            self._get_or_create_tags(tags, recipe)
 
         return recipe
 
     def update(self, instance, validated_data):
         """Update recipe."""
         tags = validated_data.pop('tags', None)
-        if tags is not None:
-            instance.tags.clear()
-            self._get_or_create_tags(tags, instance)
+        with transaction.atomic():
+            tags_changed = tags is not None and sync_tags(
+                self.context['request'].user,
+                instance,
+                [tag['name'] for tag in tags],
+            )
 
-        for attr, value in validated_data.items():
-            setattr(instance, attr, value)
+            update_fields = [
+                attr for attr, value in validated_data.items()
+                if getattr(instance, attr) != value
+            ]
+            for attr in update_fields:
+                setattr(instance, attr, validated_data[attr])
 
-        instance.save()
+            if update_fields or tags_changed:
+                instance.save(update_fields=update_fields + ['updated_at'])
         return instance
+
+
+class DeletedSerializer(serializers.Serializer):
+    """Serializer for ids of deleted recipes and tags."""
+    recipes = serializers.ListField(child=serializers.IntegerField())
+    tags = serializers.ListField(child=serializers.IntegerField())
+
+
+class ChangesSerializer(serializers.Serializer):
+    """Serializer for recipes and tags changed since a sync token."""
+    token = serializers.CharField()
+    recipes = RecipeDetailSerializer(many=True)
+    tags = TagDetailSerializer(many=True)
+    deleted = DeletedSerializer()
+
+
+class RecipeBulkSerializer(serializers.Serializer):
+    """
+    Serializer for creating, updating and deleting many recipes at once.
+
+    Items are validated like single recipes, updates partially, and errors
+    are reported per item in the position of the item.
+    """
+    create = serializers.ListField(
+        child=serializers.DictField(),
+        required=False,
+        write_only=True,
+        max_length=settings.MAX_BULK_SIZE,
+    )
+    update = serializers.ListField(
+        child=serializers.DictField(),
+        required=False,
+        write_only=True,
+        max_length=settings.MAX_BULK_SIZE,
+    )
+    delete = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=False,
+        write_only=True,
+        max_length=settings.MAX_BULK_SIZE,
+    )
+    created = RecipeDetailSerializer(many=True, read_only=True)
+    updated = RecipeDetailSerializer(many=True, read_only=True)
+    deleted = serializers.ListField(
+        child=serializers.IntegerField(),
+        read_only=True,
+    )
+
+    def validate(self, attrs):
+        """Validate the items of every operation."""
+        user = self.context['request'].user
+        recipes = Recipe.objects.defer('search_vector').filter(user=user)
+        self.create_serializer = RecipeDetailSerializer(
+            data=attrs.get('create', []),
+            many=True,
+            context=self.context,
+        )
+        self.update_serializer = RecipeDetailSerializer(
+            recipes.prefetch_related('tags'),
+            data=attrs.get('update', []),
+            many=True,
+            partial=True,
+            context=self.context,
+        )
+
+        errors = {}
+        for name, serializer in [
+            ('create', self.create_serializer),
+            ('update', self.update_serializer),
+        ]:
+            if not serializer.is_valid():
+                errors[name] = serializer.errors
+
+        delete = attrs.get('delete', [])
+        found = set(
+            recipes.filter(pk__in=delete).values_list('pk', flat=True)
+        )
+        if not found.issuperset(delete):
+            errors['delete'] = [
+                [] if pk in found else [_('Recipe not found.')]
+                for pk in delete
+            ]
+
+        if errors:
+            raise serializers.ValidationError(errors)
+
+        return attrs
+
+    def save(self):
+        """Apply every operation in one transaction."""
+        # Overridden rather than create(), which the `create` field hides.
+        user = self.context['request'].user
+        with transaction.atomic():
+            self.instance = {
+                'created': self.create_serializer.save(user=user),
+                'updated': self.update_serializer.save(),
+                'deleted': delete_recipes(
+                    user,
+                    self.validated_data.get('delete', []),
+                ),
+            }
+
+        return self.instance
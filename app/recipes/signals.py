@@ -0,0 +1,137 @@
+"""
+Signal receivers keeping recipe derived data in sync.
+"""
+from django.conf import settings
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core.cache import bump_user_version
+from recipes.models import Recipe, Tag, Tombstone
+from recipes.utils import shift_recipe_count
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_user_responses(sender, instance, **kwargs):
+    """Invalidate cached responses of the owner of a changed object."""
+    bump_user_version(instance.user_id)
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def invalidate_user_responses_on_tags(sender, instance, action, **kwargs):
+    """Invalidate cached responses when recipe tags change."""
+    if action.startswith('post_'):
+        bump_user_version(instance.user_id)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def start_user_responses(sender, instance, created, **kwargs):
+    """Give new users a fresh version, ignoring any reused user id."""
+    if created:
+        bump_user_version(instance.pk)
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def touch_tagged_objects(sender, instance, action, reverse, pk_set,
+                         **kwargs):
+    """
+    Mark recipes and tags whose links changed as modified, and update the
+    recipe counters of the tags.
+    """
+    now = timezone.now()
+    if action == 'post_add' and pk_set:
+        # Senders only pass the links they actually added.
+        if reverse:
+            Recipe.objects.filter(pk__in=pk_set).update(updated_at=now)
+            Tag.objects.filter(pk=instance.pk).update(
+                updated_at=now,
+                recipe_count=shift_recipe_count(len(pk_set)),
+            )
+        else:
+            Recipe.objects.filter(pk=instance.pk).update(updated_at=now)
+            Tag.objects.filter(pk__in=pk_set).update(
+                updated_at=now,
+                recipe_count=shift_recipe_count(1),
+            )
+    elif action == 'pre_remove' and pk_set:
+        # remove() passes every pk it was given, linked or not, so only
+        # the links about to be deleted are counted out.
+        links = Recipe.tags.through.objects.all()
+        if reverse:
+            links = links.filter(tag_id=instance.pk, recipe_id__in=pk_set)
+            removed = links.count()
+            if removed:
+                Recipe.objects.filter(
+                    pk__in=links.values('recipe_id'),
+                ).update(updated_at=now)
+                Tag.objects.filter(pk=instance.pk).update(
+                    updated_at=now,
+                    recipe_count=shift_recipe_count(-removed),
+                )
+        else:
+            links = links.filter(recipe_id=instance.pk, tag_id__in=pk_set)
+            removed = Tag.objects.filter(
+                pk__in=links.values('tag_id'),
+            ).update(
+                updated_at=now,
+                recipe_count=shift_recipe_count(-1),
+            )
+            if removed:
+                Recipe.objects.filter(pk=instance.pk).update(updated_at=now)
+    elif action == 'pre_clear':
+        # The cleared links are gone by post_clear, touch them first.
+        if reverse:
+            Recipe.objects.filter(tags=instance).update(updated_at=now)
+            Tag.objects.filter(pk=instance.pk).update(
+                updated_at=now,
+                recipe_count=0,
+            )
+        else:
+            Tag.objects.filter(recipe=instance).update(
+                updated_at=now,
+                recipe_count=shift_recipe_count(-1),
+            )
+            Recipe.objects.filter(pk=instance.pk).update(updated_at=now)
+
+
+@receiver(post_save, sender=Tag)
+def touch_recipes_of_saved_tag(sender, instance, created, **kwargs):
+    """Mark recipes embedding a renamed tag as modified."""
+    if not created:
+        Recipe.objects.filter(tags=instance).update(
+            updated_at=timezone.now(),
+        )
+
+
+@receiver(pre_delete, sender=Tag)
+def touch_recipes_of_deleted_tag(sender, instance, **kwargs):
+    """Mark recipes losing a deleted tag as modified."""
+    Recipe.objects.filter(tags=instance).update(updated_at=timezone.now())
+
+
+@receiver(pre_delete, sender=Recipe)
+def touch_tags_of_deleted_recipe(sender, instance, **kwargs):
+    """Mark tags losing a deleted recipe as modified and count it out."""
+    Tag.objects.filter(recipe=instance).update(
+        updated_at=timezone.now(),
+        recipe_count=shift_recipe_count(-1),
+    )
+
+
+@receiver(post_delete, sender=Recipe)
+@receiver(post_delete, sender=Tag)
+def record_tombstone(sender, instance, **kwargs):
+    """Remember a deleted object for delta sync clients."""
+    Tombstone.objects.create(
+        user_id=instance.user_id,
+        kind=Tombstone.TAG if sender is Tag else Tombstone.RECIPE,
+        object_id=instance.pk,
+    )
@@ -0,0 +1,50 @@
+"""
+Sync tokens for delta sync of recipes and tags.
+
+A token encodes a point in time. Changes are found through the indexed
+`updated_at` columns of recipes and tags and the `deleted_at` column of
+tombstones, so a sync costs in proportion to what changed since then.
+"""
+import binascii
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+
+
+class SyncTokenExpired(APIException):
+    status_code = status.HTTP_410_GONE
+    default_detail = _('Sync token expired, sync again without a token.')
+    default_code = 'sync_token_expired'
+
+
+def issue_token(now=None):
+    """Return a token for changes made from now on."""
+    issued_at = (now or timezone.now()) - settings.SYNC_TOKEN_LAG
+    microseconds = (issued_at - EPOCH) // MICROSECOND
+
+    return urlsafe_b64encode(str(microseconds).encode('ascii')) \
+        .decode('ascii')
+
+
+def read_token(token):
+    """Return the time encoded in token, rejecting invalid or old ones."""
+    try:
+        microseconds = int(urlsafe_b64decode(token.encode('ascii')))
+        since = EPOCH + microseconds * MICROSECOND
+    except (ValueError, OverflowError, binascii.Error):
+        raise ValidationError({'since': _('Invalid sync token.')})
+
+    # Older deletions may already be pruned, so the client must start over.
+    if since < timezone.now() - settings.SYNC_TOMBSTONE_RETENTION:
+        raise SyncTokenExpired()
+
+    return since
@@ -0,0 +1,156 @@
+"""
+Tests for the bulk recipe API.
+"""
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.cache import get_response_cache
+from recipes.models import Recipe, Tag, Tombstone
+from recipes.tests.helpers.fake_recipe import FakeRecipe
+from recipes.tests.test_recipe import create_recipe
+from users.tests.test_user_api import create_user
+
+from core.tests.helpers.fake_user import FakeUser
+
+
+RECIPES_URL = reverse('recipes:recipe-list')
+BULK_URL = reverse('recipes:recipe-bulk')
+
+
+class RecipeBulkAPITests(TestCase):
+    """Test creating, updating and deleting recipes in bulk."""
+
+    def setUp(self):
+        get_response_cache().clear()
+        self.client = APIClient()
+        self.fake_user = create_user(**FakeUser().as_dict())
+        self.client.force_authenticate(self.fake_user)
+
+    def bulk(self, payload):
+        """Send a bulk request."""
+        return self.client.post(BULK_URL, payload, format='json')
+
+    def test_bulk_create(self):
+        """Test creating recipes with tags in bulk."""
+        Tag.objects.create(user=self.fake_user, name='Vegan')
+        first = FakeRecipe().__dict__
+        first['tags'] = [{'name': 'Vegan'}, {'name': 'Quick'}]
+        second = FakeRecipe().__dict__
+        second['tags'] = [{'name': 'Quick'}]
+
+        res = self.bulk({'create': [first, second]})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        created = res.data['created']
+        self.assertEqual(
+            [recipe['title'] for recipe in created],
+            [first['title'], second['title']],
+        )
+        self.assertEqual(
+            {tag['name'] for tag in created[0]['tags']},
+            {'Vegan', 'Quick'},
+        )
+        self.assertEqual(Tag.objects.filter(user=self.fake_user).count(), 2)
+        recipe = Recipe.objects.get(id=created[1]['id'])
+        self.assertEqual(recipe.user, self.fake_user)
+        self.assertEqual(
+            [tag.name for tag in recipe.tags.all()],
+            ['Quick'],
+        )
+
+    def test_bulk_update(self):
+        """Test updating recipe fields and tags in bulk."""
+        vegan = Tag.objects.create(user=self.fake_user, name='Vegan')
+        first = create_recipe(user=self.fake_user)
+        first.tags.add(vegan)
+        second = create_recipe(user=self.fake_user)
+
+        res = self.bulk({'update': [
+            {'id': first.id, 'tags': [{'name': 'Quick'}]},
+            {'id': second.id, 'title': 'Changed'},
+        ]})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [recipe['id'] for recipe in res.data['updated']],
+            [first.id, second.id],
+        )
+        self.assertEqual(
+            [tag.name for tag in first.tags.all()],
+            ['Quick'],
+        )
+        second.refresh_from_db()
+        self.assertEqual(second.title, 'Changed')
+        self.assertGreater(second.updated_at, second.created_at)
+
+    def test_bulk_delete(self):
+        """Test deleting recipes in bulk."""
+        tag = Tag.objects.create(user=self.fake_user, name='Vegan')
+        recipe = create_recipe(user=self.fake_user)
+        recipe.tags.add(tag)
+        kept = create_recipe(user=self.fake_user)
+
+        res = self.bulk({'delete': [recipe.id]})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['deleted'], [recipe.id])
+        self.assertEqual(list(Recipe.objects.all()), [kept])
+        self.assertFalse(Recipe.tags.through.objects.exists())
+        self.assertTrue(Tombstone.objects.filter(
+            kind=Tombstone.RECIPE,
+            object_id=recipe.id,
+        ).exists())
+
+    def test_bulk_errors_per_item(self):
+        """Test invalid items are reported in place and nothing is saved."""
+        other = create_recipe(user=create_user(**FakeUser().as_dict()))
+        recipe = create_recipe(user=self.fake_user)
+        invalid = FakeRecipe().__dict__
+        del invalid['title']
+
+        res = self.bulk({
+            'create': [FakeRecipe().__dict__, invalid],
+            'update': [
+                {'id': recipe.id, 'title': 'Changed'},
+                {'id': other.id},
+            ],
+            'delete': [recipe.id, other.id],
+        })
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data['create'][0], {})
+        self.assertIn('title', res.data['create'][1])
+        self.assertEqual(res.data['update'][0], {})
+        self.assertIn('id', res.data['update'][1])
+        self.assertEqual(res.data['delete'][0], [])
+        self.assertTrue(res.data['delete'][1])
+        self.assertEqual(Recipe.objects.filter(user=self.fake_user).count(), 1)
+        recipe.refresh_from_db()
+        self.assertNotEqual(recipe.title, 'Changed')
+
+    def test_bulk_duplicate_update(self):
+        """Test updating a recipe twice in one request fails."""
+        recipe = create_recipe(user=self.fake_user)
+
+        res = self.bulk({'update': [{'id': recipe.id}, {'id': recipe.id}]})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data['update'][0], {})
+        self.assertIn('id', res.data['update'][1])
+
+    def test_bulk_invalidates_cached_list(self):
+        """Test bulk changes are visible in the recipe list."""
+        recipe = create_recipe(user=self.fake_user)
+        self.client.get(RECIPES_URL)
+
+        self.bulk({
+            'create': [FakeRecipe().__dict__],
+            'update': [{'id': recipe.id, 'title': 'Changed'}],
+        })
+        res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(len(res.data['results']), 2)
+        self.assertEqual(res.data['results'][1]['title'], 'Changed')
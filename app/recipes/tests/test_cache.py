@@ -0,0 +1,98 @@
+"""
+Tests for caching recipe and tag list responses.
+"""
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.cache import get_response_cache
+from recipes.models import Tag
+from recipes.tests.test_recipe import create_recipe
+from users.tests.test_user_api import create_user
+
+from core.tests.helpers.faker import faker
+from core.tests.helpers.fake_user import FakeUser
+
+
+RECIPES_URL = reverse('recipes:recipe-list')
+TAGS_URL = reverse('recipes:tag-list')
+
+
+class ResponseCacheTests(TestCase):
+    """Test list and detail responses are cached per user."""
+
+    def setUp(self):
+        get_response_cache().clear()
+        self.client = APIClient()
+        self.fake_user = create_user(**FakeUser().as_dict())
+        self.client.force_authenticate(self.fake_user)
+        self.recipe = create_recipe(user=self.fake_user)
+
+    def test_list_served_from_cache(self):
+        """Test a repeated list request runs no queries."""
+        first = self.client.get(RECIPES_URL)
+
+        with self.assertNumQueries(0):
+            second = self.client.get(RECIPES_URL)
+
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.data, first.data)
+
+    def test_detail_served_from_cache(self):
+        """Test a repeated detail request runs no queries."""
+        url = reverse('recipes:recipe-detail', args=[self.recipe.id])
+        self.client.get(url)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(url)
+
+        self.assertEqual(res.data['id'], self.recipe.id)
+
+    def test_recipe_change_invalidates(self):
+        """Test saving a recipe invalidates the cached list."""
+        self.client.get(RECIPES_URL)
+        self.recipe.title = faker.sentence()
+        self.recipe.save()
+
+        res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(res.data['results'][0]['title'], self.recipe.title)
+
+    def test_tag_changes_invalidate(self):
+        """Test tag renames and assignments invalidate the cached list."""
+        tag = Tag.objects.create(user=self.fake_user, name='vegan')
+        self.client.get(RECIPES_URL)
+
+        self.recipe.tags.add(tag)
+        res = self.client.get(RECIPES_URL)
+        self.assertEqual(res.data['results'][0]['tags'][0]['name'], 'vegan')
+
+        tag.name = 'vegetarian'
+        tag.save()
+        res = self.client.get(RECIPES_URL)
+        self.assertEqual(
+            res.data['results'][0]['tags'][0]['name'],
+            'vegetarian',
+        )
+
+    def test_tag_list_invalidated_by_delete(self):
+        """Test deleting a tag through the API invalidates the tag list."""
+        tag = Tag.objects.create(user=self.fake_user, name='vegan')
+        self.client.get(TAGS_URL)
+
+        self.client.delete(reverse('recipes:tag-detail', args=[tag.id]))
+        res = self.client.get(TAGS_URL)
+
+        self.assertEqual(res.data['results'], [])
+
+    def test_cache_limited_to_user(self):
+        """Test cached responses of a user are not served to others."""
+        self.client.get(RECIPES_URL)
+        other_user = create_user(**FakeUser().as_dict())
+        self.client.force_authenticate(other_user)
+
+        res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(res.data['results'], [])
@@ -0,0 +1,221 @@
+"""
+Tests for conditional requests on recipes and tags.
+"""
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import (
+    APIClient,
+    APIRequestFactory,
+    force_authenticate,
+)
+
+from core.cache import CachedResponseMixin, get_response_cache
+from core.conditional import ConditionalMixin
+from recipes.models import Tag
+from recipes.tests.test_recipe import create_recipe
+from recipes.views import TagViewSet
+from users.tests.test_user_api import create_user
+
+from core.tests.helpers.fake_user import FakeUser
+
+
+RECIPES_URL = reverse('recipes:recipe-list')
+TAGS_URL = reverse('recipes:tag-list')
+
+
+def detail_url(recipe_id):
+    """Return recipe detail URL."""
+    return reverse('recipes:recipe-detail', args=[recipe_id])
+
+
+class ConditionalRequestTests(TestCase):
+    """Test ETag and Last-Modified handling."""
+
+    def setUp(self):
+        get_response_cache().clear()
+        self.client = APIClient()
+        self.fake_user = create_user(**FakeUser().as_dict())
+        self.client.force_authenticate(self.fake_user)
+        self.recipe = create_recipe(user=self.fake_user)
+
+    def test_timestamps_set(self):
+        """Test recipes record when they were created and changed."""
+        self.assertIsNotNone(self.recipe.created_at)
+        self.assertGreaterEqual(self.recipe.updated_at, self.recipe.created_at)
+
+    def test_validators_returned(self):
+        """Test list and detail responses carry validators."""
+        Tag.objects.create(user=self.fake_user, name='Vegan')
+        for url in (RECIPES_URL, detail_url(self.recipe.id), TAGS_URL):
+            res = self.client.get(url)
+
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertIn('ETag', res)
+            self.assertIn('Last-Modified', res)
+
+    def test_if_none_match_not_modified(self):
+        """Test a matching ETag is answered with 304."""
+        res = self.client.get(detail_url(self.recipe.id))
+
+        res = self.client.get(
+            detail_url(self.recipe.id),
+            HTTP_IF_NONE_MATCH=res['ETag'],
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertFalse(res.content)
+
+    def test_if_none_match_from_cache(self):
+        """Test a cached list answers 304 without queries."""
+        etag = self.client.get(RECIPES_URL)['ETag']
+
+        with self.assertNumQueries(0):
+            res = self.client.get(RECIPES_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_if_none_match_uncached(self):
+        """Test 304 is answered before the list is serialized."""
+        etag = self.client.get(RECIPES_URL)['ETag']
+        get_response_cache().clear()
+
+        res = self.client.get(RECIPES_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_if_modified_since_not_modified(self):
+        """Test an up to date Last-Modified is answered with 304."""
+        res = self.client.get(detail_url(self.recipe.id))
+
+        res = self.client.get(
+            detail_url(self.recipe.id),
+            HTTP_IF_MODIFIED_SINCE=res['Last-Modified'],
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_change_updates_etag(self):
+        """Test changing a recipe changes list and detail ETags."""
+        list_etag = self.client.get(RECIPES_URL)['ETag']
+        detail_etag = self.client.get(detail_url(self.recipe.id))['ETag']
+
+        self.client.patch(detail_url(self.recipe.id), {'title': 'Changed'})
+
+        self.assertNotEqual(self.client.get(RECIPES_URL)['ETag'], list_etag)
+        res = self.client.get(
+            detail_url(self.recipe.id),
+            HTTP_IF_NONE_MATCH=detail_etag,
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['title'], 'Changed')
+
+    def test_delete_updates_list_etag(self):
+        """Test deleting a recipe changes the list ETag."""
+        other = create_recipe(user=self.fake_user)
+        etag = self.client.get(RECIPES_URL)['ETag']
+
+        other.delete()
+
+        self.assertNotEqual(self.client.get(RECIPES_URL)['ETag'], etag)
+
+    def test_tag_rename_updates_recipe_etag(self):
+        """Test renaming a tag changes ETags of recipes using it."""
+        tag = Tag.objects.create(user=self.fake_user, name='Vegan')
+        self.recipe.tags.add(tag)
+        etag = self.client.get(detail_url(self.recipe.id))['ETag']
+
+        self.client.patch(
+            reverse('recipes:tag-detail', args=[tag.id]),
+            {'name': 'Vegetarian'},
+        )
+
+        self.assertNotEqual(
+            self.client.get(detail_url(self.recipe.id))['ETag'],
+            etag,
+        )
+
+    def test_stale_if_match_rejected(self):
+        """Test updating with a stale ETag fails without saving."""
+        etag = self.client.get(detail_url(self.recipe.id))['ETag']
+        self.client.patch(detail_url(self.recipe.id), {'title': 'First'})
+
+        res = self.client.patch(
+            detail_url(self.recipe.id),
+            {'title': 'Second'},
+            HTTP_IF_MATCH=etag,
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.title, 'First')
+
+    def test_current_if_match_accepted(self):
+        """Test updating with the current ETag returns the new one."""
+        etag = self.client.get(detail_url(self.recipe.id))['ETag']
+
+        res = self.client.patch(
+            detail_url(self.recipe.id),
+            {'title': 'Changed'},
+            HTTP_IF_MATCH=etag,
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res['ETag'], etag)
+        check = self.client.get(
+            detail_url(self.recipe.id),
+            HTTP_IF_NONE_MATCH=res['ETag'],
+        )
+        self.assertEqual(check.status_code, status.HTTP_304_NOT_MODIFIED)
+
+
+class ReversedTagViewSet(ConditionalMixin,
+                         CachedResponseMixin,
+                         *TagViewSet.__bases__[2:]):
+    """The tag viewset with its cache and conditional mixins swapped."""
+    serializer_class = TagViewSet.serializer_class
+    queryset = TagViewSet.queryset
+    authentication_classes = TagViewSet.authentication_classes
+    permission_classes = TagViewSet.permission_classes
+    ordering = TagViewSet.ordering
+    get_queryset = TagViewSet.get_queryset
+    get_ordering = TagViewSet.get_ordering
+
+
+class MixinOrderTests(TestCase):
+    """Test the cache and conditional mixins combine in either order."""
+
+    def setUp(self):
+        get_response_cache().clear()
+        self.fake_user = create_user(**FakeUser().as_dict())
+        Tag.objects.create(user=self.fake_user, name='Vegan')
+        self.view = ReversedTagViewSet.as_view({'get': 'list'})
+        self.factory = APIRequestFactory()
+
+    def get(self, **headers):
+        """Return the response of the reversed view to a tag list GET."""
+        request = self.factory.get(TAGS_URL, **headers)
+        force_authenticate(request, user=self.fake_user)
+        response = self.view(request)
+        if hasattr(response, 'render'):
+            response.render()
+
+        return response
+
+    def test_reversed_order(self):
+        """Test validators, 304s and cached responses still work."""
+        res = self.get()
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn('ETag', res)
+
+        # Validators are computed before the cache is read.
+        with self.assertNumQueries(1):
+            cached = self.get()
+        not_modified = self.get(HTTP_IF_NONE_MATCH=res['ETag'])
+
+        self.assertEqual(cached.content, res.content)
+        self.assertEqual(
+            not_modified.status_code,
+            status.HTTP_304_NOT_MODIFIED,
+        )
@@ -0,0 +1,180 @@
+"""
+Tests for the maintained recipe counters of tags.
+"""
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from recipes.models import Tag
+from recipes.tests.helpers.fake_recipe import FakeRecipe
+from recipes.tests.test_recipe import create_recipe
+from recipes.utils import add_tags
+from users.tests.test_user_api import create_user
+
+from core.cache import get_response_cache
+from core.tests.helpers.fake_user import FakeUser
+
+
+RECIPES_URL = reverse('recipes:recipe-list')
+TAGS_URL = reverse('recipes:tag-list')
+BULK_URL = reverse('recipes:recipe-bulk')
+
+
+def detail_url(recipe_id):
+    """Create and return a recipe detail URL."""
+    return reverse('recipes:recipe-detail', args=[recipe_id])
+
+
+class TagRecipeCountTests(TestCase):
+    """Test tag counters follow every way of changing links."""
+
+    def setUp(self):
+        get_response_cache().clear()
+        self.client = APIClient()
+        self.fake_user = create_user(**FakeUser().as_dict())
+        self.client.force_authenticate(self.fake_user)
+        self.vegan = Tag.objects.create(user=self.fake_user, name='Vegan')
+        self.quick = Tag.objects.create(user=self.fake_user, name='Quick')
+
+    def assertCounts(self, **counts):
+        """Assert counters of tags, by name, match counts."""
+        self.assertEqual(
+            dict(Tag.objects.values_list('name', 'recipe_count')),
+            counts,
+        )
+        for tag in Tag.objects.all():
+            self.assertEqual(tag.recipe_count, tag.recipe_set.count())
+
+    def test_readding_linked_tag(self):
+        """Test linking an already linked tag again counts it once."""
+        recipes = [create_recipe(user=self.fake_user) for i in range(2)]
+        for recipe in recipes:
+            add_tags(recipe, [self.vegan])
+
+        add_tags(recipes[0], [self.vegan, self.quick])
+
+        self.assertCounts(Vegan=2, Quick=1)
+
+    def test_removing_unlinked_tag(self):
+        """Test removing tags that aren't linked counts nothing out."""
+        recipe = create_recipe(user=self.fake_user)
+        create_recipe(user=self.fake_user).tags.add(self.vegan)
+
+        recipe.tags.remove(self.vegan)
+        self.quick.recipe_set.remove(recipe)
+
+        self.assertCounts(Vegan=1, Quick=0)
+
+    def test_related_manager_changes(self):
+        """Test adding, removing and clearing tags of recipes."""
+        recipe = create_recipe(user=self.fake_user)
+        recipe.tags.add(self.vegan, self.quick)
+        create_recipe(user=self.fake_user).tags.add(self.vegan)
+        self.assertCounts(Vegan=2, Quick=1)
+
+        recipe.tags.remove(self.quick)
+        self.assertCounts(Vegan=2, Quick=0)
+
+        recipe.tags.clear()
+        self.assertCounts(Vegan=1, Quick=0)
+
+        self.quick.recipe_set.add(recipe)
+        self.assertCounts(Vegan=1, Quick=1)
+
+        self.vegan.recipe_set.clear()
+        self.assertCounts(Vegan=0, Quick=1)
+
+    def test_api_changes(self):
+        """Test creating, updating and deleting recipes with the API."""
+        payload = FakeRecipe().__dict__
+        payload['tags'] = [{'name': 'Vegan'}, {'name': 'Spicy'}]
+        res = self.client.post(RECIPES_URL, payload, format='json')
+        self.assertCounts(Vegan=1, Quick=0, Spicy=1)
+
+        self.client.patch(
+            detail_url(res.data['id']),
+            {'tags': [{'name': 'Quick'}, {'name': 'Spicy'}]},
+            format='json',
+        )
+        self.assertCounts(Vegan=0, Quick=1, Spicy=1)
+
+        self.client.delete(detail_url(res.data['id']))
+        self.assertCounts(Vegan=0, Quick=0, Spicy=0)
+
+    def test_bulk_changes(self):
+        """Test bulk creates, updates and deletes."""
+        recipe = create_recipe(user=self.fake_user)
+        recipe.tags.add(self.vegan)
+        doomed = create_recipe(user=self.fake_user)
+        doomed.tags.add(self.vegan, self.quick)
+        created = FakeRecipe().__dict__
+        created['tags'] = [{'name': 'Quick'}, {'name': 'Spicy'}]
+
+        res = self.client.post(BULK_URL, {
+            'create': [created],
+            'update': [{'id': recipe.id, 'tags': [{'name': 'Spicy'}]}],
+            'delete': [doomed.id],
+        }, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertCounts(Vegan=0, Quick=1, Spicy=2)
+
+    def test_list_counts_and_ordering(self):
+        """Test listing tags by their number of recipes."""
+        for i in range(2):
+            create_recipe(user=self.fake_user).tags.add(self.quick)
+        create_recipe(user=self.fake_user).tags.add(self.vegan)
+
+        res = self.client.get(TAGS_URL, {'ordering': '-recipe_count'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['results'], [
+            {'id': self.quick.id, 'name': 'Quick', 'recipe_count': 2},
+            {'id': self.vegan.id, 'name': 'Vegan', 'recipe_count': 1},
+        ])
+
+    def test_invalid_ordering(self):
+        """Test unknown orderings are rejected."""
+        res = self.client.get(TAGS_URL, {'ordering': 'user'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('ordering', res.data)
+
+    def test_count_change_invalidates_tag_list(self):
+        """Test linking a recipe changes the cached tag list."""
+        self.client.get(TAGS_URL)
+        create_recipe(user=self.fake_user).tags.add(self.vegan)
+
+        res = self.client.get(TAGS_URL)
+
+        self.assertEqual(
+            {tag['name']: tag['recipe_count'] for tag in res.data['results']},
+            {'Vegan': 1, 'Quick': 0},
+        )
+
+
+class RecountTagsTests(TestCase):
+    """Test the command repairing tag counters."""
+
+    def test_recount_fixes_drift(self):
+        """Test drifted counters are recomputed in batches."""
+        user = create_user(**FakeUser().as_dict())
+        tags = [
+            Tag.objects.create(user=user, name=f'Tag {i}') for i in range(3)
+        ]
+        create_recipe(user=user).tags.add(*tags[:2])
+        Tag.objects.filter(pk=tags[0].pk).update(recipe_count=7)
+        Tag.objects.filter(pk=tags[2].pk).update(recipe_count=2)
+        out = StringIO()
+
+        call_command('recount_tags', batch_size=2, stdout=out)
+
+        counts = Tag.objects.order_by('pk') \
+            .values_list('recipe_count', flat=True)
+        self.assertEqual(list(counts), [1, 1, 0])
+        self.assertIn('Recounted 3 tags, fixed 2.', out.getvalue())
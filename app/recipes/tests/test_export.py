@@ -0,0 +1,97 @@
+"""
+Tests for exporting recipes.
+"""
+import csv
+import io
+import json
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from recipes.models import Tag
+from recipes.tests.test_recipe import create_recipe
+from recipes.views import RecipeViewSet
+from users.tests.test_user_api import create_user
+
+from core.tests.helpers.fake_user import FakeUser
+
+
+EXPORT_URL = reverse('recipes:recipe-export')
+
+
+class RecipeExportAPITests(TestCase):
+    """Test streaming recipe exports."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.fake_user = create_user(**FakeUser().as_dict())
+        self.client.force_authenticate(self.fake_user)
+        self.tag = Tag.objects.create(user=self.fake_user, name='Vegan')
+        self.recipes = [create_recipe(user=self.fake_user) for i in range(5)]
+        self.recipes[0].tags.add(self.tag)
+
+    def export(self, export_type):
+        """Export recipes and return the streamed content."""
+        res = self.client.get(EXPORT_URL, {'type': export_type})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        return b''.join(res.streaming_content).decode('utf-8')
+
+    def test_export_ndjson(self):
+        """Test exporting recipes as one JSON document per line."""
+        lines = self.export('ndjson').splitlines()
+
+        recipes = [json.loads(line) for line in lines]
+        self.assertEqual(
+            [recipe['id'] for recipe in recipes],
+            [recipe.id for recipe in self.recipes],
+        )
+        self.assertEqual(recipes[0]['title'], self.recipes[0].title)
+        self.assertEqual(
+            recipes[0]['description'],
+            self.recipes[0].description,
+        )
+        self.assertEqual(
+            recipes[0]['tags'],
+            [{'id': self.tag.id, 'name': 'Vegan'}],
+        )
+
+    def test_export_csv(self):
+        """Test exporting recipes as CSV rows."""
+        rows = list(csv.DictReader(io.StringIO(self.export('csv'))))
+
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0]['id'], str(self.recipes[0].id))
+        self.assertEqual(Decimal(rows[0]['price']), self.recipes[0].price)
+        self.assertEqual(json.loads(rows[0]['tags']), ['Vegan'])
+        self.assertEqual(json.loads(rows[1]['tags']), [])
+
+    def test_export_limited_to_user(self):
+        """Test only recipes of the authenticated user are exported."""
+        create_recipe(user=create_user(**FakeUser().as_dict()))
+
+        self.assertEqual(len(self.export('ndjson').splitlines()), 5)
+
+    def test_export_invalid_type(self):
+        """Test an unknown export type is rejected."""
+        res = self.client.get(EXPORT_URL, {'type': 'xml'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @patch.object(RecipeViewSet, 'export_chunk_size', 2)
+    def test_export_prefetches_tags_per_chunk(self):
+        """Test tags are fetched with one query per chunk of recipes."""
+        res = self.client.get(EXPORT_URL)
+
+        # One query read from the cursor in chunks, plus one tag query for
+        # each of the three chunks.
+        with self.assertNumQueries(4):
+            lines = b''.join(res.streaming_content).splitlines()
+
+        self.assertEqual(len(lines), 5)
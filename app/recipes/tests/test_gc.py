@@ -0,0 +1,70 @@
+"""
+Tests for garbage collecting orphan tags.
+"""
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from recipes.gc import start_scheduler
+from recipes.models import Tag, Tombstone
+from recipes.tests.test_recipe import create_recipe
+from users.tests.test_user_api import create_user
+
+from core.tests.helpers.fake_user import FakeUser
+
+
+class GarbageCollectTagsTests(TestCase):
+    """Test the gc_tags command."""
+
+    def setUp(self):
+        self.fake_user = create_user(**FakeUser().as_dict())
+        self.orphans = [
+            Tag.objects.create(user=self.fake_user, name=f'orphan {i}')
+            for i in range(3)
+        ]
+        self.used = Tag.objects.create(user=self.fake_user, name='used')
+        create_recipe(user=self.fake_user).tags.add(self.used)
+        Tag.objects.update(created_at=timezone.now() - timedelta(days=2))
+        self.young = Tag.objects.create(user=self.fake_user, name='young')
+
+    def gc_tags(self, **options):
+        """Run the command, returning its output."""
+        out = StringIO()
+        call_command('gc_tags', stdout=out, **options)
+        return out.getvalue()
+
+    def test_deletes_old_orphans(self):
+        """Test only old unused tags are deleted, in batches."""
+        out = self.gc_tags(batch_size=2, grace_hours=24)
+
+        self.assertEqual(
+            set(Tag.objects.values_list('name', flat=True)),
+            {'used', 'young'},
+        )
+        self.assertEqual(
+            set(Tombstone.objects.values_list('object_id', flat=True)),
+            {tag.id for tag in self.orphans},
+        )
+        self.assertIn('Deleted 3 orphan tags', out)
+
+    def test_grace_period(self):
+        """Test a longer grace period keeps more recent orphans."""
+        self.gc_tags(grace_hours=72)
+
+        self.assertEqual(Tag.objects.count(), 5)
+
+    def test_dry_run(self):
+        """Test a dry run counts orphans without deleting them."""
+        out = self.gc_tags(dry_run=True, grace_hours=24)
+
+        self.assertIn('Found 3 orphan tags', out)
+        self.assertEqual(Tag.objects.count(), 5)
+        self.assertFalse(Tombstone.objects.exists())
+
+    @override_settings(TAG_GC_INTERVAL=0)
+    def test_scheduler_disabled(self):
+        """Test no collector thread is started without an interval."""
+        self.assertIsNone(start_scheduler())
@@ -0,0 +1,208 @@
+"""
+Tests for the import_recipes command.
+"""
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import skipUnless
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from recipes.models import Recipe, Tag
+from recipes.tests.helpers.fake_recipe import FakeRecipe
+from recipes.tests.test_recipe import create_recipe
+from users.tests.test_user_api import create_user
+
+from core.tests.helpers.fake_user import FakeUser
+
+
+def fake_row(**params):
+    """Return a recipe row for importing."""
+    row = FakeRecipe().__dict__
+    row['price'] = str(row['price'])
+    row.update(params)
+    return row
+
+
+class ImportRecipesTests(TestCase):
+    """Test importing recipes from files."""
+
+    def setUp(self):
+        self.fake_user = create_user(**FakeUser().as_dict())
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+
+    def write(self, name, content):
+        """Write a file to import and return its path."""
+        path = os.path.join(self.dir.name, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
+
+    def write_ndjson(self, rows):
+        """Write rows as NDJSON and return the file path."""
+        return self.write(
+            'recipes.ndjson',
+            ''.join(json.dumps(row) + '\n' for row in rows),
+        )
+
+    def run_import(self, path, **options):
+        """Run the import for the test user and return its output."""
+        out = StringIO()
+        call_command(
+            'import_recipes',
+            path,
+            user=self.fake_user.email,
+            stdout=out,
+            **{'copy': False, 'stderr': StringIO(), **options},
+        )
+        return out.getvalue()
+
+    def test_import_ndjson(self):
+        """Test importing recipes with tags in chunks."""
+        Tag.objects.create(user=self.fake_user, name='Vegan')
+        rows = [
+            fake_row(tags=[{'name': 'Vegan'}, {'name': 'Quick'}]),
+            fake_row(tags=['Quick']),
+            fake_row(),
+        ]
+
+        out = self.run_import(self.write_ndjson(rows), chunk_size=2)
+
+        recipes = Recipe.objects.filter(user=self.fake_user).order_by('id')
+        self.assertEqual(
+            [recipe.title for recipe in recipes],
+            [row['title'] for row in rows],
+        )
+        self.assertEqual(
+            {tag.name for tag in recipes[0].tags.all()},
+            {'Vegan', 'Quick'},
+        )
+        self.assertEqual(Tag.objects.filter(user=self.fake_user).count(), 2)
+        self.assertIn('rows/s', out)
+
+    def test_import_skips_invalid_rows(self):
+        """Test rows failing validation are reported and skipped."""
+        invalid = fake_row()
+        del invalid['title']
+
+        out = self.run_import(self.write_ndjson([fake_row(), invalid]))
+
+        self.assertEqual(Recipe.objects.count(), 1)
+        self.assertIn('skipped 1', out)
+
+    def test_import_skips_undecodable_rows(self):
+        """Test lines that are no JSON are reported and skipped."""
+        rows = [fake_row(), fake_row()]
+        path = self.write(
+            'recipes.ndjson',
+            f'{json.dumps(rows[0])}\n{{oops\n{json.dumps(rows[1])}\n',
+        )
+        err = StringIO()
+
+        out = self.run_import(path, stderr=err)
+
+        self.assertEqual(Recipe.objects.count(), 2)
+        self.assertIn('skipped 1', out)
+        self.assertIn('Row 2: ', err.getvalue())
+
+    def test_import_skips_rows_with_tags_no_list(self):
+        """Test rows whose tags are no list are reported and skipped."""
+        rows = [fake_row(), fake_row(tags=5), fake_row(tags='vegan')]
+        err = StringIO()
+
+        out = self.run_import(self.write_ndjson(rows), stderr=err)
+
+        self.assertEqual(Recipe.objects.count(), 1)
+        self.assertFalse(Tag.objects.exists())
+        self.assertIn('skipped 2', out)
+        self.assertIn('Row 2: ', err.getvalue())
+        self.assertIn('Row 3: ', err.getvalue())
+        self.assertIn('Expected a list of items', err.getvalue())
+
+    def test_import_skips_csv_rows_with_invalid_tags(self):
+        """Test CSV rows whose tags are no JSON are skipped."""
+        path = self.write(
+            'recipes.csv',
+            'title,time_minutes,price,tags\n'
+            'Soup,10,2.50,"[""Quick""]"\n'
+            'Stew,60,4.00,Quick\n',
+        )
+
+        out = self.run_import(path)
+
+        self.assertEqual(
+            list(Recipe.objects.values_list('title', flat=True)),
+            ['Soup'],
+        )
+        self.assertIn('skipped 1', out)
+
+    def test_import_exported_csv(self):
+        """Test a CSV export can be imported again."""
+        other_user = create_user(**FakeUser().as_dict())
+        recipe = create_recipe(user=other_user)
+        recipe.tags.add(Tag.objects.create(user=other_user, name='Vegan'))
+        client = APIClient()
+        client.force_authenticate(other_user)
+        res = client.get(reverse('recipes:recipe-export'), {'type': 'csv'})
+        content = b''.join(res.streaming_content).decode('utf-8')
+
+        self.run_import(self.write('recipes.csv', content))
+
+        imported = Recipe.objects.get(user=self.fake_user)
+        self.assertEqual(imported.title, recipe.title)
+        self.assertEqual(imported.price, recipe.price)
+        self.assertEqual(
+            [tag.name for tag in imported.tags.all()],
+            ['Vegan'],
+        )
+
+    def test_import_resumes_from_checkpoint(self):
+        """Test rows done by a previous run are not imported again."""
+        rows = [fake_row() for i in range(3)]
+        path = self.write_ndjson(rows)
+        checkpoint = os.path.join(self.dir.name, 'checkpoint')
+        self.write('checkpoint', '2')
+
+        self.run_import(path, checkpoint=checkpoint)
+
+        self.assertEqual(
+            list(Recipe.objects.values_list('title', flat=True)),
+            [rows[2]['title']],
+        )
+        with open(checkpoint) as f:
+            self.assertEqual(f.read(), '3')
+
+    @skipUnless(connection.vendor == 'postgresql', 'Requires Postgres.')
+    def test_import_with_copy(self):
+        """Test loading recipes with COPY."""
+        rows = [fake_row(tags=['Quick']) for i in range(3)]
+
+        self.run_import(self.write_ndjson(rows), copy=True)
+
+        recipes = Recipe.objects.filter(
+            user=self.fake_user,
+            tags__name='Quick',
+        )
+        self.assertEqual(recipes.count(), 3)
+        # Ids were taken from the sequence, later inserts don't collide.
+        self.assertGreater(
+            create_recipe(user=self.fake_user).id,
+            max(recipe.id for recipe in recipes),
+        )
+
+    def test_import_unknown_user(self):
+        """Test importing for a missing user fails."""
+        with self.assertRaises(CommandError):
+            call_command(
+                'import_recipes',
+                self.write_ndjson([fake_row()]),
+                user='missing@example.com',
+            )
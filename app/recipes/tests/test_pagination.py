@@ -0,0 +1,139 @@
+"""
+Tests for keyset pagination of the recipe and tag lists.
+"""
+import json
+from base64 import urlsafe_b64encode
+
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from recipes.models import Tag
+from recipes.tests.test_recipe import create_recipe
+from users.tests.test_user_api import create_user
+
+from core.tests.helpers.fake_user import FakeUser
+
+
+RECIPES_URL = reverse('recipes:recipe-list')
+TAGS_URL = reverse('recipes:tag-list')
+
+
+def encode_cursor(cursor):
+    """Return cursor encoded like the pagination does."""
+    return urlsafe_b64encode(json.dumps(cursor).encode('utf-8')).decode()
+
+
+class KeysetPaginationTests(TestCase):
+    """Test paginating lists with opaque cursors."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.fake_user = create_user(**FakeUser().as_dict())
+        self.client.force_authenticate(self.fake_user)
+
+    def walk(self, url, direction='next'):
+        """Follow links from url and return ids of every page."""
+        pages = []
+        while url:
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            pages.append([item['id'] for item in res.data['results']])
+            url = res.data[direction]
+
+        return pages
+
+    def test_recipes_first_page(self):
+        """Test first page holds the newest recipes and a next link."""
+        recipes = [create_recipe(user=self.fake_user) for i in range(5)]
+
+        res = self.client.get(RECIPES_URL, {'page_size': 2})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [recipe['id'] for recipe in res.data['results']],
+            [recipes[4].id, recipes[3].id],
+        )
+        self.assertIsNotNone(res.data['next'])
+        self.assertIsNone(res.data['previous'])
+
+    def test_recipes_walk_forward_and_back(self):
+        """Test following cursors visits every recipe exactly once."""
+        ids = [create_recipe(user=self.fake_user).id for i in range(7)]
+
+        pages = self.walk(f'{RECIPES_URL}?page_size=3')
+
+        self.assertEqual(len(pages), 3)
+        self.assertEqual(sum(pages, []), sorted(ids, reverse=True))
+
+        res = self.client.get(RECIPES_URL, {'page_size': 3})
+        res = self.client.get(res.data['next'])
+        res = self.client.get(res.data['next'])
+        back = self.walk(res.data['previous'], direction='previous')
+        self.assertEqual(back, [pages[1], pages[0]])
+
+    def test_tags_ordered_by_count_then_id(self):
+        """Test tags sharing a recipe count are split across pages by id."""
+        recipe = create_recipe(user=self.fake_user)
+        for name, used in [('a', 1), ('b', 0), ('c', 1), ('d', 0), ('e', 1)]:
+            tag = Tag.objects.create(user=self.fake_user, name=name)
+            if used:
+                recipe.tags.add(tag)
+        expected = list(
+            Tag.objects.filter(user=self.fake_user)
+            .order_by('-recipe_count', '-id').values_list('id', flat=True)
+        )
+
+        pages = self.walk(f'{TAGS_URL}?ordering=-recipe_count&page_size=2')
+
+        self.assertEqual(sum(pages, []), expected)
+
+    def test_invalid_cursor(self):
+        """Test a malformed cursor returns 404."""
+        res = self.client.get(RECIPES_URL, {'cursor': 'not-a-cursor'})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_ill_typed_cursor(self):
+        """Test a cursor of values its ordering can't take returns 404."""
+        cursors = [
+            (RECIPES_URL, ['abc']),
+            (RECIPES_URL, [{'a': 1}]),
+            (RECIPES_URL, [None]),
+            (RECIPES_URL, [True]),
+            (TAGS_URL, [1, 'x']),
+            (f'{RECIPES_URL}?search=curry', ['high', 1]),
+        ]
+        for url, position in cursors:
+            with self.subTest(url=url, position=position):
+                res = self.client.get(url, {
+                    'cursor': encode_cursor({'p': position}),
+                })
+
+                self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cursor_values_converted(self):
+        """Test cursor values are converted to their field types."""
+        recipes = [create_recipe(user=self.fake_user) for i in range(3)]
+
+        res = self.client.get(RECIPES_URL, {
+            'cursor': encode_cursor({'p': [str(recipes[2].id)]}),
+        })
+
+        self.assertEqual(
+            [recipe['id'] for recipe in res.data['results']],
+            [recipes[1].id, recipes[0].id],
+        )
+
+    @override_settings(MAX_PAGE_SIZE=3)
+    def test_page_size_capped(self):
+        """Test requested page size is capped by max_page_size."""
+        for i in range(5):
+            create_recipe(user=self.fake_user)
+
+        res = self.client.get(RECIPES_URL, {'page_size': 100})
+
+        self.assertEqual(len(res.data['results']), 3)
@@ -0,0 +1,231 @@
+"""
+Tests for the database query budget of the recipe API.
+"""
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from recipes.models import Tag
+from recipes.tests.helpers.fake_recipe import FakeRecipe
+from recipes.tests.test_recipe import create_recipe
+from recipes.views import RecipeViewSet
+from users.tests.test_user_api import create_user
+
+from core.tests.helpers.faker import faker
+from core.tests.helpers.fake_user import FakeUser
+
+
+RECIPES_URL = reverse('recipes:recipe-list')
+CHANGES_URL = reverse('recipes:recipe-changes')
+BULK_URL = reverse('recipes:recipe-bulk')
+
+
+def detail_url(recipe_id):
+    """Create and return a recipe detail URL."""
+    return reverse('recipes:recipe-detail', args=[recipe_id])
+
+
+def create_tagged_recipes(user, recipes_count, tags_count):
+    """Create recipes for user, each one with a number of tags."""
+    tags = [
+        Tag.objects.create(user=user, name=f'{faker.word()} {i}')
+        for i in range(tags_count)
+    ]
+    recipes = []
+    for i in range(recipes_count):
+        recipe = create_recipe(user=user)
+        recipe.tags.add(*tags)
+        recipes.append(recipe)
+
+    return recipes
+
+
+class RecipeQueryBudgetTests(TestCase):
+    """Test recipe API actions stay within the declared query budget."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.fake_user = create_user(**FakeUser().as_dict())
+        self.client.force_authenticate(self.fake_user)
+
+    def assertWithinBudget(self, action, request, *args, **kwargs):
+        """Run request and check it against the action query budget."""
+        with CaptureQueriesContext(connection) as queries:
+            res = request(*args, **kwargs)
+
+        budget = RecipeViewSet.query_budget[action]
+        self.assertLessEqual(
+            len(queries),
+            budget,
+            f'{action} ran {len(queries)} queries, budget is {budget}:\n' +
+            '\n'.join(query['sql'] for query in queries.captured_queries),
+        )
+        return res, len(queries)
+
+    def test_list_budget_independent_of_size(self):
+        """Test listing recipes costs the same for small and big sets."""
+        create_tagged_recipes(self.fake_user, 1, 1)
+        res, small = self.assertWithinBudget(
+            'list', self.client.get, RECIPES_URL,
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        create_tagged_recipes(self.fake_user, 20, 5)
+        res, big = self.assertWithinBudget(
+            'list', self.client.get, RECIPES_URL,
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['results']), 21)
+        self.assertEqual(small, big)
+
+    def test_retrieve_budget_independent_of_tags(self):
+        """Test retrieving a recipe costs the same regardless of tags."""
+        few_tags = create_tagged_recipes(self.fake_user, 1, 1)[0]
+        many_tags = create_tagged_recipes(self.fake_user, 1, 15)[0]
+
+        res, small = self.assertWithinBudget(
+            'retrieve', self.client.get, detail_url(few_tags.id),
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        res, big = self.assertWithinBudget(
+            'retrieve', self.client.get, detail_url(many_tags.id),
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['tags']), 15)
+        self.assertEqual(small, big)
+
+    def test_create_budget(self):
+        """Test creating a recipe stays within budget."""
+        create_tagged_recipes(self.fake_user, 5, 5)
+
+        res, _ = self.assertWithinBudget(
+            'create', self.client.post, RECIPES_URL, FakeRecipe().__dict__,
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_partial_update_budget(self):
+        """Test updating a recipe with many tags stays within budget."""
+        recipe = create_tagged_recipes(self.fake_user, 1, 15)[0]
+
+        res, _ = self.assertWithinBudget(
+            'partial_update',
+            self.client.patch,
+            detail_url(recipe.id),
+            {'title': faker.sentence()},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['tags']), 15)
+
+    def test_full_update_budget(self):
+        """Test full update of a recipe stays within budget."""
+        recipe = create_tagged_recipes(self.fake_user, 1, 15)[0]
+
+        res, _ = self.assertWithinBudget(
+            'update',
+            self.client.put,
+            detail_url(recipe.id),
+            FakeRecipe().__dict__,
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_destroy_budget(self):
+        """Test deleting a recipe with many tags stays within budget."""
+        recipe = create_tagged_recipes(self.fake_user, 1, 15)[0]
+
+        res, _ = self.assertWithinBudget(
+            'destroy', self.client.delete, detail_url(recipe.id),
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+
+    def test_create_budget_independent_of_tags(self):
+        """Test creating a recipe costs the same for few and many tags."""
+        Tag.objects.create(user=self.fake_user, name='existing')
+        few_tags = FakeRecipe().__dict__
+        few_tags['tags'] = [{'name': 'existing'}, {'name': 'fresh'}]
+        many_tags = FakeRecipe().__dict__
+        many_tags['tags'] = [{'name': 'existing'}] + [
+            {'name': f'tag-{i}'} for i in range(30)
+        ]
+
+        res, small = self.assertWithinBudget(
+            'create', self.client.post, RECIPES_URL, few_tags, format='json',
+        )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        res, big = self.assertWithinBudget(
+            'create', self.client.post, RECIPES_URL, many_tags, format='json',
+        )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data['tags']), 31)
+        self.assertEqual(small, big)
+
+    def test_update_tags_budget_independent_of_tags(self):
+        """Test replacing recipe tags costs the same for any tag count."""
+        recipe = create_tagged_recipes(self.fake_user, 1, 15)[0]
+        payloads = [
+            [{'name': 'fresh'}],
+            [{'name': f'tag-{i}'} for i in range(30)],
+        ]
+
+        counts = []
+        for tags in payloads:
+            res, count = self.assertWithinBudget(
+                'partial_update',
+                self.client.patch,
+                detail_url(recipe.id),
+                {'tags': tags},
+                format='json',
+            )
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(res.data['tags']), len(tags))
+            counts.append(count)
+
+        self.assertEqual(counts[0], counts[1])
+
+    def test_changes_budget_independent_of_size(self):
+        """Test syncing changes costs the same for small and big sets."""
+        since = self.client.get(CHANGES_URL).data['token']
+        create_tagged_recipes(self.fake_user, 2, 1)[0].delete()
+        res, small = self.assertWithinBudget(
+            'changes', self.client.get, CHANGES_URL, {'since': since},
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        for recipe in create_tagged_recipes(self.fake_user, 20, 5)[:5]:
+            recipe.delete()
+        res, big = self.assertWithinBudget(
+            'changes', self.client.get, CHANGES_URL, {'since': since},
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['recipes']), 16)
+        self.assertEqual(len(res.data['deleted']['recipes']), 6)
+        self.assertEqual(small, big)
+
+    def test_bulk_budget_independent_of_size(self):
+        """Test bulk updates and deletes cost the same for any count."""
+        counts = []
+        for size in (1, 10):
+            recipes = create_tagged_recipes(self.fake_user, size * 2, 3)
+            payload = {
+                'update': [
+                    {'id': recipe.id, 'title': faker.sentence(),
+                     'tags': [{'name': f'fresh-{size}'}]}
+                    for recipe in recipes[:size]
+                ],
+                'delete': [recipe.id for recipe in recipes[size:]],
+            }
+            res, count = self.assertWithinBudget(
+                'bulk', self.client.post, BULK_URL, payload, format='json',
+            )
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(res.data['updated']), size)
+            counts.append(count)
+
+        self.assertEqual(counts[0], counts[1])
@@ -1,5 +1,9 @@
+from decimal import Decimal
+
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from rest_framework import status
@@ -75,7 +79,7 @@ class PrivateRecipeAPITests(TestCase):
         recipes = Recipe.objects.all().order_by('-id')
         serializer = RecipeSerializer(recipes, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_recipe_list_limited_to_user(self):
         """Test list of recipes is limited to authenticated user."""
@@ -90,7 +94,7 @@ class PrivateRecipeAPITests(TestCase):
         recipes = Recipe.objects.filter(user=self.fake_user)
         serializer = RecipeSerializer(recipes, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_get_recipe_detail(self):
         """Test get recipe detail."""
@@ -246,7 +250,7 @@ class PrivateRecipeAPITests(TestCase):
 
         additional_tag = Tag.objects.create(
             user=self.fake_user,
-            name=faker.word()
+            name=f'{new_tag.name} extra',
         )
         res = self.client.patch(
             reverse('recipes:recipe-detail', args=[recipe.id]),
@@ -274,3 +278,94 @@ class PrivateRecipeAPITests(TestCase):
         recipe.refresh_from_db()
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(recipe.tags.count(), 0)
+
+    def test_partial_update_saves_changed_fields_only(self):
+        """Test partial update writes only the modified columns."""
+        recipe = create_recipe(user=self.fake_user)
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.patch(
+                reverse('recipes:recipe-detail', args=[recipe.id]),
+                {'title': faker.sentence(), 'link': recipe.link},
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        updates = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('UPDATE')
+        ]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"title"', updates[0])
+        self.assertNotIn('"link"', updates[0])
+        self.assertNotIn('"description"', updates[0])
+
+    def test_update_with_same_tags_keeps_links(self):
+        """Test updating with an unchanged tag set keeps through rows."""
+        recipe = create_recipe(user=self.fake_user)
+        tag = Tag.objects.create(user=self.fake_user, name=faker.word())
+        recipe.tags.add(tag)
+        link = Recipe.tags.through.objects.get(recipe=recipe)
+
+        res = self.client.patch(
+            reverse('recipes:recipe-detail', args=[recipe.id]),
+            {'tags': [{'name': tag.name}]},
+            format='json',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            Recipe.tags.through.objects.get(recipe=recipe).pk,
+            link.pk,
+        )
+
+    def test_filter_by_tags(self):
+        """Test filtering recipes by tags."""
+        first = create_recipe(user=self.fake_user)
+        second = create_recipe(user=self.fake_user)
+        untagged = create_recipe(user=self.fake_user)
+        vegan = Tag.objects.create(user=self.fake_user, name='vegan')
+        quick = Tag.objects.create(user=self.fake_user, name='quick')
+        first.tags.add(vegan, quick)
+        second.tags.add(quick)
+
+        res = self.client.get(RECIPES_URL, {'tags': f'{vegan.id},{quick.id}'})
+
+        ids = [recipe['id'] for recipe in res.data['results']]
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(ids, [second.id, first.id])
+        self.assertNotIn(untagged.id, ids)
+
+    def test_filter_by_time_and_price(self):
+        """Test filtering recipes by time and price range."""
+        match = create_recipe(
+            user=self.fake_user, time_minutes=10, price=Decimal('5.50'),
+        )
+        create_recipe(
+            user=self.fake_user, time_minutes=60, price=Decimal('5.50'),
+        )
+        create_recipe(
+            user=self.fake_user, time_minutes=10, price=Decimal('50.00'),
+        )
+
+        res = self.client.get(
+            RECIPES_URL,
+            {'time_minutes__lte': 30, 'price__range': '1,10'},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [recipe['id'] for recipe in res.data['results']],
+            [match.id],
+        )
+
+    def test_filter_invalid_params(self):
+        """Test malformed filter values return a 400 error."""
+        for params in [
+            {'tags': 'a,b'},
+            {'time_minutes__lte': 'soon'},
+            {'price__range': '1'},
+            {'price__range': '1,cheap'},
+        ]:
+            res = self.client.get(RECIPES_URL, params)
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
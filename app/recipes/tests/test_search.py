@@ -0,0 +1,134 @@
+"""
+Tests for searching recipes.
+"""
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from recipes.models import Recipe
+from recipes.search import search_recipes
+from recipes.tests.test_recipe import create_recipe
+from users.tests.test_user_api import create_user
+
+from core.tests.helpers.fake_user import FakeUser
+
+
+RECIPES_URL = reverse('recipes:recipe-list')
+
+
+def follow_pages(test, client, url, limit=10):
+    """Return ids of the results of url and its next pages."""
+    ids = []
+    for i in range(limit):
+        res = client.get(url)
+        ids += [recipe['id'] for recipe in res.data['results']]
+        url = res.data['next']
+        if not url:
+            return ids
+
+    test.fail(f'More than {limit} pages.')
+
+
+class RecipeSearchAPITests(TestCase):
+    """Test searching recipes through the API."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.fake_user = create_user(**FakeUser().as_dict())
+        self.client.force_authenticate(self.fake_user)
+        self.in_description = create_recipe(
+            user=self.fake_user,
+            title='Weeknight dinner',
+            description='A quick curry with chickpeas.',
+        )
+        self.in_title = create_recipe(
+            user=self.fake_user,
+            title='Chickpea curry',
+            description='Slow cooked and spicy.',
+        )
+        self.unrelated = create_recipe(
+            user=self.fake_user,
+            title='Lemon cake',
+            description='Sweet and light.',
+        )
+
+    def search(self, text):
+        """Search recipes and return ids of results."""
+        res = self.client.get(RECIPES_URL, {'search': text})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [recipe['id'] for recipe in res.data['results']]
+
+    def test_search_ranks_title_matches_first(self):
+        """Test title matches are ranked above description matches."""
+        ids = self.search('curry')
+
+        self.assertEqual(ids, [self.in_title.id, self.in_description.id])
+
+    def test_search_requires_every_word(self):
+        """Test all words of the search must match."""
+        self.assertEqual(self.search('curry spicy'), [self.in_title.id])
+
+    def test_search_limited_to_user(self):
+        """Test search only returns recipes of the authenticated user."""
+        other_user = create_user(**FakeUser().as_dict())
+        create_recipe(user=other_user, title='Lemon tart')
+
+        self.assertEqual(self.search('lemon'), [self.unrelated.id])
+
+    def test_blank_search_lists_everything(self):
+        """Test a blank search does not filter the list."""
+        self.assertEqual(len(self.search('  ')), 3)
+
+    def test_search_pages_by_rank(self):
+        """Test following cursors of a search visits every result."""
+        for i in range(4):
+            create_recipe(user=self.fake_user, title=f'Curry {i}')
+
+        ids = follow_pages(
+            self, self.client, f'{RECIPES_URL}?search=curry&page_size=2',
+        )
+
+        self.assertEqual(len(ids), 6)
+        self.assertEqual(len(set(ids)), 6)
+        self.assertEqual(ids[-1], self.in_description.id)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Requires Postgres.')
+class RecipeSearchVectorTests(TestCase):
+    """Test the trigger maintained search vector on Postgres."""
+
+    def test_search_vector_follows_updates(self):
+        """Test the search vector is refreshed when the title changes."""
+        user = create_user(**FakeUser().as_dict())
+        recipe = create_recipe(user=user, title='Banana bread')
+        recipe.title = 'Cherry pie'
+        recipe.save(update_fields=['title'])
+
+        queryset = Recipe.objects.filter(user=user)
+        self.assertFalse(search_recipes(queryset, 'banana').exists())
+        self.assertTrue(search_recipes(queryset, 'cherries').exists())
+
+    def test_search_pages_by_fractional_rank(self):
+        """Test cursors of real valued ranks visit every result once."""
+        user = create_user(**FakeUser().as_dict())
+        client = APIClient()
+        client.force_authenticate(user)
+        for i in range(3):
+            for words in ['Curry', 'Green curry', 'Thai green curry paste']:
+                create_recipe(user=user, title=words)
+        rank = search_recipes(Recipe.objects.all(), 'curry') \
+            .values_list('rank', flat=True).first()
+        self.assertNotEqual(rank, int(rank))
+
+        ids = follow_pages(
+            self, client, f'{RECIPES_URL}?search=curry&page_size=2',
+        )
+
+        self.assertEqual(len(ids), 9)
+        self.assertEqual(len(set(ids)), 9)
@@ -0,0 +1,118 @@
+"""
+Tests for sparse fieldsets of the recipe and tag APIs.
+"""
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from recipes.models import Tag
+from recipes.tests.test_recipe import create_recipe
+from users.tests.test_user_api import create_user
+
+from core.tests.helpers.fake_user import FakeUser
+
+
+RECIPES_URL = reverse('recipes:recipe-list')
+TAGS_URL = reverse('recipes:tag-list')
+
+
+def detail_url(recipe_id):
+    """Create and return a recipe detail URL."""
+    return reverse('recipes:recipe-detail', args=[recipe_id])
+
+
+class SparseFieldsTests(TestCase):
+    """Test selecting response fields with `fields` and `omit`."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.fake_user = create_user(**FakeUser().as_dict())
+        self.client.force_authenticate(self.fake_user)
+        self.tag = Tag.objects.create(user=self.fake_user, name='Vegan')
+        self.recipe = create_recipe(user=self.fake_user)
+        self.recipe.tags.add(self.tag)
+
+    def get(self, url, params):
+        """Get url, returning the response and its SQL."""
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(url, params)
+
+        return res, [query['sql'] for query in queries]
+
+    def test_list_fields(self):
+        """Test listing only the requested fields."""
+        res, queries = self.get(RECIPES_URL, {'fields': 'tags,title,id'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['results'], [{
+            'id': self.recipe.id,
+            'title': self.recipe.title,
+            'tags': [{'id': self.tag.id, 'name': 'Vegan'}],
+        }])
+        self.assertFalse(any('"price"' in sql for sql in queries))
+
+    def test_list_omit_tags(self):
+        """Test leaving out tags skips reading them."""
+        res, queries = self.get(RECIPES_URL, {'omit': 'tags,link'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            list(res.data['results'][0]),
+            ['id', 'title', 'time_minutes', 'price'],
+        )
+        self.assertFalse(any('recipe_tags' in sql for sql in queries))
+
+    def test_retrieve_fields(self):
+        """Test retrieving only the requested fields."""
+        res, queries = self.get(
+            detail_url(self.recipe.id),
+            {'fields': 'title'},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {'title': self.recipe.title})
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('"description"', queries[0])
+
+    def test_retrieve_fields_etag(self):
+        """Test each selection of fields has its own ETag."""
+        url = detail_url(self.recipe.id)
+        full = self.client.get(url)['ETag']
+        sparse = self.client.get(url, {'fields': 'title'})['ETag']
+
+        self.assertNotEqual(full, sparse)
+        res = self.client.get(
+            url,
+            {'fields': 'title'},
+            HTTP_IF_NONE_MATCH=sparse,
+        )
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_tag_list_fields(self):
+        """Test listing only the requested tag fields."""
+        res = self.client.get(TAGS_URL, {'fields': 'name'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['results'], [{'name': 'Vegan'}])
+
+    def test_unknown_field(self):
+        """Test unknown fields are rejected."""
+        for params in [{'fields': 'title,secret'}, {'omit': 'secret'}]:
+            res = self.client.get(RECIPES_URL, params)
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn(list(params)[0], res.data)
+
+    def test_writes_ignore_fields(self):
+        """Test write responses include every field."""
+        res = self.client.patch(
+            f'{detail_url(self.recipe.id)}?fields=title',
+            {'title': 'Renamed'},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn('description', res.data)
@@ -0,0 +1,146 @@
+"""
+Tests for delta sync of recipes and tags.
+"""
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from recipes.models import Tag, Tombstone
+from recipes.sync import issue_token
+from recipes.tests.test_recipe import create_recipe
+from users.tests.test_user_api import create_user
+
+from core.tests.helpers.fake_user import FakeUser
+
+
+CHANGES_URL = reverse('recipes:recipe-changes')
+
+
+@override_settings(SYNC_TOKEN_LAG=timedelta(0))
+class RecipeChangesAPITests(TestCase):
+    """Test the recipe changes endpoint."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.fake_user = create_user(**FakeUser().as_dict())
+        self.client.force_authenticate(self.fake_user)
+        self.recipe = create_recipe(user=self.fake_user)
+        self.tag = Tag.objects.create(user=self.fake_user, name='Vegan')
+
+    def sync(self, since=None):
+        """Request changes and return the response data."""
+        params = {'since': since} if since else {}
+        res = self.client.get(CHANGES_URL, params)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data
+
+    def test_first_sync_returns_everything(self):
+        """Test syncing without a token returns all recipes and tags."""
+        data = self.sync()
+
+        self.assertTrue(data['token'])
+        self.assertEqual([r['id'] for r in data['recipes']], [self.recipe.id])
+        self.assertEqual([t['id'] for t in data['tags']], [self.tag.id])
+        self.assertEqual(data['deleted'], {'recipes': [], 'tags': []})
+
+    def test_sync_without_changes_is_empty(self):
+        """Test syncing again right away returns nothing."""
+        token = self.sync()['token']
+
+        data = self.sync(token)
+
+        self.assertEqual(data['recipes'], [])
+        self.assertEqual(data['tags'], [])
+
+    def test_sync_returns_changed_objects(self):
+        """Test only objects changed since the token are returned."""
+        create_recipe(user=self.fake_user)
+        token = self.sync()['token']
+
+        self.recipe.title = 'Changed'
+        self.recipe.save()
+        new_tag = Tag.objects.create(user=self.fake_user, name='Quick')
+        data = self.sync(token)
+
+        self.assertEqual([r['id'] for r in data['recipes']], [self.recipe.id])
+        self.assertEqual(data['recipes'][0]['title'], 'Changed')
+        self.assertEqual([t['id'] for t in data['tags']], [new_tag.id])
+
+    def test_sync_returns_tagged_recipes(self):
+        """Test tagging a recipe returns both the recipe and the tag."""
+        token = self.sync()['token']
+
+        self.recipe.tags.add(self.tag)
+        data = self.sync(token)
+
+        self.assertEqual([r['id'] for r in data['recipes']], [self.recipe.id])
+        self.assertEqual([t['id'] for t in data['tags']], [self.tag.id])
+
+    def test_sync_returns_deletions(self):
+        """Test deleted recipes and tags are reported by id."""
+        token = self.sync()['token']
+        recipe_id, tag_id = self.recipe.id, self.tag.id
+
+        self.recipe.delete()
+        self.tag.delete()
+        data = self.sync(token)
+
+        self.assertEqual(data['deleted'], {
+            'recipes': [recipe_id],
+            'tags': [tag_id],
+        })
+
+    def test_sync_limited_to_user(self):
+        """Test changes of other users are not returned."""
+        token = self.sync()['token']
+        other_user = create_user(**FakeUser().as_dict())
+        create_recipe(user=other_user).delete()
+        Tag.objects.create(user=other_user, name='Other')
+
+        data = self.sync(token)
+
+        self.assertEqual(data['recipes'], [])
+        self.assertEqual(data['tags'], [])
+        self.assertEqual(data['deleted'], {'recipes': [], 'tags': []})
+
+    def test_invalid_token(self):
+        """Test an invalid token is a bad request."""
+        res = self.client.get(CHANGES_URL, {'since': 'not a token'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_expired_token(self):
+        """Test a token older than the tombstone retention is gone."""
+        token = issue_token(timezone.now() - timedelta(days=365))
+
+        res = self.client.get(CHANGES_URL, {'since': token})
+
+        self.assertEqual(res.status_code, status.HTTP_410_GONE)
+
+
+class PruneTombstonesTests(TestCase):
+    """Test pruning old tombstones."""
+
+    def test_prune_old_tombstones(self):
+        """Test tombstones older than the retention are deleted."""
+        user = create_user(**FakeUser().as_dict())
+        old = timezone.now() - timedelta(days=365)
+        Tombstone.objects.bulk_create([
+            Tombstone(user=user, kind=Tombstone.RECIPE, object_id=i,
+                      deleted_at=old)
+            for i in range(5)
+        ])
+        recent = Tombstone.objects.create(
+            user=user, kind=Tombstone.TAG, object_id=1,
+        )
+
+        call_command('prune_tombstones', batch_size=2, verbosity=0)
+
+        self.assertEqual(list(Tombstone.objects.all()), [recent])
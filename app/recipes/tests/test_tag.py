@@ -1,3 +1,4 @@
+from django.db import IntegrityError
 from django.test import TestCase
 from django.urls import reverse
 
@@ -5,7 +6,8 @@ from rest_framework import status
 from rest_framework.test import APIClient
 
 from recipes.models import Tag
-from recipes.serializers import TagSerializer
+from recipes.serializers import TagDetailSerializer
+from recipes.tests.test_recipe import create_recipe
 from users.tests.test_user_api import create_user
 
 from core.tests.helpers.faker import faker
@@ -13,6 +15,7 @@ from core.tests.helpers.fake_user import FakeUser
 
 
 TAGS_URL = reverse('recipes:tag-list')
+BULK_URL = reverse('recipes:tag-bulk')
 
 
 class TagModelTests(TestCase):
@@ -49,15 +52,15 @@ class PrivateTagAPITest(TestCase):
 
     def test_retrieve_tags(self):
         """Test retrieving a list of tags."""
-        Tag.objects.create(user=self.fake_user, name=faker.word())
-        Tag.objects.create(user=self.fake_user, name=faker.word())
+        tag = Tag.objects.create(user=self.fake_user, name=faker.word())
+        Tag.objects.create(user=self.fake_user, name=f'{tag.name} extra')
 
         res = self.client.get(TAGS_URL)
 
-        tags = Tag.objects.all().order_by('-name')
-        serializer = TagSerializer(tags, many=True)
+        tags = Tag.objects.all().order_by('-name', '-id')
+        serializer = TagDetailSerializer(tags, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_tags_limited_to_user(self):
         """Test list of  tags is limited to authenticated user."""
@@ -69,9 +72,9 @@ class PrivateTagAPITest(TestCase):
         res = self.client.get(TAGS_URL)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
-        self.assertEqual(res.data[0].get('name'), tag.name)
-        self.assertEqual(res.data[0].get('id'), tag.id)
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertEqual(res.data['results'][0].get('name'), tag.name)
+        self.assertEqual(res.data['results'][0].get('id'), tag.id)
 
     def test_update_tag(self):
         """Test updatinf a tag."""
@@ -97,3 +100,74 @@ class PrivateTagAPITest(TestCase):
 
         self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
         self.assertFalse(Tag.objects.filter(user=self.fake_user).exists())
+
+    def test_retrieve_tag_not_allowed(self):
+        """Test tags have no detail GET, like before responses were cached."""
+        tag = Tag.objects.create(user=self.fake_user, name=faker.word())
+
+        res = self.client.get(reverse('recipes:tag-detail', args=[tag.id]))
+
+        self.assertEqual(res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    def test_filter_tags_assigned_to_recipes(self):
+        """Test listing only tags assigned to recipes."""
+        assigned = Tag.objects.create(user=self.fake_user, name='assigned')
+        Tag.objects.create(user=self.fake_user, name='unassigned')
+        for i in range(2):
+            recipe = create_recipe(user=self.fake_user)
+            recipe.tags.add(assigned)
+
+        res = self.client.get(TAGS_URL, {'assigned_only': 1})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [tag['id'] for tag in res.data['results']],
+            [assigned.id],
+        )
+
+    def test_update_tag_duplicate_name(self):
+        """Test renaming a tag to the name of another tag fails."""
+        tag = Tag.objects.create(user=self.fake_user, name='vegan')
+        Tag.objects.create(user=self.fake_user, name='quick')
+
+        res = self.client.patch(
+            reverse('recipes:tag-detail', args=[tag.id]),
+            {'name': 'quick'},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('name', res.data)
+
+    def test_tag_names_unique_per_user(self):
+        """Test a user can't have two tags with the same name."""
+        Tag.objects.create(user=self.fake_user, name='vegan')
+        other_user = create_user(**FakeUser().as_dict())
+        Tag.objects.create(user=other_user, name='vegan')
+
+        with self.assertRaises(IntegrityError):
+            Tag.objects.create(user=self.fake_user, name='vegan')
+
+    def test_bulk_create_tags(self):
+        """Test creating tags in bulk, reusing existing ones."""
+        existing = Tag.objects.create(user=self.fake_user, name='vegan')
+
+        res = self.client.post(
+            BULK_URL,
+            {'names': ['quick', 'vegan', 'quick', 'spicy']},
+            format='json',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [tag['name'] for tag in res.data['tags']],
+            ['quick', 'vegan', 'spicy'],
+        )
+        self.assertEqual(res.data['tags'][1]['id'], existing.id)
+        self.assertEqual(Tag.objects.filter(user=self.fake_user).count(), 3)
+
+    def test_bulk_create_tags_invalid(self):
+        """Test bulk creating tags requires names."""
+        for payload in [{}, {'names': []}, {'names': ['']}]:
+            res = self.client.post(BULK_URL, payload, format='json')
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,198 @@
+"""
+Tests for the recipe tag helpers.
+"""
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from core.db import delete_rows
+from recipes.models import Recipe, Tag
+from recipes.tests.test_recipe import create_recipe
+from recipes.utils import add_tags, resolve_tags, sync_tags
+from users.tests.test_user_api import create_user
+
+from core.tests.helpers.fake_user import FakeUser
+
+
+class ResolveTagsTests(TestCase):
+    """Tests for resolving tag names in bulk."""
+
+    def setUp(self):
+        self.fake_user = create_user(**FakeUser().as_dict())
+
+    def test_resolve_creates_missing_tags(self):
+        """Test missing tags are created for the user."""
+        existing = Tag.objects.create(user=self.fake_user, name='vegan')
+
+        tags = resolve_tags(self.fake_user, ['vegan', 'dinner', 'quick'])
+
+        self.assertEqual(
+            [tag.name for tag in tags],
+            ['vegan', 'dinner', 'quick'],
+        )
+        self.assertEqual(tags[0], existing)
+        self.assertTrue(all(tag.pk for tag in tags))
+        self.assertEqual(Tag.objects.filter(user=self.fake_user).count(), 3)
+
+    def test_resolve_deduplicates_names(self):
+        """Test repeated names resolve to a single tag."""
+        tags = resolve_tags(self.fake_user, ['dinner', 'dinner'])
+
+        self.assertEqual(len(tags), 1)
+        self.assertEqual(Tag.objects.filter(user=self.fake_user).count(), 1)
+
+    def test_resolve_ignores_other_users_tags(self):
+        """Test tags of another user are never reused."""
+        other_user = create_user(**FakeUser().as_dict())
+        other_tag = Tag.objects.create(user=other_user, name='vegan')
+
+        tags = resolve_tags(self.fake_user, ['vegan'])
+
+        self.assertNotEqual(tags[0], other_tag)
+        self.assertEqual(tags[0].user, self.fake_user)
+
+    def test_resolve_existing_single_query(self):
+        """Test resolving existing names is one indexed lookup."""
+        resolve_tags(self.fake_user, ['vegan', 'dinner'])
+
+        with self.assertNumQueries(1):
+            tags = resolve_tags(self.fake_user, ['dinner', 'vegan'])
+
+        self.assertEqual([tag.name for tag in tags], ['dinner', 'vegan'])
+
+    @skipUnless(
+        connection.features.has_select_for_update,
+        'Requires row locks.',
+    )
+    def test_resolve_locks_tags(self):
+        """Test tags resolved to be linked are locked from collection."""
+        resolve_tags(self.fake_user, ['vegan'])
+
+        with CaptureQueriesContext(connection) as queries:
+            tags = resolve_tags(self.fake_user, ['vegan', 'dinner'], lock=True)
+
+        self.assertEqual([tag.name for tag in tags], ['vegan', 'dinner'])
+        self.assertTrue(all(
+            'FOR UPDATE' in query['sql']
+            for query in queries.captured_queries
+            if query['sql'].startswith('SELECT')
+        ))
+
+    def test_resolve_empty(self):
+        """Test resolving no names runs no queries."""
+        with self.assertNumQueries(0):
+            self.assertEqual(resolve_tags(self.fake_user, []), [])
+
+
+class AddTagsTests(TestCase):
+    """Tests for linking tags to a recipe in bulk."""
+
+    def setUp(self):
+        self.fake_user = create_user(**FakeUser().as_dict())
+
+    def test_add_tags_single_insert(self):
+        """Test all tags are linked with one insert."""
+        recipe = create_recipe(user=self.fake_user)
+        tags = resolve_tags(self.fake_user, [f'tag-{i}' for i in range(30)])
+
+        # The lookup of existing links, the insert, then one update each
+        # for recipe and tag timestamps.
+        with self.assertNumQueries(4):
+            add_tags(recipe, tags)
+
+        self.assertEqual(recipe.tags.count(), 30)
+
+    def test_add_tags_skips_linked(self):
+        """Test linking an already linked tag is ignored."""
+        recipe = create_recipe(user=self.fake_user)
+        tags = resolve_tags(self.fake_user, ['vegan'])
+        recipe.tags.add(*tags)
+
+        add_tags(recipe, tags)
+
+        self.assertEqual(recipe.tags.count(), 1)
+
+
+class SyncTagsTests(TestCase):
+    """Tests for syncing recipe tags against a list of names."""
+
+    def setUp(self):
+        self.fake_user = create_user(**FakeUser().as_dict())
+        self.recipe = create_recipe(user=self.fake_user)
+        add_tags(
+            self.recipe,
+            resolve_tags(self.fake_user, ['vegan', 'dinner', 'quick']),
+        )
+
+    def links(self):
+        """Return through table rows of the recipe keyed by tag name."""
+        return {
+            link.tag.name: link.pk
+            for link in Recipe.tags.through.objects.filter(
+                recipe=self.recipe,
+            ).select_related('tag')
+        }
+
+    def test_sync_unchanged_tags_writes_nothing(self):
+        """Test syncing the current tag set runs read queries only."""
+        before = self.links()
+
+        with self.assertNumQueries(1):
+            sync_tags(
+                self.fake_user, self.recipe, ['quick', 'vegan', 'dinner'],
+            )
+
+        self.assertEqual(self.links(), before)
+
+    def test_sync_only_touches_changed_links(self):
+        """Test kept tags keep their through rows."""
+        before = self.links()
+
+        sync_tags(self.fake_user, self.recipe, ['vegan', 'dinner', 'lunch'])
+
+        after = self.links()
+        self.assertEqual(set(after), {'vegan', 'dinner', 'lunch'})
+        self.assertEqual(after['vegan'], before['vegan'])
+        self.assertEqual(after['dinner'], before['dinner'])
+        self.assertTrue(Tag.objects.filter(name='quick').exists())
+
+
+class DeleteRowsTests(TestCase):
+    """Test the signal-less deletes of recipes and tags."""
+
+    def setUp(self):
+        self.fake_user = create_user(**FakeUser().as_dict())
+
+    def test_recipes_and_tags_unreferenced(self):
+        """Test only the recipe tag links point at recipes and tags."""
+        for model in (Recipe, Tag):
+            relations = list(model._meta.related_objects) + [
+                field.remote_field for field in model._meta.many_to_many
+            ]
+            self.assertEqual(
+                [rel.through for rel in relations],
+                [Recipe.tags.through],
+            )
+
+    def test_delete_rows(self):
+        """Test rows are deleted with one statement and nothing else."""
+        deleted = create_recipe(user=self.fake_user)
+        kept = create_recipe(user=self.fake_user)
+
+        with self.assertNumQueries(1):
+            count = delete_rows(Recipe, [deleted.id])
+
+        self.assertEqual(count, 1)
+        self.assertEqual(list(Recipe.objects.all()), [kept])
+
+    def test_referenced_model_refused(self):
+        """Test rows a foreign key may point at are not deleted."""
+        with self.assertRaises(ValueError):
+            delete_rows(get_user_model(), [self.fake_user.id])
+
+        self.assertTrue(
+            get_user_model().objects.filter(id=self.fake_user.id).exists()
+        )
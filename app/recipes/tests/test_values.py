@@ -0,0 +1,104 @@
+"""
+Tests for representing recipes and tags from values() rows.
+"""
+from decimal import Decimal
+
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from recipes.models import Recipe, Tag
+from recipes.serializers import (
+    RecipeDetailSerializer,
+    RecipeSerializer,
+    TagDetailSerializer,
+)
+from recipes.tests.test_recipe import create_recipe
+from users.tests.test_user_api import create_user
+
+from core.tests.helpers.fake_user import FakeUser
+
+
+RECIPES_URL = reverse('recipes:recipe-list')
+TAGS_URL = reverse('recipes:tag-list')
+
+
+def render(data):
+    """Render data as the API does."""
+    return JSONRenderer().render(data)
+
+
+class ValuesRepresentationTests(TestCase):
+    """Test the values() read path matches the serializers."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.fake_user = create_user(**FakeUser().as_dict())
+        self.client.force_authenticate(self.fake_user)
+        tags = [
+            Tag.objects.create(user=self.fake_user, name=name)
+            for name in ['Vegan', 'Quick', 'Ünïcode   "quoted"']
+        ]
+        create_recipe(user=self.fake_user, price=Decimal('5.5'), link='')
+        tagged = create_recipe(user=self.fake_user)
+        tagged.tags.add(tags[2], tags[0])
+        create_recipe(user=self.fake_user).tags.add(tags[1])
+
+    def expected(self, serializer_class, queryset):
+        """Render queryset with the regular serializer."""
+        return render(serializer_class(queryset, many=True).data)
+
+    def test_recipe_rows_match_serializer(self):
+        """Test recipe rows render to the same bytes."""
+        recipes = Recipe.objects.order_by('-id')
+        rows = list(recipes.values(*RecipeSerializer.get_values_sources()))
+        tags = {row['id']: [] for row in rows}
+        for recipe in recipes:
+            tags[recipe.id] = list(recipe.tags.values('id', 'name'))
+
+        data = RecipeSerializer.represent_rows(rows, {'tags': tags})
+
+        self.assertEqual(
+            render(data),
+            self.expected(
+                RecipeSerializer,
+                recipes.prefetch_related('tags'),
+            ),
+        )
+
+    def test_recipe_list_matches_serializer(self):
+        """Test the recipe list renders the same bytes as before."""
+        res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(
+            render(res.data['results']),
+            self.expected(
+                RecipeSerializer,
+                Recipe.objects.order_by('-id').prefetch_related('tags'),
+            ),
+        )
+
+    def test_tag_list_matches_serializer(self):
+        """Test the tag list renders the same bytes as before."""
+        res = self.client.get(TAGS_URL)
+
+        self.assertEqual(
+            render(res.data['results']),
+            self.expected(
+                TagDetailSerializer,
+                Tag.objects.order_by('-name', '-id'),
+            ),
+        )
+
+    def test_field_metadata_cached_per_class(self):
+        """Test field metadata is built once for each class."""
+        fields = RecipeSerializer.get_values_fields()
+
+        self.assertIs(RecipeSerializer.get_values_fields(), fields)
+        detail_names = [
+            name for name, *rest in RecipeDetailSerializer.get_values_fields()
+        ]
+        self.assertIn('description', detail_names)
+        self.assertNotIn('description', [name for name, *rest in fields])
@@ -0,0 +1,243 @@
+"""
+Set-based helpers for resolving and linking recipe tags.
+"""
+from django.db import router
+from django.db.models import (
+    Case,
+    Count,
+    F,
+    IntegerField,
+    OuterRef,
+    Q,
+    Subquery,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce, Greatest
+from django.db.models.signals import m2m_changed
+from django.utils import timezone
+
+from core.cache import bump_user_version
+from core.db import delete_rows
+from recipes.models import Recipe, Tag, Tombstone
+
+
+def shift_recipe_count(delta):
+    """Return an expression adding delta to tag recipe counters."""
+    # A drifted counter is clamped rather than failing the write.
+    return Greatest(F('recipe_count') + delta, Value(0))
+
+
+def count_recipes():
+    """Return an expression counting the recipes of each tag."""
+    counts = Recipe.tags.through.objects \
+        .filter(tag_id=OuterRef('pk')) \
+        .order_by().values('tag_id') \
+        .annotate(count=Count('pk')).values('count')
+
+    return Coalesce(Subquery(counts), Value(0))
+
+
+def resolve_tags(user, names, lock=False):
+    """
+    Return user tags for names, creating the missing ones in bulk.
+
+    Existing tags are found with one lookup of the unique (user, name)
+    index. Missing ones are inserted skipping conflicts, so a concurrent
+    request creating the same name makes this one use its tag instead of
+    failing, then read back.
+
+    With lock the tags stay locked until the transaction ends, so they are
+    skipped by the garbage collection of orphan tags while being linked. A
+    tag collected while waiting for the lock is created again.
+    """
+    names = list(dict.fromkeys(names))
+    if not names:
+        return []
+
+    queryset = Tag.objects.filter(user=user)
+    if lock:
+        queryset = queryset.select_for_update().order_by('pk')
+    tags = {tag.name: tag for tag in queryset.filter(name__in=names)}
+    missing = [name for name in names if name not in tags]
+    if missing:
+        Tag.objects.bulk_create(
+            [Tag(user=user, name=name) for name in missing],
+            ignore_conflicts=True,
+        )
+        tags.update(
+            (tag.name, tag) for tag in queryset.filter(name__in=missing)
+        )
+
+    return [tags[name] for name in names]
+
+
+def _send_m2m_changed(action, recipe, pk_set, using):
+    """Send m2m_changed for a bulk change of recipe tags."""
+    m2m_changed.send(
+        sender=Recipe.tags.through,
+        action=action,
+        instance=recipe,
+        reverse=False,
+        model=Tag,
+        pk_set=pk_set,
+        using=using,
+    )
+
+
+def add_tags(recipe, tags):
+    """Link tags to recipe with a single insert into the through table."""
+    pk_set = {tag.pk for tag in tags}
+    if not pk_set:
+        return
+
+    through = Recipe.tags.through
+    db = router.db_for_write(through, instance=recipe)
+    # Like add(), signal only the links that are new, the receivers count
+    # every pk they get.
+    pk_set -= set(through.objects.using(db).filter(
+        recipe_id=recipe.pk,
+        tag_id__in=pk_set,
+    ).values_list('tag_id', flat=True))
+    if not pk_set:
+        return
+
+    _send_m2m_changed('pre_add', recipe, pk_set, db)
+    through.objects.using(db).bulk_create(
+        [through(recipe_id=recipe.pk, tag_id=pk) for pk in pk_set],
+        ignore_conflicts=True,
+    )
+    _send_m2m_changed('post_add', recipe, pk_set, db)
+    getattr(recipe, '_prefetched_objects_cache', {}).pop('tags', None)
+
+
+def remove_tags(recipe, tags):
+    """Unlink tags from recipe with a single delete."""
+    pk_set = {tag.pk for tag in tags}
+    if not pk_set:
+        return
+
+    through = Recipe.tags.through
+    db = router.db_for_write(through, instance=recipe)
+    _send_m2m_changed('pre_remove', recipe, pk_set, db)
+    through.objects.using(db).filter(
+        recipe_id=recipe.pk,
+        tag_id__in=pk_set,
+    ).delete()
+    _send_m2m_changed('post_remove', recipe, pk_set, db)
+    getattr(recipe, '_prefetched_objects_cache', {}).pop('tags', None)
+
+
+def sync_tags(user, recipe, names):
+    """
+    Make recipe tags match names, touching only the changed links, in a
+    transaction locking the added tags.
+
+    Return whether any link was added or removed.
+    """
+    names = set(names)
+    current = list(recipe.tags.all())
+    current_names = {tag.name for tag in current}
+
+    removed = [tag for tag in current if tag.name not in names]
+    added = resolve_tags(user, list(names - current_names), lock=True)
+    remove_tags(recipe, removed)
+    add_tags(recipe, added)
+
+    return bool(removed or added)
+
+
+def bulk_set_tags(user, changes):
+    """
+    Set tags of many recipes with set-based statements.
+
+    changes is a list of (recipe, current tags, new tag names) tuples, set
+    in a transaction locking the tags. Like other bulk operations no
+    m2m_changed signals are sent; linked and unlinked tags are marked as
+    modified and counted here, invalidating responses is up to the caller.
+    Return the recipes whose tags changed.
+    """
+    tags = {
+        tag.name: tag
+        for tag in resolve_tags(
+            user,
+            [name for _, _, names in changes for name in names],
+            lock=True,
+        )
+    }
+
+    through = Recipe.tags.through
+    added, removed = [], Q()
+    deltas, changed = {}, []
+    for recipe, current, names in changes:
+        names = set(names)
+        current_names = {tag.name for tag in current}
+        added_pks = {tags[name].pk for name in names - current_names}
+        removed_pks = {tag.pk for tag in current if tag.name not in names}
+        added += [
+            through(recipe_id=recipe.pk, tag_id=pk) for pk in added_pks
+        ]
+        if removed_pks:
+            removed |= Q(recipe_id=recipe.pk, tag_id__in=removed_pks)
+        for pk in added_pks:
+            deltas[pk] = deltas.get(pk, 0) + 1
+        for pk in removed_pks:
+            deltas[pk] = deltas.get(pk, 0) - 1
+        if added_pks or removed_pks:
+            changed.append(recipe)
+            getattr(recipe, '_prefetched_objects_cache', {}).pop('tags', None)
+
+    if removed:
+        through.objects.filter(removed).delete()
+    if added:
+        through.objects.bulk_create(added, ignore_conflicts=True)
+    if deltas:
+        Tag.objects.filter(pk__in=deltas).update(
+            updated_at=timezone.now(),
+            recipe_count=shift_recipe_count(Case(
+                *[When(pk=pk, then=Value(delta)) for pk, delta in
+                  deltas.items()],
+                default=Value(0),
+                output_field=IntegerField(),
+            )),
+        )
+
+    return changed
+
+
+def delete_recipes(user, ids):
+    """
+    Delete recipes of user with set-based statements.
+
+    Tags losing the recipes are marked as modified and counted, tombstones
+    recorded and responses of the user invalidated, as the delete signals
+    would. Return ids of the deleted recipes.
+    """
+    ids = list(
+        Recipe.objects.filter(user=user, pk__in=ids)
+        .values_list('pk', flat=True)
+    )
+    if not ids:
+        return []
+
+    through = Recipe.tags.through
+    lost = through.objects.filter(recipe_id__in=ids)
+    Tag.objects.filter(pk__in=lost.values('tag_id')).update(
+        updated_at=timezone.now(),
+        recipe_count=shift_recipe_count(-Subquery(
+            lost.filter(tag_id=OuterRef('pk'))
+            .order_by().values('tag_id')
+            .annotate(count=Count('pk')).values('count')
+        )),
+    )
+    through.objects.filter(recipe_id__in=ids).delete()
+    Tombstone.objects.bulk_create([
+        Tombstone(user=user, kind=Tombstone.RECIPE, object_id=pk)
+        for pk in ids
+    ])
+    # Everything the signals would do is done, delete the recipes without
+    # loading them one by one.
+    delete_rows(Recipe, ids)
+    bump_user_version(user.pk)
+
+    return ids
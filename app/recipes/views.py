@@ -1,30 +1,240 @@
+from decimal import Decimal, InvalidOperation
+
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef
+from django.http import StreamingHttpResponse
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import (
+    extend_schema,
+    extend_schema_view,
+    OpenApiParameter,
+)
 from rest_framework import viewsets, mixins
-from rest_framework.authentication import TokenAuthentication
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 
-from recipes.models import Recipe, Tag
+from core.authentication import CachedTokenAuthentication
+from core.cache import CachedResponseMixin, CachedRetrieveMixin
+from core.conditional import ConditionalMixin, ConditionalRetrieveMixin
+from core.views import SparseFieldsMixin, ValuesListMixin
+from recipes.export import EXPORTERS, iter_recipes
+from recipes.models import Recipe, Tag, Tombstone
+from recipes.search import search_recipes
 from recipes.serializers import (
+    ChangesSerializer,
+    RecipeBulkSerializer,
     RecipeSerializer,
     RecipeDetailSerializer,
-    TagSerializer,
+    TagBulkSerializer,
+    TagDetailSerializer,
 )
+from recipes.sync import issue_token, read_token
+
+
+def _params_to_ints(name, value):
+    """Convert a comma separated query parameter to a list of integers."""
+    try:
+        return [int(str_id) for str_id in value.split(',')]
+    except ValueError:
+        raise ValidationError({name: 'Expected comma separated integers.'})
+
+
+def _params_to_decimals(name, value, count):
+    """Convert a comma separated query parameter to decimals."""
+    try:
+        values = [Decimal(item) for item in value.split(',')]
+    except InvalidOperation:
+        values = []
+    if len(values) != count or not all(item.is_finite() for item in values):
+        raise ValidationError(
+            {name: f'Expected {count} comma separated numbers.'}
+        )
 
+    return values
 
-class RecipeViewSet(viewsets.ModelViewSet):
+
+# Tag orderings clients can pick, each ending with the primary key so the
+# keyset pagination sees distinct positions.
+TAG_ORDERINGS = {
+    '-name': ('-name', '-id'),
+    'name': ('name', 'id'),
+    '-recipe_count': ('-recipe_count', '-id'),
+    'recipe_count': ('recipe_count', 'id'),
+}
+
+SPARSE_FIELDS_PARAMETERS = [
+    OpenApiParameter(
+        'fields',
+        OpenApiTypes.STR,
+        description='Comma separated list of fields to return',
+    ),
+    OpenApiParameter(
+        'omit',
+        OpenApiTypes.STR,
+        description='Comma separated list of fields to leave out',
+    ),
+]
+
+
+@extend_schema_view(
+    list=extend_schema(
+        parameters=SPARSE_FIELDS_PARAMETERS + [
+            OpenApiParameter(
+                'tags',
+                OpenApiTypes.STR,
+                description='Comma separated list of tag IDs to filter',
+            ),
+            OpenApiParameter(
+                'time_minutes__lte',
+                OpenApiTypes.INT,
+                description='Maximum preparation time in minutes',
+            ),
+            OpenApiParameter(
+                'price__range',
+                OpenApiTypes.STR,
+                description='Comma separated minimum and maximum price',
+            ),
+            OpenApiParameter(
+                'search',
+                OpenApiTypes.STR,
+                description='Search text for titles and descriptions, '
+                            'results are ordered by relevance',
+            ),
+        ]
+    ),
+    retrieve=extend_schema(parameters=SPARSE_FIELDS_PARAMETERS),
+    changes=extend_schema(
+        parameters=[
+            OpenApiParameter(
+                'since',
+                OpenApiTypes.STR,
+                description='Sync token of the previous sync, everything '
+                            'is returned without it',
+            ),
+        ],
+        responses=ChangesSerializer,
+    ),
+    export=extend_schema(
+        parameters=[
+            OpenApiParameter(
+                'type',
+                OpenApiTypes.STR,
+                enum=list(EXPORTERS),
+                description='Export format, ndjson by default',
+            ),
+        ],
+        responses=OpenApiTypes.STR,
+    ),
+)
+class RecipeViewSet(CachedRetrieveMixin,
+                    ConditionalRetrieveMixin,
+                    SparseFieldsMixin,
+                    ValuesListMixin,
+                    viewsets.ModelViewSet):
     """View for manage recipe APIs."""
     serializer_class = RecipeDetailSerializer
-    queryset = Recipe.objects.all()
-    authentication_classes = [TokenAuthentication]
+    queryset = Recipe.objects.defer('search_vector')
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
+    ordering = ('-id',)
+    # Number of recipes fetched, and tags prefetched, at once by export.
+    export_chunk_size = 1000
+    # Maximum number of database queries each action may run, no matter
+    # how many recipes or tags the user has (see recipes/tests/test_queries).
+    query_budget = {
+        'list': 3,
+        'retrieve': 2,
+        'create': 11,
+        'update': 16,
+        'partial_update': 16,
+        'destroy': 5,
+        'changes': 4,
+        'bulk': 23,
+    }
 
     def get_queryset(self):
         """Retrieve recipes for authenticated user."""
-        return self.queryset.filter(user=self.request.user).order_by('-id')
+        queryset = self.queryset.filter(user=self.request.user)
+        if self.action == 'list':
+            queryset = self._filter_queryset_by_params(queryset)
+        elif self.action == 'retrieve':
+            queryset = self.prune_queryset(queryset)
+        # Lists read tags with get_nested_values() instead.
+        if self.action not in ('list', 'destroy') and \
+                self.is_field_requested('tags'):
+            queryset = queryset.prefetch_related('tags')
+
+        return queryset.order_by(*self.get_ordering())
+
+    def get_search_text(self):
+        """Return the search text of a list request, if any."""
+        if self.action != 'list':
+            return ''
+
+        return self.request.query_params.get('search', '').strip()
+
+    def get_ordering(self):
+        """Return the list ordering, by relevance when searching."""
+        if self.get_search_text():
+            return ('-rank', '-id')
+
+        return self.ordering
+
+    def get_nested_values(self, rows):
+        """Return tags of recipe rows, read with one query."""
+        tags = {row['id']: [] for row in rows}
+        links = Recipe.tags.through.objects \
+            .filter(recipe_id__in=tags) \
+            .order_by('recipe_id', 'tag_id') \
+            .values_list('recipe_id', 'tag_id', 'tag__name')
+        for recipe_id, tag_id, name in links:
+            tags[recipe_id].append({'id': tag_id, 'name': name})
+
+        return {'tags': tags}
+
+    def _filter_queryset_by_params(self, queryset):
+        """Apply the list filters given in query parameters."""
+        params = self.request.query_params
+        tags = params.get('tags')
+        time_minutes = params.get('time_minutes__lte')
+        price_range = params.get('price__range')
+        search = self.get_search_text()
+
+        if tags:
+            # A semi-join matches each recipe once, so no DISTINCT is
+            # needed to drop rows repeated by several matching tags.
+            queryset = queryset.filter(Exists(
+                Recipe.tags.through.objects.filter(
+                    recipe_id=OuterRef('pk'),
+                    tag_id__in=_params_to_ints('tags', tags),
+                )
+            ))
+        if time_minutes:
+            try:
+                queryset = queryset.filter(
+                    time_minutes__lte=int(time_minutes),
+                )
+            except ValueError:
+                raise ValidationError(
+                    {'time_minutes__lte': 'Expected an integer.'}
+                )
+        if price_range:
+            queryset = queryset.filter(price__range=_params_to_decimals(
+                'price__range', price_range, 2,
+            ))
+        if search:
+            queryset = search_recipes(queryset, search)
+
+        return queryset
 
     def get_serializer_class(self):
         """Return the serializer class for request."""
         if self.action == 'list':
             return RecipeSerializer
+        if self.action == 'bulk':
+            return RecipeBulkSerializer
 
         return self.serializer_class
 
@@ -32,16 +242,149 @@ class RecipeViewSet(viewsets.ModelViewSet):
         """Create a new recipe."""
         serializer.save(user=self.request.user)
 
+    @action(detail=False, pagination_class=None)
+    def changes(self, request):
+        """Return recipes and tags changed since a sync token."""
+        # Issued before reading, so nothing changed meanwhile is skipped.
+        token = issue_token()
+        since = request.query_params.get('since')
+        recipes = self.get_queryset()
+        tags = Tag.objects.filter(user=request.user).order_by('-id')
+        deleted = {'recipes': [], 'tags': []}
+        if since:
+            since = read_token(since)
+            recipes = recipes.filter(updated_at__gt=since)
+            tags = tags.filter(updated_at__gt=since)
+            tombstones = Tombstone.objects.filter(
+                user=request.user,
+                deleted_at__gt=since,
+            ).values_list('kind', 'object_id')
+            for kind, object_id in tombstones:
+                deleted[f'{kind}s'].append(object_id)
+
+        serializer = ChangesSerializer({
+            'token': token,
+            'recipes': recipes,
+            'tags': tags,
+            'deleted': deleted,
+        }, context=self.get_serializer_context())
+        return Response(serializer.data)
+
+    @action(detail=False, pagination_class=None)
+    def export(self, request):
+        """Stream every recipe of the user as NDJSON or CSV."""
+        export_type = request.query_params.get('type', 'ndjson')
+        if export_type not in EXPORTERS:
+            raise ValidationError(
+                {'type': f'Expected one of: {", ".join(EXPORTERS)}.'}
+            )
+
+        exporter, content_type = EXPORTERS[export_type]
+        recipes = Recipe.objects.defer('search_vector') \
+            .filter(user=request.user).order_by('id')
+        serializer = RecipeDetailSerializer(
+            context=self.get_serializer_context(),
+        )
+        response = StreamingHttpResponse(
+            exporter(
+                iter_recipes(recipes, self.export_chunk_size),
+                serializer,
+            ),
+            content_type=content_type,
+        )
+        response['Content-Disposition'] = \
+            f'attachment; filename="recipes.{export_type}"'
+
+        return response
 
-class TagViewSet(mixins.DestroyModelMixin,
+    @action(detail=False, methods=['post'], pagination_class=None)
+    def bulk(self, request):
+        """Create, update and delete many recipes in one transaction."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+        return Response(serializer.data)
+
+
+@extend_schema_view(
+    list=extend_schema(
+        parameters=SPARSE_FIELDS_PARAMETERS + [
+            OpenApiParameter(
+                'assigned_only',
+                OpenApiTypes.INT,
+                enum=[0, 1],
+                description='Filter by tags assigned to recipes',
+            ),
+            OpenApiParameter(
+                'ordering',
+                OpenApiTypes.STR,
+                enum=list(TAG_ORDERINGS),
+                description='Order by name or by number of recipes, '
+                            'descending with a leading minus',
+            ),
+        ]
+    )
+)
+class TagViewSet(CachedResponseMixin,
+                 ConditionalMixin,
+                 SparseFieldsMixin,
+                 ValuesListMixin,
+                 mixins.DestroyModelMixin,
                  mixins.UpdateModelMixin,
                  mixins.ListModelMixin,
                  viewsets.GenericViewSet):
     """Manage tags in the database."""
-    serializer_class = TagSerializer
+    serializer_class = TagDetailSerializer
     queryset = Tag.objects.all()
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
+    ordering = TAG_ORDERINGS['-name']
 
     def get_queryset(self):
-        return self.queryset.filter(user=self.request.user).order_by('-name')
+        """Retrieve tags for authenticated user."""
+        queryset = self.queryset.filter(user=self.request.user)
+        assigned_only = self.request.query_params.get('assigned_only')
+        if self.action == 'list' and assigned_only == '1':
+            # The maintained counter spares a semi-join with the links.
+            queryset = queryset.filter(recipe_count__gt=0)
+
+        return queryset.order_by(*self.get_ordering())
+
+    def get_ordering(self):
+        """Return the list ordering picked with `ordering`, if any."""
+        ordering = self.request.query_params.get('ordering')
+        if self.action != 'list' or not ordering:
+            return self.ordering
+        if ordering not in TAG_ORDERINGS:
+            raise ValidationError(
+                {'ordering': f'Expected one of: {", ".join(TAG_ORDERINGS)}.'}
+            )
+
+        return TAG_ORDERINGS[ordering]
+
+    def get_serializer_class(self):
+        """Return the serializer class for request."""
+        if self.action == 'bulk':
+            return TagBulkSerializer
+
+        return self.serializer_class
+
+    def perform_update(self, serializer):
+        """Save the tag, reporting a name taken meanwhile as invalid."""
+        try:
+            with transaction.atomic():
+                serializer.save()
+        except IntegrityError:
+            raise ValidationError(
+                {'name': [serializer.error_messages['duplicate']]}
+            )
+
+    @action(detail=False, methods=['post'], pagination_class=None)
+    def bulk(self, request):
+        """Create many tags by name, reusing the existing ones."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+        return Response(serializer.data)
@@ -6,6 +6,7 @@ from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.utils.translation import gettext_lazy as _
 
 from users import models
+from users.images import image_replaced
 
 
 class UserAdmin(BaseUserAdmin):
@@ -62,6 +63,15 @@ class ProfileAdmin(admin.ModelAdmin):
     def has_delete_permission(self, request, obj=None):
         return False
 
+    def save_model(self, request, obj, form, change):
+        if 'image' not in form.changed_data:
+            return super().save_model(request, obj, form, change)
+
+        replaced = obj.image_variants
+        obj.image_variants = {}
+        super().save_model(request, obj, form, change)
+        image_replaced(obj, replaced)
+
     def get_user_email(self, obj):
         return obj.user.email
     get_user_email.short_description = 'email'
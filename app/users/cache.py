@@ -0,0 +1,42 @@
+"""
+Read-through cache of rendered user profiles.
+
+Profiles are read far more often than they change, so their rendering is
+kept in the response cache and dropped when the profile or its user is
+saved (see users.models).
+"""
+from django.conf import settings
+from django.db import transaction
+
+from core.cache import get_response_cache
+
+
+def _profile_key(pk):
+    return f'profile:{pk}'
+
+
+def get_cached_profile(pk, load):
+    """Return the rendered profile pk, calling load to render it on a miss."""
+    cache = get_response_cache()
+    key = _profile_key(pk)
+    data = cache.get(key)
+    if data is None:
+        data = load()
+        cache.set(key, data, settings.PROFILE_CACHE_TIMEOUT)
+
+    return data
+
+
+def invalidate_profiles(pks):
+    """Drop the cached renderings of profiles."""
+    keys = [_profile_key(pk) for pk in pks]
+    if not keys:
+        return
+
+    def delete():
+        get_response_cache().delete_many(keys)
+
+    # Delete now so the writing request never sees the stale rendering, and
+    # again after commit in case another request cached the old row meanwhile.
+    delete()
+    transaction.on_commit(delete)
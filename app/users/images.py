@@ -0,0 +1,141 @@
+"""
+Resized variants of profile images.
+
+Clients show avatars far smaller than the uploaded originals. Once an
+upload commits, every size of PROFILE_IMAGE_SIZES is rendered in every
+format of PROFILE_IMAGE_FORMATS by a pool of PROFILE_IMAGE_WORKERS
+processes, and recorded in Profile.image_variants. The request never waits
+for the resizing.
+"""
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from PIL import Image, ImageOps
+
+from users.cache import invalidate_profiles
+from users.models import Profile
+
+logger = logging.getLogger(__name__)
+
+# Pillow format, file extension and save options of each variant format.
+FORMATS = {
+    'jpeg': ('JPEG', 'jpg', {
+        'quality': 85, 'progressive': True, 'optimize': True,
+    }),
+    'webp': ('WEBP', 'webp', {'quality': 80, 'method': 4}),
+}
+
+_pool = None
+_lock = threading.Lock()
+
+
+def check_dimensions(image):
+    """Raise ValueError if image has more than PROFILE_IMAGE_MAX_PIXELS."""
+    width, height = image.size
+    if width * height > settings.PROFILE_IMAGE_MAX_PIXELS:
+        raise ValueError(f'Image of {width}x{height} pixels is too large.')
+
+
+def render_variants(name, sizes, formats):
+    """
+    Write the variants of the stored image name, fitting squares of sizes,
+    in formats. Return their names by size and format.
+    """
+    with default_storage.open(name) as f:
+        image = Image.open(f)
+        check_dimensions(image)
+        # JPEG decodes straight to a smaller scale, far faster.
+        image.draft('RGB', (max(sizes), max(sizes)))
+        image = ImageOps.exif_transpose(image)
+        image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+
+    stem = os.path.splitext(name)[0]
+    variants = {}
+    # Each variant is resized from the previous, larger one.
+    for size in sorted(sizes, reverse=True):
+        image.thumbnail((size, size), Image.LANCZOS)
+        variants[str(size)] = {}
+        for key in formats:
+            pil_format, ext, options = FORMATS[key]
+            variant = image
+            if pil_format == 'JPEG' and variant.mode == 'RGBA':
+                variant = Image.new('RGB', image.size, 'white')
+                variant.paste(image, mask=image.getchannel('A'))
+            content = BytesIO()
+            variant.save(content, pil_format, **options)
+            variants[str(size)][key] = default_storage.save(
+                f'{stem}_{size}.{ext}',
+                ContentFile(content.getvalue()),
+            )
+
+    return variants
+
+
+def delete_variants(variants):
+    """Delete the files of variants."""
+    for names in variants.values():
+        for name in names.values():
+            default_storage.delete(name)
+
+
+def store_variants(pk, name, variants):
+    """
+    Record the variants of image name on profile pk, or delete them if the
+    image was replaced meanwhile.
+    """
+    updated = Profile.objects.filter(pk=pk, image=name).update(
+        image_variants=variants,
+    )
+    if updated:
+        invalidate_profiles([pk])
+    else:
+        delete_variants(variants)
+
+
+def _get_pool():
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(settings.PROFILE_IMAGE_WORKERS)
+
+        return _pool
+
+
+def process_image(profile):
+    """
+    Render the variants of the image of profile, in the background
+    unless PROFILE_IMAGE_WORKERS is 0.
+    """
+    pk = profile.pk
+    name = profile.image.name
+    args = (name, settings.PROFILE_IMAGE_SIZES, settings.PROFILE_IMAGE_FORMATS)
+    if not settings.PROFILE_IMAGE_WORKERS:
+        store_variants(pk, name, render_variants(*args))
+        return
+
+    def done(future):
+        try:
+            store_variants(pk, name, future.result())
+        except Exception:
+            logger.exception('Processing image %s failed.', name)
+        finally:
+            # Done callbacks run in a thread of the pool.
+            connection.close()
+
+    _get_pool().submit(render_variants, *args).add_done_callback(done)
+
+
+def image_replaced(profile, replaced):
+    """
+    Once committed, delete the replaced variants and render the variants
+    of the new image of profile.
+    """
+    transaction.on_commit(lambda: delete_variants(replaced))
+    transaction.on_commit(lambda: process_image(profile))
@@ -6,10 +6,12 @@ Database models.
 from django.contrib.auth.models import (AbstractBaseUser, BaseUserManager,
                                         PermissionsMixin)
 from django.db import models
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
+from core import hashing
 from core.utils import image_filepath
+from users.cache import invalidate_profiles
 
 
 class UserManager(BaseUserManager):
@@ -49,6 +51,20 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     USERNAME_FIELD = 'email'
 
+    def set_password(self, raw_password):
+        """Set the password, hashed by the hashing pool."""
+        self.password = hashing.make_password(raw_password)
+        self._password = raw_password
+
+    def check_password(self, raw_password):
+        """Return whether raw_password matches, checked by the pool."""
+        def setter(raw_password):
+            self.set_password(raw_password)
+            self._password = None
+            self.save(update_fields=['password'])
+
+        return hashing.check_password(raw_password, self.password, setter)
+
 
 class Profile(models.Model):
     class Meta:
@@ -57,6 +73,8 @@ class Profile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     bio = models.CharField(max_length=600)
     image = models.ImageField(upload_to=image_filepath)
+    # Resized copies of image by size and format, see users.images.
+    image_variants = models.JSONField(default=dict, editable=False)
     short_desc = models.CharField(max_length=255)
 
     def __str__(self):
@@ -70,4 +88,24 @@ class Profile(models.Model):
 def create_empty_profile(sender, instance, created, **kwargs):
     if created:
         Profile.objects.create(user=instance)
-        instance.profile.save()
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def invalidate_profile(sender, instance, **kwargs):
+    """Drop the cached rendering of a changed profile."""
+    invalidate_profiles([instance.pk])
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_profile(sender, instance, created, update_fields,
+                            **kwargs):
+    """Drop the cached profile of a user whose email or name changed."""
+    if created or (update_fields and
+                   not {'email', 'name'} & set(update_fields)):
+        return
+
+    invalidate_profiles(
+        Profile.objects.filter(user_id=instance.pk)
+        .values_list('pk', flat=True)
+    )
@@ -2,10 +2,13 @@
 Serializers for the user API View.
 """
 from django.contrib.auth import get_user_model, authenticate
+from django.core.files.storage import default_storage
 from django.utils.translation import gettext_lazy as _
 
 from rest_framework import serializers
+from rest_framework_simplejwt import serializers as jwt_serializers
 
+from users.images import check_dimensions, image_replaced
 from users.models import Profile
 
 
@@ -58,10 +61,23 @@ class AuthTokenSerializer(serializers.Serializer):
         return attrs
 
 
+class TokenObtainPairSerializer(jwt_serializers.TokenObtainPairSerializer):
+    """Serializer for JWT pairs, carrying the user email and name."""
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token['email'] = user.email
+        token['name'] = user.name
+
+        return token
+
+
 class ProfileSerializer(serializers.ModelSerializer):
     """Searializer for the user profile."""
     user_email = serializers.SerializerMethodField()
     user_name = serializers.SerializerMethodField()
+    image_variants = serializers.SerializerMethodField()
 
     def get_user_email(self, obj):
         return obj.user.email
@@ -69,6 +85,42 @@ class ProfileSerializer(serializers.ModelSerializer):
     def get_user_name(self, obj):
         return obj.user.name
 
+    def get_image_variants(self, obj):
+        """
+        Return the URLs of the resized images by size and format, relative
+        like the image URL, as profiles are cached for any request.
+        """
+        return {
+            size: {
+                key: default_storage.url(name) for key, name in names.items()
+            }
+            for size, names in obj.image_variants.items()
+        }
+
+    def validate_image(self, value):
+        """Reject images too large to resize safely."""
+        try:
+            check_dimensions(value.image)
+        except ValueError as exc:
+            raise serializers.ValidationError(str(exc), code='too_large')
+
+        return value
+
+    def update(self, instance, validated_data):
+        """Update the profile, resizing a new image once committed."""
+        if 'image' not in validated_data:
+            return super().update(instance, validated_data)
+
+        replaced = instance.image_variants
+        instance.image_variants = {}
+        profile = super().update(instance, validated_data)
+        image_replaced(profile, replaced)
+
+        return profile
+
     class Meta:
         model = Profile
-        fields = ['user_email', 'user_name', 'bio', 'short_desc', 'image']
+        fields = [
+            'user_email', 'user_name', 'bio', 'short_desc', 'image',
+            'image_variants',
+        ]
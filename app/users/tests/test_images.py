@@ -0,0 +1,152 @@
+"""
+Tests for resizing profile images.
+"""
+import tempfile
+from io import BytesIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.cache import get_response_cache
+from core.tests.helpers.fake_user import FakeUser
+from users.images import render_variants, store_variants
+
+
+def image_file(size=(300, 200), mode='RGBA', image_format='PNG'):
+    """Return the content of an image file."""
+    content = BytesIO()
+    Image.new(mode, size, 'red').save(content, image_format)
+    return content.getvalue()
+
+
+class ImageTestCase(TestCase):
+    """Test case storing files in a temporary media root."""
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        media_root = override_settings(MEDIA_ROOT=media.name)
+        media_root.enable()
+        self.addCleanup(media_root.disable)
+
+
+class RenderVariantsTests(ImageTestCase):
+    """Test rendering image variants."""
+
+    def test_render_variants(self):
+        """Test every size is rendered in every format, keeping ratios."""
+        name = default_storage.save('avatar.png', ContentFile(image_file()))
+
+        variants = render_variants(name, [64, 256, 1024], ['jpeg', 'webp'])
+
+        self.assertEqual(set(variants), {'64', '256', '1024'})
+        with default_storage.open(variants['64']['jpeg']) as f:
+            jpeg = Image.open(f)
+            self.assertEqual(jpeg.format, 'JPEG')
+            self.assertEqual(jpeg.size, (64, 43))
+            self.assertTrue(jpeg.info.get('progressive'))
+        with default_storage.open(variants['256']['webp']) as f:
+            webp = Image.open(f)
+            self.assertEqual(webp.format, 'WEBP')
+            self.assertEqual(webp.size, (256, 171))
+        # Images are never enlarged.
+        with default_storage.open(variants['1024']['jpeg']) as f:
+            self.assertEqual(Image.open(f).size, (300, 200))
+
+    @override_settings(PROFILE_IMAGE_MAX_PIXELS=100)
+    def test_render_too_large(self):
+        """Test images over the pixel limit are not decoded."""
+        name = default_storage.save('avatar.png', ContentFile(image_file()))
+
+        with self.assertRaises(ValueError):
+            render_variants(name, [64], ['jpeg'])
+
+    def test_replaced_image_variants_deleted(self):
+        """Test variants of a replaced image are dropped."""
+        user = get_user_model().objects.create_user(**FakeUser().as_dict())
+        name = default_storage.save('avatar.png', ContentFile(image_file()))
+        variants = render_variants(name, [64], ['jpeg'])
+
+        store_variants(user.profile.pk, name, variants)
+
+        user.profile.refresh_from_db()
+        self.assertEqual(user.profile.image_variants, {})
+        self.assertFalse(default_storage.exists(variants['64']['jpeg']))
+
+
+@override_settings(PROFILE_IMAGE_WORKERS=0, PROFILE_IMAGE_SIZES=[64, 256])
+class ProfileImageApiTests(ImageTestCase):
+    """Test uploading profile images."""
+
+    def setUp(self):
+        super().setUp()
+        get_response_cache().clear()
+        self.fake_user = get_user_model().objects.create_user(
+            **FakeUser().as_dict()
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.fake_user)
+        self.profile_url = reverse(
+            'users:profile',
+            kwargs={'pk': self.fake_user.profile.pk},
+        )
+
+    def upload(self, content):
+        """Upload an image as the profile image, return the response."""
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.patch(
+                self.profile_url,
+                {'image': SimpleUploadedFile('avatar.png', content)},
+                format='multipart',
+            )
+
+    def test_upload_image(self):
+        """Test an uploaded image is resized and its variants served."""
+        self.client.get(self.profile_url)
+
+        res = self.upload(image_file())
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        res = self.client.get(self.profile_url)
+        variants = res.data['image_variants']
+        self.assertEqual(set(variants), {'64', '256'})
+        self.assertTrue(variants['64']['webp'].endswith('_64.webp'))
+        self.assertTrue(variants['64']['webp'].startswith(settings.MEDIA_URL))
+
+    def test_replace_image(self):
+        """Test replacing an image deletes the previous variants."""
+        self.upload(image_file())
+        self.fake_user.profile.refresh_from_db()
+        previous = self.fake_user.profile.image_variants['64']['jpeg']
+
+        self.upload(image_file(mode='RGB'))
+
+        self.fake_user.profile.refresh_from_db()
+        self.assertFalse(default_storage.exists(previous))
+        self.assertNotEqual(
+            self.fake_user.profile.image_variants['64']['jpeg'],
+            previous,
+        )
+
+    @override_settings(PROFILE_IMAGE_MAX_PIXELS=100)
+    def test_upload_too_large(self):
+        """Test images over the pixel limit are rejected."""
+        res = self.upload(image_file())
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('image', res.data)
+
+    def test_upload_not_an_image(self):
+        """Test files that are no image are rejected."""
+        res = self.upload(b'not an image')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
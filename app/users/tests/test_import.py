@@ -0,0 +1,118 @@
+"""
+Tests for importing users.
+"""
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from core.tests.helpers.fake_user import FakeUser
+from users.models import Profile
+from users.tests.test_user_api import create_user
+
+
+class ImportUsersTests(TestCase):
+    """Test importing users from files."""
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+
+    def write(self, name, content):
+        """Write a file to import and return its path."""
+        path = os.path.join(self.dir.name, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
+
+    def write_ndjson(self, rows):
+        """Write rows as NDJSON and return the file path."""
+        return self.write(
+            'users.ndjson',
+            ''.join(json.dumps(row) + '\n' for row in rows),
+        )
+
+    def run_import(self, path, **options):
+        """Run the import and return its output."""
+        out = StringIO()
+        call_command(
+            'import_users',
+            path,
+            stdout=out,
+            **{'workers': 2, 'stderr': StringIO(), **options},
+        )
+        return out.getvalue()
+
+    def test_import_ndjson(self):
+        """Test importing users with passwords and profiles in chunks."""
+        fakes = [FakeUser() for i in range(3)]
+        rows = [fake.as_dict() for fake in fakes]
+        rows[0]['bio'] = 'Cooks a lot.'
+        del rows[2]['password']
+
+        out = self.run_import(self.write_ndjson(rows), chunk_size=2)
+
+        users = get_user_model().objects.order_by('id')
+        self.assertEqual(
+            [user.email for user in users],
+            [fake.email for fake in fakes],
+        )
+        self.assertTrue(users[0].check_password(fakes[0].password))
+        self.assertFalse(users[2].has_usable_password())
+        self.assertEqual(users[0].profile.bio, 'Cooks a lot.')
+        self.assertEqual(Profile.objects.count(), 3)
+        self.assertIn('Imported 3 users', out)
+
+    def test_import_csv_inline(self):
+        """Test importing CSV with passwords hashed inline."""
+        fake = FakeUser()
+        path = self.write(
+            'users.csv',
+            'email,name,password,bio\n'
+            f'{fake.email},{fake.name},{fake.password},\n',
+        )
+
+        self.run_import(path, workers=0)
+
+        user = get_user_model().objects.get(email=fake.email)
+        self.assertTrue(user.check_password(fake.password))
+        self.assertEqual(user.profile.bio, '')
+
+    def test_import_skips_invalid_and_existing(self):
+        """Test invalid, duplicate and existing users are skipped."""
+        existing = FakeUser()
+        create_user(**existing.as_dict())
+        valid = FakeUser().as_dict()
+        rows = [
+            existing.as_dict(),
+            valid,
+            valid,
+            {'email': 'not an email', 'name': 'Invalid'},
+        ]
+
+        out = self.run_import(self.write_ndjson(rows))
+
+        self.assertEqual(get_user_model().objects.count(), 2)
+        self.assertEqual(Profile.objects.count(), 2)
+        self.assertIn('Imported 1 users, skipped 3 rows.', out)
+
+    def test_import_skips_undecodable_rows(self):
+        """Test lines that are no JSON are reported and skipped."""
+        fake = FakeUser()
+        path = self.write(
+            'users.ndjson',
+            f'{json.dumps(fake.as_dict())}\n{{oops\n',
+        )
+        err = StringIO()
+
+        out = self.run_import(path, stderr=err, workers=0)
+
+        self.assertTrue(
+            get_user_model().objects.filter(email=fake.email).exists()
+        )
+        self.assertIn('Imported 1 users, skipped 1 rows.', out)
+        self.assertIn('Row 2: ', err.getvalue())
@@ -69,3 +69,8 @@ class ProfileModelTests(TestCase):
         self.assertEqual(user_profile.bio, '')
         self.assertEqual(user_profile.image, '')
         self.assertEqual(user_profile.short_desc, '')
+
+    def test_profile_inserted_once(self):
+        """Test creating a user writes the user and its profile once."""
+        with self.assertNumQueries(2):
+            get_user_model().objects.create_user(**FakeUser().as_dict())
@@ -1,3 +1,4 @@
+from core.cache import get_response_cache
 from core.tests.helpers.fake_user import FakeUser
 from core.tests.helpers.faker import faker
 
@@ -20,6 +21,7 @@ class PrivateUserApiTests(TestCase):
     """Test API requesta that require authentication"""
 
     def setUp(self):
+        get_response_cache().clear()
         self.fake_user = get_user_model().objects.create_user(
             **FakeUser().as_dict()
         )
@@ -62,3 +64,44 @@ class PrivateUserApiTests(TestCase):
             user_profile.short_desc,
             updated_user.get('short_desc')
         )
+
+    def test_retrieve_profile_single_query(self):
+        """Test a profile is read with its user, then served cached."""
+        with self.assertNumQueries(1):
+            res = self.client.get(self.profile_url)
+        with self.assertNumQueries(0):
+            cached = self.client.get(self.profile_url)
+
+        self.assertEqual(cached.status_code, status.HTTP_200_OK)
+        self.assertEqual(cached.data, res.data)
+
+    def test_profile_cache_invalidated(self):
+        """Test saving the profile or its user refreshes the cache."""
+        self.client.get(self.profile_url)
+        self.client.patch(self.profile_url, {'bio': 'Cooks a lot.'})
+        self.fake_user.name = 'Renamed'
+        self.fake_user.save()
+
+        res = self.client.get(self.profile_url)
+
+        self.assertEqual(res.data['bio'], 'Cooks a lot.')
+        self.assertEqual(res.data['user_name'], 'Renamed')
+
+    def test_retrieve_missing_profile(self):
+        """Test retrieving a profile that does not exist returns 404."""
+        res = self.client.get(reverse('users:profile', kwargs={'pk': 0}))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_update_other_profile_forbidden(self):
+        """Test updating the profile of another user is forbidden."""
+        other_user = get_user_model().objects.create_user(
+            **FakeUser().as_dict()
+        )
+        url = reverse('users:profile', kwargs={'pk': other_user.profile.pk})
+
+        res = self.client.patch(url, {'bio': 'Hijacked.'})
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+        other_user.profile.refresh_from_db()
+        self.assertNotEqual(other_user.profile.bio, 'Hijacked.')
@@ -2,10 +2,15 @@
 Tests for the user API
 """
 
+from unittest.mock import patch
+
+from core.hashing import HashingBusy
 from core.tests.helpers.fake_user import FakeUser
 from core.tests.helpers.faker import faker
+from core.throttling import reset_throttles
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
@@ -20,10 +25,19 @@ def create_user(**params):
     return get_user_model().objects.create_user(**params)
 
 
+def throttle_rates(**rates):
+    """Return a context throttling the API at rates by scope."""
+    return override_settings(REST_FRAMEWORK={
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': rates,
+    })
+
+
 class PublicUserApiTests(TestCase):
     """Test the public features of the user API."""
 
     def setUp(self):
+        reset_throttles()
         self.client = APIClient()
 
         self.fake_user = FakeUser()
@@ -100,6 +114,53 @@ class PublicUserApiTests(TestCase):
         self.assertNotIn('access', res.data)
         self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_create_token_throttled_by_account(self):
+        """Test repeated logins to one account are throttled."""
+        fake_user = FakeUser()
+        create_user(**fake_user.as_dict())
+        credentials = fake_user.as_dict(name_needed=False)
+
+        with throttle_rates(login_account='2/min'):
+            for i in range(2):
+                self.client.post(TOKEN_URL, credentials)
+            res = self.client.post(TOKEN_URL, credentials)
+            other = self.client.post(
+                TOKEN_URL,
+                self.fake_user.as_dict(name_needed=False),
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', res)
+        self.assertEqual(other.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_create_token_list_body(self):
+        """Test a JSON body that is no object is rejected."""
+        for body in ([1, 2], None):
+            res = self.client.post(TOKEN_URL, body, format='json')
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_create_user_throttled_by_ip(self):
+        """Test repeated signups from one client are throttled."""
+        with throttle_rates(signup_ip='1/hour'):
+            self.client.post(CREATE_USER_URL, self.fake_user.as_dict())
+            res = self.client.post(CREATE_USER_URL, FakeUser().as_dict())
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_create_token_hashing_busy(self):
+        """Test logins are rejected while the hashing pool is full."""
+        fake_user = FakeUser()
+        create_user(**fake_user.as_dict())
+
+        with patch('core.hashing.run', side_effect=HashingBusy(wait=1)):
+            res = self.client.post(
+                TOKEN_URL,
+                fake_user.as_dict(name_needed=False),
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
     def test_retrieve_user_anauthorized(self):
         """Test authentication is required for users."""
         res = self.client.get(ME_URL)
@@ -1,25 +1,42 @@
 """
 Views for the user API.
 """
+from django.contrib.auth import get_user_model
+
 from rest_framework import generics, permissions, status
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.response import Response
+from rest_framework_simplejwt.views import TokenObtainPairView
+
+from core.throttling import (LoginAccountThrottle, LoginIPThrottle,
+                             SignupIPThrottle)
 
+from users.cache import get_cached_profile
 from users.models import Profile
 from users.permissions import IsOwnerOrReadOnly
 from users.serializers import (AuthTokenSerializer, ProfileSerializer,
-                               UserSerializer)
+                               TokenObtainPairSerializer, UserSerializer)
+
+LOGIN_THROTTLES = [LoginIPThrottle, LoginAccountThrottle]
 
 
 class CreateUserView(generics.CreateAPIView):
     """Create a new user in the system."""
     serializer_class = UserSerializer
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [SignupIPThrottle]
 
 
 class CreateTokenView(ObtainAuthToken):
     """Create a new auth token for user."""
     serializer_class = AuthTokenSerializer
+    throttle_classes = LOGIN_THROTTLES
+
+
+class CreateTokenPairView(TokenObtainPairView):
+    """Create a new JWT pair for user."""
+    serializer_class = TokenObtainPairSerializer
+    throttle_classes = LOGIN_THROTTLES
 
 
 class ManageUserView(generics.RetrieveUpdateAPIView):
@@ -27,21 +44,32 @@ class ManageUserView(generics.RetrieveUpdateAPIView):
 
     def get_object(self):
         """Retrieve and return the authenticated user"""
-        return self.request.user
+        if self.request.method in permissions.SAFE_METHODS:
+            return self.request.user
+
+        # The authenticated user may come from a cache or from token
+        # claims, change the stored one.
+        return get_user_model().objects.get(pk=self.request.user.pk)
 
 
 class ProfileView(generics.GenericAPIView):
     """View and update user profile."""
     serializer_class = ProfileSerializer
+    # The serializer shows the email and name of the user.
+    queryset = Profile.objects.select_related('user')
     permission_classes = [permissions.IsAuthenticated, IsOwnerOrReadOnly]
 
     def get(self, request, pk, format=None):
-        profile = Profile.objects.get(pk=pk)
-        serializer = ProfileSerializer(profile)
-        return Response(serializer.data)
+        # Reading needs no object permission, a cached rendering is
+        # served without loading the profile.
+        data = get_cached_profile(
+            pk,
+            lambda: ProfileSerializer(self.get_object()).data,
+        )
+        return Response(data)
 
     def patch(self, request, pk, format=None):
-        profile = Profile.objects.get(pk=pk)
+        profile = self.get_object()
         serializer = ProfileSerializer(
             profile,
             data=request.data, partial=True